@@ -0,0 +1,25 @@
+"""add task user updated_at index
+
+Revision ID: a8d2c5f7e9b1
+Revises: f3b9d6e1a2c7
+Create Date: 2026-02-25 10:18:44.207913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d2c5f7e9b1'
+down_revision = 'f3b9d6e1a2c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the (updated_at, id) keyset scans of GET /tasks/changes
+    op.create_index('ix_task_user_updated_at', 'task', ['user_id', 'updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_user_updated_at', table_name='task')
@@ -0,0 +1,63 @@
+"""add rank to task
+
+Revision ID: c4e8a1f2b3d5
+Revises: 773c11550169
+Create Date: 2026-02-21 17:42:10.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a1f2b3d5'
+down_revision = '773c11550169'
+branch_labels = None
+depends_on = None
+
+RANK_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+
+def nth_rank(n: int) -> str:
+    """
+    The n-th (from 0) of increasing rank keys appended to an empty list: "a0".."az",
+    "b00".."bzz", ... The first character gives the number of digits that follow.
+    Frozen here rather than imported, so the migration doesn't change with the app.
+    """
+    length = 1
+    while n >= len(RANK_DIGITS) ** length:
+        n -= len(RANK_DIGITS) ** length
+        length += 1
+    digits = ""
+    for _ in range(length):
+        n, digit = divmod(n, len(RANK_DIGITS))
+        digits = RANK_DIGITS[digit] + digits
+    return chr(ord("a") + length - 1) + digits
+
+
+def upgrade() -> None:
+    # "C" collation so ORDER BY rank compares bytes, matching rank_between()
+    op.add_column('task', sa.Column('rank', sa.String(collation='C'), nullable=True))
+    op.create_index('ix_task_user_rank', 'task', ['user_id', 'rank'])
+
+    # Convert existing integer positions (highest first) into increasing rank keys
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT id, user_id FROM task ORDER BY user_id, position DESC, id"
+    )).fetchall()
+
+    updates = []
+    previous_user, n = None, 0
+    for task_id, user_id in rows:
+        if user_id != previous_user:
+            previous_user, n = user_id, 0
+        updates.append({"id": task_id, "rank": nth_rank(n)})
+        n += 1
+
+    if updates:
+        conn.execute(sa.text("UPDATE task SET rank = :rank WHERE id = :id"), updates)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_user_rank', table_name='task')
+    op.drop_column('task', 'rank')
@@ -0,0 +1,48 @@
+"""add task search vector
+
+Revision ID: c7d3e9f1a5b2
+Revises: a8d2c5f7e9b1
+Create Date: 2026-10-19 09:12:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d3e9f1a5b2'
+down_revision = 'a8d2c5f7e9b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Full-text search over titles (weight A) and descriptions (weight B), kept
+    # up to date by Postgres as a stored generated column
+    op.add_column('task', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    # Serves GET /tasks/search. btree_gin lets one GIN index hold user_id too, so
+    # a search only visits the user's entries instead of intersecting matches
+    # from every user with a second index; deleted tasks are never searched
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    op.create_index(
+        'ix_task_user_search_vector',
+        'task',
+        ['user_id', 'search_vector'],
+        postgresql_using='gin',
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_user_search_vector', table_name='task')
+    op.drop_column('task', 'search_vector')
@@ -0,0 +1,36 @@
+"""add max_task_position to user
+
+Revision ID: e7f1a9c3d2b4
+Revises: c4e8a1f2b3d5
+Create Date: 2026-02-23 11:05:37.902441
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7f1a9c3d2b4'
+down_revision = 'c4e8a1f2b3d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('max_task_position', sa.Integer(), nullable=True))
+
+    # Seed the counter from the current top of each user's board
+    op.execute("""
+        UPDATE "user" SET max_task_position = t.max_position
+        FROM (
+            SELECT user_id, max(position) AS max_position
+            FROM task
+            WHERE deleted_at IS NULL
+            GROUP BY user_id
+        ) AS t
+        WHERE "user".id = t.user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'max_task_position')
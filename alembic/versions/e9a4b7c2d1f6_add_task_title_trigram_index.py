@@ -0,0 +1,35 @@
+"""add task title trigram index
+
+Revision ID: e9a4b7c2d1f6
+Revises: c7d3e9f1a5b2
+Create Date: 2026-10-19 14:03:51.270913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9a4b7c2d1f6'
+down_revision = 'c7d3e9f1a5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the substring matches of GET /tasks/suggest (title ILIKE '%...%'),
+    # which a btree can't; user_id is in the same GIN index (btree_gin, created
+    # by the search vector migration) so only the user's titles are visited
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_task_user_title_trgm',
+        'task',
+        ['user_id', 'title'],
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'},
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_user_title_trgm', table_name='task')
@@ -0,0 +1,26 @@
+"""add list versions to user
+
+Revision ID: f3b9d6e1a2c7
+Revises: e7f1a9c3d2b4
+Create Date: 2026-02-24 09:41:12.518306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9d6e1a2c7'
+down_revision = 'e7f1a9c3d2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('task_list_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user', sa.Column('notification_list_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'notification_list_version')
+    op.drop_column('user', 'task_list_version')
@@ -0,0 +1,40 @@
+"""add task due date and created at indexes
+
+Revision ID: f5c8e2a7b3d9
+Revises: e9a4b7c2d1f6
+Create Date: 2026-10-19 17:26:08.904125
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5c8e2a7b3d9'
+down_revision = 'e9a4b7c2d1f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GET /tasks filters and sorts (TaskService.list_query): due date windows,
+    # overdue and has/no due date read the first, created_after the second.
+    # With id, each also holds the full order of sort=due_date / sort=created_at
+    # (scanned backwards). updated_since uses ix_task_user_updated_at.
+    op.create_index(
+        'ix_task_user_due_date',
+        'task',
+        ['user_id', 'due_date', 'id'],
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_task_user_created_at',
+        'task',
+        ['user_id', 'created_at', 'id'],
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_user_created_at', table_name='task')
+    op.drop_index('ix_task_user_due_date', table_name='task')
@@ -4,8 +4,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.auth import AuthRequest, TokenResponse, RefreshRequest
 from app.services.auth import AuthService
 from app.core.database import get_db
+from app.api.deps import rate_limit_client
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], dependencies=[Depends(rate_limit_client)])
 
 @router.post("/signin", response_model=TokenResponse)
 async def signin(signin_data: AuthRequest, db: AsyncSession = Depends(get_db)):
@@ -1,31 +1,146 @@
-import json
-import urllib.request
-from fastapi import Depends, HTTPException, status
+import logging
+import math
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, replica_session, replicas_enabled
+from app.core.jwks import jwks_cache
 from app.models.user import User
+from app.services.rate_limiter import RateLimiter
+from app.services.read_your_writes import ReadYourWrites
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Methods that never write, so they don't pin the user to the primary
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.PROJECT_NAME}/auth/signin" # Placeholder, adjust if needed
 )
 
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.PROJECT_NAME}/auth/signin",
+    auto_error=False
+)
+
 async def get_current_user(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     token: str = Depends(reusable_oauth2)
 ) -> User:
+    user = await authenticate(db, token)
+    if replicas_enabled() and request.method not in SAFE_METHODS:
+        await ReadYourWrites.mark_write(user.id)
+    return user
+
+async def _enforce_rate_limit(request: Request, caller: str, per_minute: int) -> None:
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    # One bucket per route, so polling one endpoint doesn't use up the others
+    route = request.scope.get("route")
+    path = route.path if route is not None else request.url.path
+    retry_after = await RateLimiter.acquire(f"{caller}:{request.method}:{path}", per_minute, 60)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+async def rate_limit_user(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+) -> None:
+    """
+    Per-user rate limit, enforced before the endpoint (and its queries) runs.
+    Reads and writes have separate budgets.
+    """
+    per_minute = (
+        settings.RATE_LIMIT_READS_PER_MINUTE if request.method in SAFE_METHODS
+        else settings.RATE_LIMIT_WRITES_PER_MINUTE
+    )
+    await _enforce_rate_limit(request, f"user:{current_user.id}", per_minute)
+
+def client_ip(request: Request) -> str:
+    """
+    The viewer's IP address. Behind CloudFront the connection comes from an edge
+    server shared by many users; the viewer's own address (and source port) is in
+    CloudFront-Viewer-Address, e.g. "198.51.100.10:46532" or "2001:db8::1:46532".
+    """
+    viewer = request.headers.get("cloudfront-viewer-address")
+    if viewer and ":" in viewer:
+        return viewer.rpartition(":")[0].strip("[]")
+    return request.client.host if request.client else "unknown"
+
+async def rate_limit_client(request: Request) -> None:
+    """Per-IP rate limit for unauthenticated endpoints, checked before Cognito is called."""
+    await _enforce_rate_limit(request, f"ip:{client_ip(request)}", settings.RATE_LIMIT_AUTH_PER_MINUTE)
+
+async def get_read_db(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Session for read-only endpoints: a read replica, unless the user wrote within
+    READ_YOUR_WRITES_SECONDS or the replica hasn't replayed the user's latest
+    list versions yet (the ETags are built from the primary's). Falls back to
+    the primary session when the replica can't be used.
+    """
+    if not replicas_enabled() or await ReadYourWrites.on_primary(current_user.id):
+        yield db
+        return
+
+    replica = replica_session()
+    try:
+        versions = (await replica.execute(
+            select(User.task_list_version, User.notification_list_version).where(User.id == current_user.id)
+        )).one_or_none()
+    except Exception as e:
+        logger.warning(f"Read replica unavailable, using the primary: {e}")
+        versions = None
+
+    if versions != (current_user.task_list_version, current_user.notification_list_version):
+        await replica.close()
+        yield db
+        return
+
+    # Only the replica is needed from here: give the primary connection back
+    await db.close()
+    try:
+        yield replica
+    finally:
+        await replica.close()
+
+async def get_stream_user(
+    db: AsyncSession = Depends(get_db),
+    token: Optional[str] = Depends(optional_oauth2),
+    access_token: Optional[str] = Query(None)
+) -> User:
+    """
+    Like get_current_user, but also accepts the token as an access_token query
+    parameter, since browsers cannot set headers on EventSource / WebSocket requests.
+    """
+    token = token or access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+    return await authenticate(db, token)
+
+async def authenticate(db: AsyncSession, token: str) -> User:
+    """
+    Verify a Cognito access token and return the matching local user.
+    """
     try:
-        # 1. Get Cognito JWKS (JSON Web Key Set)
-        # In a production app, you might want to cache this.
+        # 1. Find the signing key in Cognito's JWKS (JSON Web Key Set),
+        # cached in-process and preloaded at start-up
         region = settings.COGNITO_REGION
         user_pool_id = settings.COGNITO_USER_POOL_ID
-        jwks_url = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}/.well-known/jwks.json"
-        
-        with urllib.request.urlopen(jwks_url) as response:
-            jwks = json.loads(response.read().decode())
 
         # 2. Decode and verify the token
         # For simplicity in this step, we'll use jose.jwt.decode
@@ -35,11 +150,7 @@ async def get_current_user(
         unverified_header = jwt.get_unverified_header(token)
         kid = unverified_header.get("kid")
         
-        key = None
-        for k in jwks.get("keys", []):
-            if k["kid"] == kid:
-                key = k
-                break
+        key = await jwks_cache.get_key(kid)
         
         if not key:
             raise HTTPException(
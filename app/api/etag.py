@@ -0,0 +1,54 @@
+"""
+Conditional GET support for per-user list endpoints.
+ETags are derived from the user's list version stamps (see
+app/services/list_version.py), which get_current_user has already loaded, so a
+matching If-None-Match is answered 304 before the list is queried.
+"""
+import hashlib
+from fastapi import Request, Response, status
+from app.models.user import User
+
+# Browsers may keep the list but must revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def list_etag(user: User, scope: str, *parts) -> str:
+    """
+    Weak ETag for one of the user's lists. parts are the version stamps the
+    list depends on plus any query parameters that shape the response.
+    The user's version is read before the list itself, so the list a tag is
+    sent with is never older than the tag.
+    """
+    key = repr((str(user.id), scope) + parts).encode()
+    return f'W/"{hashlib.blake2b(key, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Weak comparison of etag against the request's If-None-Match header.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def etag_headers(etag: str) -> dict:
+    """
+    Validator headers, for endpoints that build their own Response.
+    """
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Empty 304 response carrying the current validator.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers.update(etag_headers(etag))
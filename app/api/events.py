@@ -0,0 +1,154 @@
+import asyncio
+import json
+import anyio
+from contextlib import suppress
+from typing import AsyncIterator, Optional
+from uuid import uuid4
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_stream_user, authenticate
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.user import User
+from app.services.events import broker
+from app.services.connection_registry import ConnectionRegistry
+
+router = APIRouter(tags=["events"])
+
+# SSE comment line: keeps proxies from closing idle streams, costs no lookups
+HEARTBEAT = b": keep-alive\n\n"
+HEARTBEAT_MESSAGE = json.dumps({"type": "heartbeat", "data": {}})
+
+
+def format_event(message: str) -> bytes:
+    """Render a published event as an SSE frame."""
+    event = json.loads(message)
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n".encode()
+
+
+async def event_stream(queue: asyncio.Queue, heartbeat: float) -> AsyncIterator[bytes]:
+    """
+    Yield SSE frames from a broker queue, or a heartbeat when idle for too long.
+    Ends when the broker closes the queue (None).
+    """
+    while True:
+        try:
+            message = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+        except asyncio.TimeoutError:
+            yield HEARTBEAT
+            continue
+        if message is None:
+            return
+        yield format_event(message)
+
+
+@router.get("/events")
+async def stream_events(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_stream_user)
+):
+    """
+    Server-sent events with the authenticated user's task changes and notification
+    status changes. On (re)connect, and on a "resync" event, clients should catch
+    up with GET /tasks/changes before applying further events.
+    """
+    # The stream can stay open for hours: give the connection back to the pool now
+    await db.close()
+
+    user_id = current_user.id
+    try:
+        queue = await broker.subscribe(user_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live events are temporarily unavailable"
+        )
+
+    async def frames():
+        try:
+            yield HEARTBEAT
+            async for frame in event_stream(queue, settings.EVENTS_HEARTBEAT_SECONDS):
+                yield frame
+        finally:
+            # Runs on client disconnect, i.e. under cancellation
+            with anyio.CancelScope(shield=True):
+                await broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def websocket_gateway(
+    websocket: WebSocket,
+    access_token: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    WebSocket push channel carrying the same events as GET /events plus in-app
+    notifications. While the socket is open the user is listed in the connection
+    registry, so the notification sender delivers here instead of through FCM.
+    """
+    try:
+        current_user = await authenticate(db, access_token or "")
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    finally:
+        await db.close()
+
+    await websocket.accept()
+    user_id = current_user.id
+    connection_id = uuid4().hex
+    queue = None
+
+    async def push():
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Idle: keep the socket warm
+                await websocket.send_text(HEARTBEAT_MESSAGE)
+                continue
+            if message is None:
+                return
+            await websocket.send_text(message)
+
+    async def refresh():
+        # On a clock of its own: a busy socket may never idle long enough for a heartbeat
+        while True:
+            await asyncio.sleep(settings.WS_CONNECTION_REFRESH_SECONDS)
+            await ConnectionRegistry.register(user_id, connection_id)
+
+    async def receive():
+        # Clients only listen; reading is how a disconnect is noticed
+        while True:
+            await websocket.receive_text()
+
+    tasks = []
+    try:
+        queue = await broker.subscribe(user_id)
+        await ConnectionRegistry.register(user_id, connection_id)
+
+        tasks = [asyncio.create_task(push()), asyncio.create_task(receive()), asyncio.create_task(refresh())]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        if any(task.exception() for task in done):
+            raise next(task.exception() for task in done if task.exception())
+        # The broker closed the stream: ask the client to reconnect
+        await websocket.close(code=status.WS_1012_SERVICE_RESTART)
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        with suppress(Exception):
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        for task in tasks:
+            task.cancel()
+        with anyio.CancelScope(shield=True):
+            await ConnectionRegistry.unregister(user_id, connection_id)
+            if queue is not None:
+                await broker.unsubscribe(user_id, queue)
@@ -0,0 +1,147 @@
+"""
+Idempotency-Key support for write endpoints.
+Routers opt in with route_class=IdempotentRoute and the idempotency_key
+dependency. A write sent with an Idempotency-Key header runs once per user and
+key; retries within IDEMPOTENCY_TTL_SECONDS get the stored response back,
+marked with Idempotent-Replayed, without reaching the endpoint. A retry
+arriving while the first request still runs waits for its response.
+Only successful (2xx and 3xx) responses are stored: a request answered with an
+error, raised or returned, releases its key so a retry runs it again.
+Requests without the header are unaffected.
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+from typing import Callable
+from uuid import uuid4
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from app.api.deps import SAFE_METHODS, get_current_user
+from app.models.user import User
+from app.services.idempotency import IdempotencyStore
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+# Set again for the replayed body (compression runs outside the route, per response)
+SKIPPED_HEADERS = {"content-length", "content-encoding"}
+
+
+class IdempotentReplay(Exception):
+    """Raised by idempotency_key to answer with a stored response instead of running the endpoint."""
+
+    def __init__(self, response: Response):
+        self.response = response
+
+
+def _fingerprint(request: Request, body: bytes) -> str:
+    # The same key reused for a different write is a client bug, not a retry
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _stored(response: Response) -> dict:
+    return {
+        "status": response.status_code,
+        "headers": [
+            [name.decode("latin-1"), value.decode("latin-1")]
+            for name, value in response.raw_headers
+            if name.decode("latin-1").lower() not in SKIPPED_HEADERS
+        ],
+        "body": base64.b64encode(response.body).decode(),
+    }
+
+
+def _replayed(stored: dict) -> Response:
+    response = Response(content=base64.b64decode(stored["body"]), status_code=stored["status"])
+    for name, value in stored["headers"]:
+        response.headers.append(name, value)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+async def idempotency_key(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+) -> None:
+    """
+    Claim the request's Idempotency-Key, or replay the response stored for it.
+    Without Redis, writes run as if no key had been sent.
+    """
+    key = request.headers.get("idempotency-key")
+    if key is None or request.method in SAFE_METHODS:
+        return
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+        )
+
+    fingerprint = _fingerprint(request, await request.body())
+    owner = uuid4().hex
+    try:
+        record = await IdempotencyStore.claim(current_user.id, key, fingerprint, owner)
+    except Exception as e:
+        logger.warning(f"Idempotency keys unavailable, running the request: {e}")
+        return
+
+    if record is None:
+        claim = (current_user.id, key, fingerprint, owner)
+        request.state.idempotency = claim
+        # Stopped by IdempotentRoute once the response is stored or the claim released
+        request.state.idempotency_hold = asyncio.create_task(IdempotencyStore.hold(*claim))
+        return
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    if "response" not in record:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed",
+            headers={"Retry-After": "1"}
+        )
+    raise IdempotentReplay(_replayed(record["response"]))
+
+
+def _end_hold(request: Request):
+    """Stop renewing the request's claim, if it made one, and return the claim."""
+    hold = getattr(request.state, "idempotency_hold", None)
+    if hold is not None:
+        hold.cancel()
+    return getattr(request.state, "idempotency", None)
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route that stores the response of requests whose Idempotency-Key was
+    claimed by idempotency_key, and answers replays.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except IdempotentReplay as replay:
+                return replay.response
+            except BaseException:
+                claim = _end_hold(request)
+                if claim is not None:
+                    await IdempotencyStore.release(*claim)
+                raise
+
+            claim = _end_hold(request)
+            if claim is not None:
+                if response.status_code < 400 and isinstance(getattr(response, "body", None), bytes):
+                    await IdempotencyStore.complete(*claim, _stored(response))
+                else:
+                    await IdempotencyStore.release(*claim)
+            return response
+
+        return route_handler
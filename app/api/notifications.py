@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.notification import DeviceTokenCreate, DeviceTokenResponse, NotificationResponse, MarkReadRequest, NotificationPaginated
 from app.services.notification import NotificationService
-from app.api.deps import get_current_user
+from app.services.single_flight import read_flights
+from app.api.deps import get_current_user, get_read_db, rate_limit_user
+from app.api.idempotency import IdempotentRoute, idempotency_key
+from app.api.etag import list_etag, etag_matches, not_modified, set_etag
 from app.core.database import get_db
 from app.models.user import User
 from typing import List
 from uuid import UUID
 
-router = APIRouter(prefix="/notifications", tags=["notifications"])
+router = APIRouter(
+    prefix="/notifications",
+    tags=["notifications"],
+    route_class=IdempotentRoute,
+    dependencies=[Depends(rate_limit_user), Depends(idempotency_key)]
+)
 
 @router.post("/devices", response_model=DeviceTokenResponse, status_code=status.HTTP_201_CREATED)
 async def register_device(
@@ -40,22 +48,43 @@ async def unregister_device(
 
 @router.get("", response_model=NotificationPaginated)
 async def list_notifications(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     List sent notifications for the authenticated user with pagination and metadata, newest first.
+    Answers 304 without loading the notifications when If-None-Match carries the current ETag.
     """
-    items, total, unread = await NotificationService.get_notifications_for_user(db, current_user.id, skip=skip, limit=limit)
-    return NotificationPaginated(
-        items=items,
-        total=total,
-        unread=unread,
-        skip=skip,
-        limit=limit
+    # Notification titles and messages are rendered from their tasks, so both versions count
+    etag = list_etag(
+        current_user,
+        "notifications",
+        current_user.notification_list_version,
+        current_user.task_list_version,
+        skip,
+        limit
     )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    set_etag(response, etag)
+
+    async def load() -> NotificationPaginated:
+        items, total, unread = await NotificationService.get_notifications_for_user(db, current_user.id, skip=skip, limit=limit)
+        return NotificationPaginated(
+            items=items,
+            total=total,
+            unread=unread,
+            skip=skip,
+            limit=limit
+        )
+
+    # Identical requests in flight share one query
+    return await read_flights.do(etag, load)
 
 @router.patch("/read", response_model=dict)
 async def mark_all_notifications_as_read(
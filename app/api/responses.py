@@ -0,0 +1,19 @@
+"""
+Response classes for endpoints that return large payloads.
+"""
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded by pydantic-core instead of the standard library.
+    Bytes are sent as they are, so endpoints can hand over JSON already
+    produced by a TypeAdapter's dump_json without decoding it again.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content)
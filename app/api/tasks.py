@@ -1,26 +1,223 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Query, status, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.task import Task, TaskCreate, TaskUpdate, TaskMove
-from app.services.task import TaskService
-from app.api.deps import get_current_user
+from app.schemas.task import (
+    Task, TaskCreate, TaskUpdate, TaskMove, TaskChanges, TaskSearchResults, TaskFilters, TaskSort, task_projection
+)
+from app.services.task import TaskService, SUGGEST_COLUMNS
+from app.services.task_sync import TaskSync, encode_cursor, decode_cursor
+from app.services.task_list_cache import TaskListCache
+from app.services.single_flight import read_flights
+from app.api.deps import get_current_user, get_read_db, rate_limit_user
+from app.api.idempotency import IdempotentRoute, idempotency_key
+from app.api.etag import list_etag, etag_matches, not_modified, etag_headers
+from app.api.responses import FastJSONResponse
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
 from app.models.task import TaskStatus
-from typing import List, Optional
+from pydantic import TypeAdapter
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from uuid import UUID
+from datetime import datetime, timezone
 
-router = APIRouter(prefix="/tasks", tags=["tasks"])
+router = APIRouter(
+    prefix="/tasks",
+    tags=["tasks"],
+    route_class=IdempotentRoute,
+    dependencies=[Depends(rate_limit_user), Depends(idempotency_key)]
+)
 
-@router.get("", response_model=List[Task])
+# Validates and encodes a whole board in one call instead of one model at a time
+task_list_adapter = TypeAdapter(List[Task])
+
+# Fields of a title suggestion
+SUGGEST_FIELDS = tuple(column.key for column in SUGGEST_COLUMNS)
+
+@lru_cache(maxsize=None)
+def projection_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(List[task_projection(fields)])
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Turn ?fields=a,b into a canonical field tuple in schema order, always
+    including id. None means the full task.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - Task.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    requested.add("id")
+    if requested == Task.model_fields.keys():
+        return None
+    return tuple(name for name in Task.model_fields if name in requested)
+
+def parse_filters(
+    due_after: Optional[datetime],
+    due_before: Optional[datetime],
+    overdue: bool,
+    updated_since: Optional[datetime],
+    created_after: Optional[datetime],
+    has_due_date: Optional[bool]
+) -> Optional[TaskFilters]:
+    """
+    TaskFilters for the list query, or None without any filter. overdue is
+    evaluated at the current minute, which is part of the ETag, so cached lists
+    pick up tasks falling overdue within a minute without any write.
+    """
+    if due_after is not None and due_before is not None and due_after >= due_before:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="due_after must be earlier than due_before"
+        )
+    if not overdue and all(value is None for value in (due_after, due_before, updated_since, created_after, has_due_date)):
+        return None
+    return TaskFilters(
+        due_after=due_after,
+        due_before=due_before,
+        overdue_at=datetime.now(timezone.utc).replace(second=0, microsecond=0) if overdue else None,
+        updated_since=updated_since,
+        created_after=created_after,
+        has_due_date=has_due_date
+    )
+
+@router.get("", response_model=List[Task], response_class=FastJSONResponse)
 async def get_tasks(
+    request: Request,
     status: Optional[TaskStatus] = None,
-    db: AsyncSession = Depends(get_db),
+    fields: Optional[str] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    overdue: bool = False,
+    updated_since: Optional[datetime] = None,
+    created_after: Optional[datetime] = None,
+    has_due_date: Optional[bool] = None,
+    sort: TaskSort = TaskSort.POSITION,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all tasks for the authenticated user, optionally filtered by status.
+    Get all tasks for the authenticated user, optionally filtered by status,
+    due date window (due_after inclusive, due_before exclusive), overdue (not
+    done and past due), updated_since, created_after and has_due_date.
+    sort=due_date lists the soonest due first (undated last), sort=created_at
+    the newest first; by default tasks come in board order.
+    fields (e.g. ?fields=id,title,status,position,due_date) returns only those
+    task fields plus id; only the matching columns are read from the database.
+    Answers 304 without loading the tasks when If-None-Match carries the current ETag.
+    The list is serialized here rather than through response_model: the rows are
+    validated in one pass and written straight to JSON bytes, which are cached
+    in Redis under the ETag and shared with identical requests in flight.
     """
-    return await TaskService.get_tasks(db, current_user.id, status)
+    projection = parse_fields(fields)
+    filters = parse_filters(due_after, due_before, overdue, updated_since, created_after, has_due_date)
+    etag = list_etag(
+        current_user, "tasks", current_user.task_list_version, status, settings.TASK_ORDERING_ENGINE, projection,
+        sort.value, filters.model_dump_json() if filters else None
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async def load() -> bytes:
+        adapter = task_list_adapter if projection is None else projection_adapter(projection)
+        rows = await TaskService.get_tasks(db, current_user.id, status, projection, filters, sort)
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    # Identical requests in flight (several open tabs refreshing) share one load
+    body = await read_flights.do(etag, lambda: TaskListCache.get_or_load(etag, load))
+    return FastJSONResponse(body, headers=etag_headers(etag))
+
+@router.get("/search", response_model=TaskSearchResults)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Search the authenticated user's tasks by title and description, best
+    matches first, paginated with skip and limit.
+    """
+    rows, total = await TaskService.search_tasks(db, current_user.id, q, skip=skip, limit=limit)
+    return TaskSearchResults(
+        items=task_list_adapter.validate_python(rows, from_attributes=True),
+        total=total,
+        skip=skip,
+        limit=limit
+    )
+
+@router.get("/suggest", response_model=List[task_projection(SUGGEST_FIELDS)], response_class=FastJSONResponse)
+async def suggest_tasks(
+    request: Request,
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(settings.TASK_SUGGEST_LIMIT, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Up to limit of the authenticated user's tasks whose title contains prefix,
+    titles starting with it first, for as-you-type lookups (id, title, status
+    and due_date only). Results are cached briefly per user and prefix, and
+    invalidated by any task write like the list's ETag. Answers 503 when the
+    lookup exceeds TASK_SUGGEST_TIMEOUT_MS.
+    """
+    etag = list_etag(current_user, "suggest", current_user.task_list_version, prefix.lower(), limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async def load() -> bytes:
+        adapter = projection_adapter(SUGGEST_FIELDS)
+        rows = await TaskService.suggest_tasks(db, current_user.id, prefix, limit)
+        if rows is None:
+            # Not cached: the next keystroke tries again
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Task suggestions took too long"
+            )
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    body = await read_flights.do(
+        etag, lambda: TaskListCache.get_or_load(etag, load, ttl=settings.TASK_SUGGEST_CACHE_TTL_SECONDS)
+    )
+    return FastJSONResponse(body, headers=etag_headers(etag))
+
+@router.get("/changes", response_model=TaskChanges)
+async def get_task_changes(
+    since: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the tasks created, updated, moved or soft-deleted since a cursor returned
+    by a previous call (the whole board when omitted). Soft-deleted tasks come
+    back as tombstones. Keep calling with the returned cursor while has_more is set.
+    """
+    try:
+        since_key = decode_cursor(since) if since else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    async def load() -> TaskChanges:
+        changed, deleted, next_key, has_more = await TaskSync.get_changes(db, current_user.id, since_key)
+        return TaskChanges(
+            changed=changed,
+            deleted=deleted,
+            cursor=encode_cursor(next_key),
+            has_more=has_more
+        )
+
+    # The list version is part of the key, so a sync started after a write never
+    # gets the result of one started before it
+    return await read_flights.do(("changes", current_user.id, current_user.task_list_version, since), load)
 
 @router.post("", response_model=Task, status_code=status.HTTP_201_CREATED)
 async def create_task(
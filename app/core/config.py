@@ -1,6 +1,7 @@
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
-from typing import Optional, Any
+from typing import Optional, Any, Literal, Tuple
+import os
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Task Tracker API"
@@ -13,6 +14,8 @@ class Settings(BaseSettings):
     
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_MAX_CONNECTIONS: int = 50             # Per process (API worker or Celery worker process)
+    REDIS_POOL_TIMEOUT_SECONDS: float = 2       # Wait for a free pooled connection before failing
 
     COGNITO_USER_POOL_ID: str
     COGNITO_APP_CLIENT_ID: str
@@ -32,11 +35,110 @@ class Settings(BaseSettings):
     NOTIFICATION_QUIET_HOURS_START: int = 22    # Don't send after 10 PM
     NOTIFICATION_QUIET_HOURS_END: int = 8       # Don't send before 8 AM
 
+    # Task ordering
+    TASK_ORDERING_ENGINE: Literal["position", "rank"] = "position"  # "position" (integer gaps) or "rank" (lexicographic keys)
+    TASK_POSITION_REBALANCE_MIN_GAP: int = 8    # Re-gap users with tasks closer than this
+
+    # Delta sync
+    TASK_CHANGES_PAGE_SIZE: int = 500           # Max changed tasks per /tasks/changes page
+    TASK_CHANGES_SAFETY_WINDOW_SECONDS: int = 30  # Cursors never pass now() minus this
+
+    # Live events (GET /events)
+    EVENTS_HEARTBEAT_SECONDS: int = 15          # Idle streams get a comment line this often
+    EVENTS_QUEUE_SIZE: int = 100                # Undelivered events kept per stream before a resync
+    WS_CONNECTION_TTL_SECONDS: int = 60         # Registry entries of sockets not refreshed for this long expire
+    WS_CONNECTION_REFRESH_SECONDS: int = 20     # Open sockets refresh their registry entry this often
+
+    # Task list cache (Redis)
+    TASK_LIST_CACHE_TTL_SECONDS: int = 300      # 0 disables the cache
+    TASK_LIST_CACHE_LOCK_MS: int = 2000         # Max time other requests wait for a rebuild in progress
+
+    # Task title suggestions (GET /tasks/suggest)
+    TASK_SUGGEST_LIMIT: int = 10                # Suggestions returned unless the request asks for fewer or more
+    TASK_SUGGEST_CACHE_TTL_SECONDS: int = 30    # Repeated keystrokes are answered from Redis; 0 disables
+    TASK_SUGGEST_TIMEOUT_MS: int = 200          # Slower suggestion queries are cancelled and return nothing
+
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1024            # Smaller bodies are sent uncompressed
+    COMPRESSION_CACHE_ENTRIES: int = 256        # Compressed ETagged bodies kept per process
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4         # Used when the brotli package is installed
+    COMPRESSION_ZSTD_LEVEL: int = 3             # Used when the zstandard package is installed
+
     @property
     def backend_cors_origins(self) -> list[str]:
         return [i.strip() for i in self.BACKEND_CORS_ORIGINS.split(",") if i.strip()]
 
     DATABASE_URL: Optional[str] = None
+    DB_ECHO: bool = False                       # Log every SQL statement
+
+    # Database pools: each API worker process gets at most DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # connections per engine, shrunk so all workers together stay under Postgres' limit
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_MAX_CONNECTIONS: int = 100               # The server's max_connections
+    DB_RESERVED_CONNECTIONS: int = 20           # Left for Celery, migrations and admin sessions
+
+    # Production server (gunicorn.conf.py)
+    WEB_BIND: str = "0.0.0.0:8000"
+    WEB_CONCURRENCY: int = 0                    # Worker processes; 0 means one per available CPU
+    WEB_KEEPALIVE_SECONDS: int = 5              # Idle keep-alive connections are closed after this long
+    WEB_BACKLOG: int = 2048                     # Pending connections queued by the kernel
+    WEB_MAX_REQUESTS: int = 10000               # A worker is recycled after this many requests; 0 never
+    WEB_MAX_REQUESTS_JITTER: int = 1000         # ... plus up to this many, so workers don't restart together
+    WEB_TIMEOUT_SECONDS: int = 60               # Unresponsive workers are killed after this long
+    WEB_GRACEFUL_TIMEOUT_SECONDS: int = 30      # Time a recycled worker gets to finish its requests
+
+    @property
+    def web_workers(self) -> int:
+        if self.WEB_CONCURRENCY > 0:
+            return self.WEB_CONCURRENCY
+        # CPUs this process may run on, which containers can limit below os.cpu_count()
+        if hasattr(os, "sched_getaffinity"):
+            return max(len(os.sched_getaffinity(0)), 1)
+        return os.cpu_count() or 1
+
+    def db_pool_limits(self) -> Tuple[int, int]:
+        """(pool_size, max_overflow) of one worker's engine, within its share of max_connections."""
+        share = max((self.DB_MAX_CONNECTIONS - self.DB_RESERVED_CONNECTIONS) // self.web_workers, 1)
+        pool_size = min(self.DB_POOL_SIZE, share)
+        return pool_size, max(min(self.DB_MAX_OVERFLOW, share - pool_size), 0)
+
+    # Rate limits (Redis token buckets): requests per minute for each caller and
+    # route, which is also the largest burst let through at once
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_READS_PER_MINUTE: int = 120      # Per user, GET endpoints
+    RATE_LIMIT_WRITES_PER_MINUTE: int = 60      # Per user, endpoints that change data
+    RATE_LIMIT_AUTH_PER_MINUTE: int = 10        # Per client IP, /auth/*
+
+    # Idempotency-Key header on task and notification writes
+    IDEMPOTENCY_TTL_SECONDS: int = 86400        # Responses are replayed to retries this long
+    IDEMPOTENCY_LOCK_MS: int = 10000            # Max time a retry waits for the first request to finish
+    IDEMPOTENCY_CLAIM_SECONDS: int = 60         # Claims are renewed while the request runs; a crashed one's lapses after this
+
+    # Start-up warm-up
+    DB_WARM_CONNECTIONS: int = 5                # Connections opened per engine before serving
+    JWKS_CACHE_SECONDS: int = 3600              # Cognito signing keys are refetched after this long
+    JWKS_MIN_REFRESH_SECONDS: int = 30          # ... or on an unknown key id, at most this often
+
+    # Readiness (GET /ready): beyond these the instance reports itself overloaded
+    READY_MAX_DB_POOL_USAGE: float = 0.9        # Share of pool_size + max_overflow checked out
+    READY_MAX_REDIS_LATENCY_MS: float = 50
+    READY_MAX_LOOP_LAG_MS: float = 100
+    READY_CHECK_TIMEOUT_SECONDS: float = 1      # Per network check (database, Redis)
+
+    # Event-loop monitor
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.5  # How often the loop's scheduling lag is sampled
+    LOOP_BLOCKING_THRESHOLD_MS: float = 100     # Lag counted (and logged) as a stall
+    LOOP_MONITOR_DEBUG: bool = False            # Also log the stack of every step holding the loop this long
+
+    # Read replicas: comma-separated URLs; empty sends every query to the primary
+    DATABASE_REPLICA_URLS: str = ""
+    READ_YOUR_WRITES_SECONDS: int = 5           # A user's reads stay on the primary this long after a write
+
+    @property
+    def database_replica_urls(self) -> list[str]:
+        return [i.strip() for i in self.DATABASE_REPLICA_URLS.split(",") if i.strip()]
 
     model_config = ConfigDict(
         case_sensitive=True,
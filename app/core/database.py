@@ -1,11 +1,24 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+import itertools
+import logging
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 from app.core.config import settings
 from contextlib import asynccontextmanager
 
+logger = logging.getLogger(__name__)
+
+
+def _api_engine(url: str) -> AsyncEngine:
+    # Every API worker process builds its own pool, sized by its share of max_connections
+    pool_size, max_overflow = settings.db_pool_limits()
+    return create_async_engine(url, echo=settings.DB_ECHO, pool_size=pool_size, max_overflow=max_overflow)
+
+
 # Create async engine for the main API
-engine = create_async_engine(settings.get_database_url(), echo=True)
+engine = _api_engine(settings.get_database_url())
 
 # Create async session factory for the main API
 AsyncSessionLocal = sessionmaker(
@@ -19,7 +32,7 @@ AsyncSessionLocal = sessionmaker(
 # Create async engine for workers (uses NullPool to avoid sharing/event loop issues)
 worker_engine = create_async_engine(
     settings.get_database_url(), 
-    echo=True,
+    echo=settings.DB_ECHO,
     poolclass=NullPool
 )
 
@@ -32,6 +45,50 @@ WorkerSessionLocal = sessionmaker(
     autoflush=False,
 )
 
+# Read replicas, used round-robin by replica sessions. Without any configured,
+# replica sessions are bound to the primary.
+replica_engines = [_api_engine(url) for url in settings.database_replica_urls]
+worker_replica_engines = [
+    create_async_engine(url, echo=settings.DB_ECHO, poolclass=NullPool) for url in settings.database_replica_urls
+]
+_next_replica = itertools.cycle(replica_engines or [engine])
+_next_worker_replica = itertools.cycle(worker_replica_engines or [worker_engine])
+
+
+def replicas_enabled() -> bool:
+    return bool(replica_engines)
+
+
+def replica_session() -> AsyncSession:
+    """API session bound to the next read replica. Reads only: replicas lag the primary."""
+    return AsyncSessionLocal(bind=next(_next_replica))
+
+async def _open_connections(db_engine: AsyncEngine, count: int) -> None:
+    async def connect():
+        async with db_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    # Concurrently, so each one checks out (and then pools) a separate connection
+    await asyncio.gather(*(connect() for _ in range(count)))
+
+
+async def warm_up_database(connections: int) -> None:
+    """
+    Open connections to the primary and each replica ahead of the first requests.
+    Failures are logged, not raised: requests connect on demand as before.
+    """
+    for db_engine in [engine, *replica_engines]:
+        try:
+            # More than pool_size would only be closed again as overflow
+            await _open_connections(db_engine, min(connections, db_engine.pool.size()))
+        except Exception as e:
+            logger.warning(f"Could not warm up {db_engine.url.render_as_string()}: {e}")
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection of the API engines (shutdown)."""
+    for db_engine in [engine, *replica_engines]:
+        await db_engine.dispose()
+
 # Dependency to get DB session
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -50,3 +107,13 @@ async def async_session_maker():
             yield session
         finally:
             await session.close()
+
+
+@asynccontextmanager
+async def replica_session_maker():
+    """Like async_session_maker, on the next read replica. For scans that tolerate lag."""
+    async with WorkerSessionLocal(bind=next(_next_worker_replica)) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,81 @@
+"""
+Cached Cognito JSON Web Key Set.
+The keys are fetched once, at start-up by the lifespan, and reused until
+JWKS_CACHE_SECONDS have passed or a token is signed with a key id we don't
+know (Cognito rotated its keys). Refetches for unknown key ids are throttled,
+so tokens with made-up kids can't turn into a request flood against Cognito.
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def jwks_url() -> str:
+    region = settings.COGNITO_REGION
+    user_pool_id = settings.COGNITO_USER_POOL_ID
+    return f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}/.well-known/jwks.json"
+
+
+class JWKSCache:
+    def __init__(self):
+        self._keys: Dict[str, dict] = {}
+        self._fetched_at: float = 0.0
+        self._attempted_at: float = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return time.monotonic() - self._fetched_at < settings.JWKS_CACHE_SECONDS
+
+    def age(self) -> Optional[float]:
+        """Seconds since the keys were fetched, None before the first fetch."""
+        return time.monotonic() - self._fetched_at if self._keys else None
+
+    async def get_key(self, kid: Optional[str]) -> Optional[dict]:
+        """The signing key with this id, fetching the key set if needed."""
+        if kid in self._keys and self._fresh():
+            return self._keys[kid]
+        await self._refresh_unless(lambda: kid in self._keys and self._fresh())
+        return self._keys.get(kid)
+
+    async def ensure_fresh(self) -> None:
+        """Refresh expired keys ahead of use (readiness checks), throttled like get_key."""
+        if not (self._keys and self._fresh()):
+            await self._refresh_unless(lambda: self._keys and self._fresh())
+
+    async def _refresh_unless(self, satisfied: Callable[[], bool]) -> None:
+        async with self._lock:
+            # Someone else may have refreshed while we waited for the lock
+            if satisfied():
+                return
+            if self._keys and time.monotonic() - self._attempted_at < settings.JWKS_MIN_REFRESH_SECONDS:
+                return
+            try:
+                await self.refresh()
+            except Exception as e:
+                if not self._keys:
+                    raise
+                logger.warning(f"Could not refresh JWKS, keeping the cached keys: {e}")
+
+    async def refresh(self) -> None:
+        self._attempted_at = time.monotonic()
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.get(jwks_url())
+            response.raise_for_status()
+            jwks = response.json()
+        self._keys = {key["kid"]: key for key in jwks.get("keys", [])}
+        self._fetched_at = time.monotonic()
+
+    async def preload(self) -> None:
+        """Fetch the key set ahead of the first request. Failures are logged, not raised."""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Could not preload JWKS, will fetch on first use: {e}")
+
+
+jwks_cache = JWKSCache()
@@ -0,0 +1,144 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+LoopMonitor sleeps for a fixed interval over and over and records how late it
+wakes up: that delay is time every other coroutine on the loop also waited, so
+it shows blocking calls (sync SDKs, CPU-heavy work) as they pile up. It is
+started by the lifespan and reported by GET /health and GET /ready.
+
+With LOOP_MONITOR_DEBUG on, a BlockingDetector thread also pings the loop and,
+when a ping isn't answered within LOOP_BLOCKING_THRESHOLD_MS, logs the stack
+of whatever is holding it. Tests use the same detector to fail on new
+blocking calls (see tests/test_loop_monitor.py).
+"""
+import asyncio
+import logging
+import sys
+import threading
+import traceback
+from collections import deque
+from contextlib import suppress
+from typing import List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    # Samples kept for max_lag_ms
+    WINDOW = 20
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._detector: Optional["BlockingDetector"] = None
+        self._samples: deque = deque(maxlen=self.WINDOW)
+        self.stalls = 0
+
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def lag(self) -> Optional[float]:
+        """Latest lag sample in seconds, None before the first one."""
+        return self._samples[-1] if self._samples else None
+
+    def stats(self) -> dict:
+        """Lag metrics in milliseconds. No I/O, cheap enough for liveness probes."""
+        return {
+            "lag_ms": None if not self._samples else round(self._samples[-1] * 1000, 1),
+            "max_lag_ms": None if not self._samples else round(max(self._samples) * 1000, 1),
+            "stalls": self.stalls,
+        }
+
+    def start(self) -> None:
+        """Start sampling on the running loop, plus the detector in debug mode."""
+        if self.running():
+            return
+        self._samples.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run(settings.LOOP_MONITOR_INTERVAL_SECONDS))
+        if settings.LOOP_MONITOR_DEBUG:
+            self._detector = BlockingDetector(settings.LOOP_BLOCKING_THRESHOLD_MS / 1000)
+            self._detector.start()
+
+    async def stop(self) -> None:
+        if self._detector is not None:
+            self._detector.stop()
+            self._detector = None
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def record(self, lag: float) -> None:
+        self._samples.append(lag)
+        if lag * 1000 >= settings.LOOP_BLOCKING_THRESHOLD_MS:
+            self.stalls += 1
+            logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms")
+
+    async def _run(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.record(max(loop.time() - start - interval, 0.0))
+
+
+class BlockingDetector:
+    """
+    Watchdog thread for the loop it is started on. It schedules a no-op on the
+    loop every threshold / 2 seconds; one that doesn't run within threshold means
+    a coroutine step (or callback) is holding the loop, and the loop thread's
+    stack is captured while it still is. Each stall is reported once.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        # Stacks of the stalls seen, oldest first
+        self.blocked: List[str] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "BlockingDetector":
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._watch, name="blocking-detector", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "BlockingDetector":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        return "".join(traceback.format_stack(frame)) if frame is not None else ""
+
+    def _watch(self) -> None:
+        while not self._stopped.is_set():
+            answered = threading.Event()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                return  # The loop was closed
+            if not answered.wait(self.threshold):
+                stack = self._stack()
+                self.blocked.append(stack)
+                logger.warning(
+                    f"Event loop blocked for more than {self.threshold * 1000:.0f} ms in:\n{stack}"
+                )
+                # Wait the stall out before pinging again
+                while not answered.wait(self.threshold) and not self._stopped.is_set():
+                    pass
+            self._stopped.wait(self.threshold / 2)
+
+
+loop_monitor = LoopMonitor()
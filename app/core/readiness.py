@@ -0,0 +1,75 @@
+"""
+Readiness checks behind GET /ready.
+Unlike GET /health (liveness: the process is up), these tell whether this
+instance can take more traffic right now, so the load balancer sheds load to
+healthy instances instead of queueing it behind an exhausted pool.
+"""
+import asyncio
+from typing import Dict, Tuple
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine
+from app.core.jwks import jwks_cache
+from app.core.loop_monitor import loop_monitor
+from app.core.redis import redis_latency
+
+
+async def _database() -> dict:
+    # The engine's pool was built with these limits (app.core.database)
+    capacity = sum(settings.db_pool_limits())
+    usage = engine.pool.checkedout() / capacity if capacity else 0.0
+    check = {"pool_usage": round(usage, 3), "limit": settings.READY_MAX_DB_POOL_USAGE}
+    if usage >= settings.READY_MAX_DB_POOL_USAGE:
+        return {"ok": False, **check}
+
+    async def select_one():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    try:
+        await asyncio.wait_for(select_one(), timeout=settings.READY_CHECK_TIMEOUT_SECONDS)
+    except Exception as e:
+        return {"ok": False, **check, "error": type(e).__name__}
+    return {"ok": True, **check}
+
+
+async def _redis() -> dict:
+    latency = await redis_latency(settings.READY_CHECK_TIMEOUT_SECONDS)
+    latency_ms = None if latency is None else round(latency * 1000, 1)
+    return {
+        "ok": latency_ms is not None and latency_ms <= settings.READY_MAX_REDIS_LATENCY_MS,
+        "latency_ms": latency_ms,
+        "limit": settings.READY_MAX_REDIS_LATENCY_MS,
+    }
+
+
+async def _jwks() -> dict:
+    # Expired keys are refreshed here too, so an idle instance doesn't go stale
+    try:
+        await asyncio.wait_for(jwks_cache.ensure_fresh(), timeout=settings.READY_CHECK_TIMEOUT_SECONDS)
+    except Exception:
+        pass
+    age = jwks_cache.age()
+    # Stale keys still verify tokens; only having none at all makes auth fail
+    return {"ok": age is not None, "age_seconds": None if age is None else int(age)}
+
+
+async def _loop_lag() -> dict:
+    # The monitor's latest sample; a point sample only until its first one
+    lag = loop_monitor.lag()
+    if lag is None:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.sleep(0)
+        lag = loop.time() - start
+    lag_ms = round(lag * 1000, 1)
+    return {"ok": lag_ms <= settings.READY_MAX_LOOP_LAG_MS, "lag_ms": lag_ms, "limit": settings.READY_MAX_LOOP_LAG_MS}
+
+
+async def check_readiness() -> Tuple[bool, Dict[str, dict]]:
+    """Run every check; ready only if all of them pass."""
+    # Timings are sampled one at a time, before the other checks add their own work
+    loop_lag = await _loop_lag()
+    redis = await _redis()
+    database, jwks = await asyncio.gather(_database(), _jwks())
+    checks = {"database": database, "redis": redis, "jwks": jwks, "event_loop": loop_lag}
+    return all(check["ok"] for check in checks.values()), checks
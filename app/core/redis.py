@@ -0,0 +1,129 @@
+"""
+Shared async Redis connections.
+Every feature (event fan-out, caches, registries) borrows from one bounded
+connection pool per event loop instead of connecting on its own. The API
+creates its pool in the lifespan and each Celery worker process in
+worker_process_init (see app.workers.tasks); code running on any other loop,
+e.g. tests, gets one on first use.
+"""
+import asyncio
+import logging
+import weakref
+from typing import Any, List, Optional, Sequence
+from redis.asyncio import BlockingConnectionPool, Redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pools can't be shared between event loops: the API runs a single loop, while
+# Celery tasks run on their worker process' loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Redis]" = weakref.WeakKeyDictionary()
+
+
+class _CountingConnectionPool(BlockingConnectionPool):
+    """
+    BlockingConnectionPool keeping its own counts of the connections it made and
+    has handed out, so usage is read without reaching into redis-py's internals.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened = 0
+        self.checked_out = set()
+
+    def make_connection(self):
+        connection = super().make_connection()
+        self.opened += 1
+        return connection
+
+    async def get_connection(self, *args, **kwargs):
+        # A connection that fails to connect is released by the base class
+        connection = await super().get_connection(*args, **kwargs)
+        self.checked_out.add(connection)
+        return connection
+
+    async def release(self, connection):
+        self.checked_out.discard(connection)
+        await super().release(connection)
+
+    def stats(self) -> dict:
+        return {"open": self.opened, "in_use": len(self.checked_out), "max": self.max_connections}
+
+
+def _create_client() -> Redis:
+    pool = _CountingConnectionPool.from_url(
+        settings.get_redis_url(),
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        # Callers wait this long for a free connection before getting an error
+        timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+        decode_responses=True,
+        socket_connect_timeout=1,
+        health_check_interval=30
+    )
+    return Redis(connection_pool=pool)
+
+
+def get_redis() -> Redis:
+    """Async Redis client on the running event loop's pool."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _create_client()
+        _clients[loop] = client
+    return client
+
+
+async def init_redis() -> Redis:
+    """
+    Create the running loop's pool and open its first connection. Redis being
+    down is logged, not raised: every feature using it degrades on its own.
+    """
+    client = get_redis()
+    try:
+        await client.ping()
+    except Exception as e:
+        logger.warning(f"Redis is not reachable yet: {e}")
+    return client
+
+
+async def close_redis() -> None:
+    """Disconnect the running loop's pool, if one was created."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+        await client.connection_pool.disconnect()
+
+
+async def pipelined(*commands: Sequence[Any], transaction: bool = False) -> List[Any]:
+    """
+    Send several commands in one round trip and return their replies in order,
+    e.g. pipelined(("SET", key, value, "EX", 60), ("DEL", lock)).
+    """
+    async with get_redis().pipeline(transaction=transaction) as pipe:
+        for command in commands:
+            pipe.execute_command(*command)
+        return await pipe.execute()
+
+
+def redis_pool_stats() -> dict:
+    """
+    Usage of the running loop's Redis pool. No I/O, cheap enough for liveness
+    probes, and empty rather than failing them when it can't be read.
+    """
+    try:
+        return get_redis().connection_pool.stats()
+    except Exception as e:
+        logger.warning(f"Could not read Redis pool usage: {e}")
+        return {}
+
+
+async def redis_latency(timeout: float) -> Optional[float]:
+    """Round trip of a PING in seconds, or None when Redis doesn't answer within timeout."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    try:
+        await asyncio.wait_for(get_redis().ping(), timeout=timeout)
+    except Exception as e:
+        logger.warning(f"Redis ping failed: {e}")
+        return None
+    return loop.time() - start
@@ -0,0 +1,10 @@
+"""
+Gunicorn worker for the production entry point (see gunicorn.conf.py).
+"""
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    # Explicit rather than "auto", so a missing uvloop or httptools fails at
+    # start-up instead of silently falling back to the slower pure-Python ones.
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
@@ -1,14 +1,44 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.redis import init_redis, close_redis, redis_pool_stats
+from app.core.readiness import check_readiness
+from app.core.database import warm_up_database, dispose_engines
+from app.core.jwks import jwks_cache
+from app.core.loop_monitor import loop_monitor
+from app.services.events import broker
+from app.services.single_flight import flight_stats, read_flights
+from app.services.task_list_cache import cache_stats, hit_rate
 from app.api.auth import router as auth_router
 from app.api.tasks import router as tasks_router
 from app.api.notifications import router as notifications_router
+from app.api.events import router as events_router
 from app.middleware.cloudfront import CloudFrontForwardedProtoMiddleware
+from app.middleware.compression import CompressionMiddleware
 
-app = FastAPI(title=settings.PROJECT_NAME, redirect_slashes=False)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pay for connections and key fetches before serving, not on the first requests
+    await asyncio.gather(
+        init_redis(),
+        warm_up_database(settings.DB_WARM_CONNECTIONS),
+        jwks_cache.preload()
+    )
+    loop_monitor.start()
+    yield
+    await loop_monitor.stop()
+    # Open event streams end first, so clients reconnect to another instance
+    await broker.close()
+    await close_redis()
+    await dispose_engines()
+
+app = FastAPI(title=settings.PROJECT_NAME, redirect_slashes=False, lifespan=lifespan)
 
 app.add_middleware(CloudFrontForwardedProtoMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 cors_kwargs = {
     "allow_credentials": True,
@@ -28,6 +58,7 @@ app.add_middleware(CORSMiddleware, **cors_kwargs)
 app.include_router(auth_router)
 app.include_router(tasks_router)
 app.include_router(notifications_router)
+app.include_router(events_router)
 
 @app.get("/")
 async def root():
@@ -35,4 +66,23 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    """
+    Liveness: no I/O, so it answers even when dependencies are struggling. Also
+    reports this worker process's counters since it started.
+    """
+    return {
+        "status": "ok",
+        "redis": {"connections": redis_pool_stats()},
+        "event_loop": loop_monitor.stats(),
+        "task_list_cache": {**cache_stats, "hit_rate": round(hit_rate(), 3)},
+        "single_flight": {**flight_stats, "in_flight": read_flights.in_flight()},
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 503 while this instance's database pool, Redis, JWKS or event loop is unhealthy."""
+    ready, checks = await check_readiness()
+    return JSONResponse(
+        {"status": "ready" if ready else "overloaded", "checks": checks},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
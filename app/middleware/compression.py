@@ -0,0 +1,233 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+Bodies below settings.COMPRESSION_MIN_SIZE are sent as they are. Brotli and
+zstd are used when their packages are installed, gzip otherwise. Responses
+carrying an ETag (the task and notification lists) keep their compressed
+bytes in a small per-process LRU keyed by the tag, so an unchanged list is
+compressed once rather than on every fetch. Event streams are never touched.
+"""
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+# Streams must reach the client as they are produced, not buffered by a compressor
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> Dict[str, Callable]:
+    """Supported encodings in order of preference."""
+    encodings = {}
+    if brotli is not None:
+        encodings["br"] = _Brotli
+    if zstandard is not None:
+        encodings["zstd"] = _Zstd
+    encodings["gzip"] = _Gzip
+    return encodings
+
+
+def choose_encoding(accept_encoding: str, encodings: Dict[str, Callable]) -> Optional[str]:
+    """
+    Pick the supported encoding the client accepts with the highest q-value,
+    ties going to our order of preference. None means send it as it is.
+    """
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for name in encodings:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressedCache:
+    """LRU of compressed bodies keyed by (ETag, encoding, uncompressed size)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, int], bytes]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str, int]) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: Tuple[str, str, int], body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None, cache_entries: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.encodings = available_encodings()
+        self.cache = CompressedCache(
+            settings.COMPRESSION_CACHE_ENTRIES if cache_entries is None else cache_entries
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(self, encoding, send).run(scope, receive)
+
+
+class _CompressedResponse:
+    """Per-request state: decides on the first body chunk, then compresses or passes through."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor = None
+        # None until the first body chunk decided it
+        self.compressing: Optional[bool] = None
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.wrapped_send)
+
+    def eligible(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and not content_type.startswith(UNCOMPRESSIBLE_TYPES)
+        )
+
+    async def wrapped_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.compressing is None:
+            await self.first_body(message)
+        elif self.compressing:
+            await self.stream_body(message)
+        else:
+            await self.send(message)
+
+    async def first_body(self, message: Message) -> None:
+        headers = MutableHeaders(scope=self.start)
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.eligible(headers):
+            self.compressing = False
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        content_length = int(headers.get("content-length", len(body) if not more_body else -1))
+        if 0 <= content_length < self.middleware.minimum_size:
+            self.compressing = False
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        self.compressing = True
+        headers["Content-Encoding"] = self.encoding
+        if not more_body:
+            compressed = self.compress_whole(body, headers.get("etag"))
+            headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        # Streamed body of unknown or large size: compress chunk by chunk
+        del headers["Content-Length"]
+        self.compressor = self.middleware.encodings[self.encoding]()
+        await self.send(self.start)
+        await self.stream_body(message)
+
+    def compress_whole(self, body: bytes, etag: Optional[str]) -> bytes:
+        key = (etag, self.encoding, len(body))
+        if etag:
+            cached = self.middleware.cache.get(key)
+            if cached is not None:
+                return cached
+        compressor = self.middleware.encodings[self.encoding]()
+        compressed = compressor.compress(body) + compressor.finish()
+        if etag:
+            self.middleware.cache.put(key, compressed)
+        return compressed
+
+    async def stream_body(self, message: Message) -> None:
+        chunk = self.compressor.compress(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, func, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, func, Integer, Computed
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.models.base import Base
 import enum
 import uuid
@@ -10,12 +10,22 @@ class TaskStatus(str, enum.Enum):
     TODO = "todo"
     DONE = "done"
 
+# Text search configuration of Task.search_vector; queries must use the same one
+SEARCH_CONFIG = "english"
+
+# Title lexemes weigh more than description ones when ranking search results
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(description, '')), 'B')"
+)
+
 class Task(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
     description = Column(String)
     status = Column(Enum(TaskStatus), default=TaskStatus.TODO)
     position = Column(sa.Integer, default=0, nullable=False)
+    rank = Column(String(collation="C"), nullable=True)  # Used by the "rank" ordering engine
     due_date = Column(DateTime(timezone=True), nullable=True)
     
     user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"), nullable=False)
@@ -25,3 +35,27 @@ class Task(Base):
     status_changed_at = Column(DateTime(timezone=True), server_default=func.now())
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Generated by Postgres from title and description (GET /tasks/search); deferred
+    # so loading tasks doesn't fetch it
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True)))
+
+    # Created by the migrations; declared here so autogenerate keeps them
+    __table_args__ = (
+        # GET /tasks filters and sorts (TaskService.list_query)
+        sa.Index("ix_task_user_due_date", "user_id", "due_date", "id", postgresql_where=sa.text("deleted_at IS NULL")),
+        sa.Index("ix_task_user_created_at", "user_id", "created_at", "id", postgresql_where=sa.text("deleted_at IS NULL")),
+        sa.Index("ix_task_user_updated_at", "user_id", "updated_at"),
+        # The "rank" ordering engine
+        sa.Index("ix_task_user_rank", "user_id", "rank"),
+        # GET /tasks/search and GET /tasks/suggest (btree_gin and pg_trgm)
+        sa.Index(
+            "ix_task_user_search_vector", "user_id", "search_vector",
+            postgresql_using="gin", postgresql_where=sa.text("deleted_at IS NULL")
+        ),
+        sa.Index(
+            "ix_task_user_title_trgm", "user_id", "title",
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_where=sa.text("deleted_at IS NULL")
+        ),
+    )
+
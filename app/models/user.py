@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, func
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, func
 from sqlalchemy.dialects.postgresql import UUID
 from app.models.base import Base
 
@@ -9,3 +9,10 @@ class User(Base):
     external_id = Column(String, unique=True, index=True, nullable=False)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    # Highest task position handed out so far; bumped atomically to place tasks on top
+    max_task_position = Column(Integer, nullable=True)
+
+    # Bumped by every change to the user's task / notification lists; feed the list ETags
+    task_list_version = Column(Integer, nullable=False, default=0, server_default="0")
+    notification_list_version = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,9 +1,28 @@
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator, create_model
 from uuid import UUID
 from datetime import datetime
-from typing import Optional, Any
+from functools import lru_cache
+from typing import Optional, Any, List, Tuple, Type
+import enum
 from app.models.task import TaskStatus
 
+class TaskSort(str, enum.Enum):
+    POSITION = "position"       # The board's own order
+    DUE_DATE = "due_date"       # Soonest first, tasks without a due date last
+    CREATED_AT = "created_at"   # Newest first
+
+class TaskFilters(BaseModel):
+    """
+    Optional filters of GET /tasks, all combined. Each is served by an index
+    on (user_id, column).
+    """
+    due_after: Optional[datetime] = None       # due_date >= due_after
+    due_before: Optional[datetime] = None      # due_date < due_before
+    overdue_at: Optional[datetime] = None      # Not done and due before this time
+    updated_since: Optional[datetime] = None   # updated_at >= updated_since
+    created_after: Optional[datetime] = None   # created_at >= created_after
+    has_due_date: Optional[bool] = None
+
 class TaskBase(BaseModel):
     title: str
     description: Optional[str] = None
@@ -21,11 +40,11 @@ class TaskCreate(TaskBase):
     pass
 
 class TaskUpdate(BaseModel):
+    """Fields a PATCH may change. Positions only change through PATCH /tasks/{id}/move."""
     title: Optional[str] = None
     description: Optional[str] = None
     status: Optional[TaskStatus] = None
     due_date: Optional[datetime] = None
-    position: Optional[int] = None
 
     @field_validator("due_date", mode="before")
     @classmethod
@@ -44,6 +63,36 @@ class Task(TaskBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+@lru_cache(maxsize=None)
+def task_projection(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Slim Task schema with only the given fields, for GET /tasks?fields=...
+    Built once per field set.
+    """
+    return create_model(
+        "TaskProjection",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (Task.model_fields[name].annotation, ...) for name in fields}
+    )
+
 class TaskMove(BaseModel):
     above_id: Optional[UUID] = None
     below_id: Optional[UUID] = None
+
+class TaskTombstone(BaseModel):
+    id: UUID
+    deleted_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class TaskChanges(BaseModel):
+    changed: List[Task]
+    deleted: List[TaskTombstone]
+    cursor: str
+    has_more: bool
+
+class TaskSearchResults(BaseModel):
+    items: List[Task]
+    total: int
+    skip: int
+    limit: int
@@ -1,3 +1,4 @@
+import asyncio
 import boto3
 import logging
 import hmac
@@ -18,8 +19,6 @@ class AuthService:
         """
         Sign-in using Amazon Cognito.
         """
-        client = boto3.client("cognito-idp", region_name=settings.COGNITO_REGION)
-        
         try:
             secret_hash = AuthService._calculate_secret_hash(
                 signin_data.email, 
@@ -27,7 +26,8 @@ class AuthService:
                 settings.COGNITO_CLIENT_SECRET
             )
             
-            response = client.initiate_auth(
+            response = await AuthService._cognito(
+                "initiate_auth",
                 ClientId=settings.COGNITO_APP_CLIENT_ID,
                 AuthFlow="USER_PASSWORD_AUTH",
                 AuthParameters={
@@ -73,8 +73,6 @@ class AuthService:
         """
         Refresh tokens using REFRESH_TOKEN_AUTH flow.
         """
-        client = boto3.client("cognito-idp", region_name=settings.COGNITO_REGION)
-        
         try:
             secret_hash = AuthService._calculate_secret_hash(
                 refresh_data.email,
@@ -82,7 +80,8 @@ class AuthService:
                 settings.COGNITO_CLIENT_SECRET
             )
             
-            response = client.initiate_auth(
+            response = await AuthService._cognito(
+                "initiate_auth",
                 ClientId=settings.COGNITO_APP_CLIENT_ID,
                 AuthFlow="REFRESH_TOKEN_AUTH",
                 AuthParameters={
@@ -111,8 +110,6 @@ class AuthService:
         """
         Sign-up a new user using Amazon Cognito and save to local DB.
         """
-        client = boto3.client("cognito-idp", region_name=settings.COGNITO_REGION)
-        
         try:
             secret_hash = AuthService._calculate_secret_hash(
                 signup_data.email, 
@@ -120,7 +117,8 @@ class AuthService:
                 settings.COGNITO_CLIENT_SECRET
             )
             
-            response = client.sign_up(
+            response = await AuthService._cognito(
+                "sign_up",
                 ClientId=settings.COGNITO_APP_CLIENT_ID,
                 Username=signup_data.email,
                 Password=signup_data.password,
@@ -152,6 +150,18 @@ class AuthService:
         except ClientError as e:
             logger.error(f"Cognito signup error: {e}")
             return False
+
+    @staticmethod
+    async def _cognito(operation: str, **kwargs) -> dict:
+        """
+        Call a Cognito API operation in a worker thread: boto3 is synchronous
+        and would otherwise hold the event loop for the whole round trip.
+        """
+        def call():
+            client = boto3.client("cognito-idp", region_name=settings.COGNITO_REGION)
+            return getattr(client, operation)(**kwargs)
+        return await asyncio.to_thread(call)
+
     @staticmethod
     def _calculate_secret_hash(username: str, client_id: str, client_secret: str) -> str:
         """
@@ -0,0 +1,62 @@
+"""
+ConnectionRegistry service.
+Tracks which users have a live WebSocket connection on any API process, so
+workers can deliver notifications in-app instead of through FCM.
+
+Each user has a Redis sorted set of their connections scored by expiry time.
+Gateways refresh their entries while the socket is open; entries of a process
+that died without unregistering simply expire.
+"""
+import logging
+import os
+import socket
+import time
+from uuid import UUID
+from app.core.config import settings
+from app.core.redis import get_redis, pipelined
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in registry entries, for debugging stale connections
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _key(user_id: UUID) -> str:
+    return f"ws:connections:{user_id}"
+
+
+class ConnectionRegistry:
+    """
+    Redis-backed registry of live WebSocket connections per user.
+    """
+
+    @staticmethod
+    async def register(user_id: UUID, connection_id: str) -> None:
+        """Add or refresh a connection; it expires unless refreshed within the TTL."""
+        ttl = settings.WS_CONNECTION_TTL_SECONDS
+        key = _key(user_id)
+        now = time.time()
+        await pipelined(
+            ("ZADD", key, now + ttl, f"{PROCESS_ID}:{connection_id}"),
+            ("ZREMRANGEBYSCORE", key, "-inf", now),
+            ("EXPIRE", key, ttl),
+        )
+
+    @staticmethod
+    async def unregister(user_id: UUID, connection_id: str) -> None:
+        try:
+            await get_redis().zrem(_key(user_id), f"{PROCESS_ID}:{connection_id}")
+        except Exception as e:
+            logger.warning(f"Could not unregister connection {connection_id} of user {user_id}: {e}")
+
+    @staticmethod
+    async def is_online(user_id: UUID) -> bool:
+        """
+        Whether the user has at least one live connection. Treated as offline when
+        Redis is unreachable, so callers fall back to FCM.
+        """
+        try:
+            return await get_redis().zcount(_key(user_id), time.time(), "+inf") > 0
+        except Exception as e:
+            logger.warning(f"Could not check connections of user {user_id}: {e}")
+            return False
@@ -0,0 +1,169 @@
+"""
+Live events for connected clients.
+Services publish small JSON events on a per-user Redis channel after their
+writes commit; every API process runs one EventBroker that subscribes to the
+channels of its connected users and fans messages out to their streams
+(GET /events), so events reach a client whatever worker it is connected to.
+"""
+import asyncio
+import json
+import logging
+from contextlib import suppress
+from typing import Dict, Optional, Set
+from uuid import UUID
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.notification import Notification
+from app.models.task import Task
+from app.schemas.task import Task as TaskSchema, TaskTombstone
+
+logger = logging.getLogger(__name__)
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_MOVED = "task.moved"
+TASK_DELETED = "task.deleted"
+NOTIFICATION_STATUS = "notification.status"
+# A notification delivered in-app (over the WebSocket gateway) instead of through FCM
+NOTIFICATION = "notification"
+# Tells the client to re-fetch instead of applying events, e.g. after a rebalance
+# renumbered the whole board or after its stream fell behind
+RESYNC = "resync"
+
+
+def channel_for(user_id: UUID) -> str:
+    return f"events:{user_id}"
+
+
+async def publish_event(user_id: UUID, event_type: str, data: Optional[dict] = None) -> int:
+    """
+    Publish an event to the user's connected clients. Best effort: the write it
+    describes has already committed, so failures are logged, not raised.
+
+    Returns:
+        Number of API processes that received the event (0 on failure)
+    """
+    message = json.dumps({"type": event_type, "data": data or {}})
+    try:
+        return await get_redis().publish(channel_for(user_id), message)
+    except Exception as e:
+        logger.warning(f"Could not publish {event_type} event for user {user_id}: {e}")
+        return 0
+
+
+async def publish_task_event(event_type: str, task: Task) -> None:
+    """Publish a task change with the task as the API returns it (a tombstone once deleted)."""
+    schema = TaskTombstone if event_type == TASK_DELETED else TaskSchema
+    try:
+        data = schema.model_validate(task).model_dump(mode="json")
+    except Exception as e:
+        logger.warning(f"Could not serialize {event_type} event for task {task.id}: {e}")
+        return
+    await publish_event(task.user_id, event_type, data)
+
+
+async def publish_notification_status(notification: Notification) -> None:
+    await publish_event(notification.user_id, NOTIFICATION_STATUS, {
+        "id": str(notification.id),
+        "task_id": str(notification.task_id) if notification.task_id else None,
+        "type": notification.type.value if notification.type else None,
+        "status": notification.status.value if notification.status else None,
+    })
+
+
+class EventBroker:
+    """
+    Per-process fan-out from Redis pub/sub to local event streams. A single pub/sub
+    connection is subscribed to the channels of users with at least one open stream.
+    Each stream gets a bounded queue; a stream that falls behind has its backlog
+    replaced by a single resync event, so memory per connection stays bounded.
+    """
+
+    def __init__(self, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, user_id: UUID) -> asyncio.Queue:
+        """
+        Open a stream for the user. The queue yields raw JSON event strings, or
+        None when the broker lost its Redis connection and the stream should end.
+        """
+        channel = channel_for(user_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = get_redis().pubsub()
+            if channel not in self._queues:
+                await self._pubsub.subscribe(channel)
+            self._queues.setdefault(channel, set()).add(queue)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read(self._pubsub))
+        return queue
+
+    async def unsubscribe(self, user_id: UUID, queue: asyncio.Queue) -> None:
+        channel = channel_for(user_id)
+        async with self._lock:
+            queues = self._queues.get(channel)
+            if not queues:
+                return
+            queues.discard(queue)
+            if not queues:
+                del self._queues[channel]
+                try:
+                    await self._pubsub.unsubscribe(channel)
+                except Exception as e:
+                    logger.warning(f"Could not unsubscribe from {channel}: {e}")
+
+    def dispatch(self, channel: str, message: str) -> None:
+        """Hand a message to every local stream of the channel's user."""
+        for queue in self._queues.get(channel, ()):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop the backlog, the client re-fetches instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(json.dumps({"type": RESYNC, "data": {}}))
+
+    async def _read(self, pubsub) -> None:
+        try:
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                if message and message["type"] == "message":
+                    self.dispatch(message["channel"], message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Event broker lost its Redis subscription: {e}")
+            await self._reset()
+
+    async def close(self) -> None:
+        """Stop reading and end every local stream (shutdown)."""
+        if self._reader is not None:
+            self._reader.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._reader
+            self._reader = None
+        await self._reset()
+
+    async def _reset(self) -> None:
+        """End every local stream; clients reconnect and resubscribe."""
+        async with self._lock:
+            for queues in self._queues.values():
+                for queue in queues:
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(None)
+            self._queues = {}
+            pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
+
+
+broker = EventBroker()
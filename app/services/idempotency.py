@@ -0,0 +1,130 @@
+"""
+IdempotencyStore service.
+Remembers the response of each write sent with an Idempotency-Key header, so a
+client retrying it (mobile clients on flaky networks) gets the same response
+back instead of the write running twice. See app/api/idempotency.py.
+
+Each (user, key) has one Redis entry. The first request claims it with a
+pending marker (SET NX) naming the claim's owner, renewed while the request
+runs and replaced by the response once it is done; duplicates arriving in the
+meantime wait for that response instead of running in parallel. A request that
+fails releases its claim so it can be retried. Renewing, completing and
+releasing only act on the caller's own claim, never on one taken over after it
+lapsed.
+"""
+import asyncio
+import json
+import logging
+from typing import Optional
+from uuid import UUID
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# How often duplicates look for the response of the request they wait on
+POLL_SECONDS = 0.05
+
+# KEYS[1] record; ARGV[1] the pending marker of the caller's claim. Each script
+# returns 0 without touching the record when that claim is no longer in place.
+
+# ARGV[2] response record, ARGV[3] its TTL in seconds
+COMPLETE = """
+if redis.call("GET", KEYS[1]) ~= ARGV[1] then return 0 end
+redis.call("SET", KEYS[1], ARGV[2], "EX", ARGV[3])
+return 1
+"""
+
+RELEASE = """
+if redis.call("GET", KEYS[1]) ~= ARGV[1] then return 0 end
+return redis.call("DEL", KEYS[1])
+"""
+
+# ARGV[2] new TTL of the claim in seconds
+RENEW = """
+if redis.call("GET", KEYS[1]) ~= ARGV[1] then return 0 end
+return redis.call("EXPIRE", KEYS[1], ARGV[2])
+"""
+
+
+def _key(user_id: UUID, key: str) -> str:
+    return f"idempotency:{user_id}:{key}"
+
+
+def _pending(fingerprint: str, owner: str) -> str:
+    return json.dumps({"fingerprint": fingerprint, "owner": owner})
+
+
+async def _if_claimed(script: str, user_id: UUID, key: str, fingerprint: str, owner: str, *args) -> bool:
+    run = get_redis().register_script(script)
+    return bool(await run(keys=[_key(user_id, key)], args=[_pending(fingerprint, owner), *args]))
+
+
+class IdempotencyStore:
+    """
+    Redis-backed record of idempotent requests: {"fingerprint": ..., "response": ...},
+    or {"fingerprint": ..., "owner": ...} while the first request is still running.
+    """
+
+    @staticmethod
+    async def claim(user_id: UUID, key: str, fingerprint: str, owner: str) -> Optional[dict]:
+        """
+        Claim key for a new request on behalf of owner (unique per request) and
+        return None; the caller must then hold() the claim while it runs and
+        complete() or release() it. If the key was already used, return that
+        request's record instead, after waiting up to IDEMPOTENCY_LOCK_MS for
+        its response when it is the same request still running. Redis errors
+        are raised.
+        """
+        redis = get_redis()
+        redis_key = _key(user_id, key)
+        pending = _pending(fingerprint, owner)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_LOCK_MS / 1000
+        while True:
+            # The claim lapses on its own if this process dies mid-request
+            if await redis.set(redis_key, pending, nx=True, ex=settings.IDEMPOTENCY_CLAIM_SECONDS):
+                return None
+            stored = await redis.get(redis_key)
+            if stored is None:
+                continue  # Released or expired in between: claim it again
+            record = json.loads(stored)
+            if "response" in record or record["fingerprint"] != fingerprint or loop.time() >= deadline:
+                return record
+            await asyncio.sleep(POLL_SECONDS)
+
+    @staticmethod
+    async def hold(user_id: UUID, key: str, fingerprint: str, owner: str) -> None:
+        """
+        Renew the claim every third of IDEMPOTENCY_CLAIM_SECONDS until cancelled,
+        so it can't lapse (and a retry run the write again) however long the
+        request takes. Returns if the claim was lost.
+        """
+        while True:
+            await asyncio.sleep(settings.IDEMPOTENCY_CLAIM_SECONDS / 3)
+            try:
+                if not await _if_claimed(RENEW, user_id, key, fingerprint, owner, settings.IDEMPOTENCY_CLAIM_SECONDS):
+                    logger.warning(f"Lost the claim on idempotency key {key}")
+                    return
+            except Exception as e:
+                logger.warning(f"Could not renew idempotency key {key}: {e}")
+
+    @staticmethod
+    async def complete(user_id: UUID, key: str, fingerprint: str, owner: str, response: dict) -> None:
+        """Store the response to replay for retries during IDEMPOTENCY_TTL_SECONDS."""
+        record = json.dumps({"fingerprint": fingerprint, "response": response})
+        try:
+            if not await _if_claimed(
+                COMPLETE, user_id, key, fingerprint, owner, record, settings.IDEMPOTENCY_TTL_SECONDS
+            ):
+                logger.warning(f"Lost the claim on idempotency key {key}, response not stored")
+        except Exception as e:
+            logger.warning(f"Could not store the response for idempotency key {key}: {e}")
+
+    @staticmethod
+    async def release(user_id: UUID, key: str, fingerprint: str, owner: str) -> None:
+        """Drop a claim whose request failed, so a retry runs it again."""
+        try:
+            await _if_claimed(RELEASE, user_id, key, fingerprint, owner)
+        except Exception as e:
+            logger.warning(f"Could not release idempotency key {key}: {e}")
@@ -0,0 +1,37 @@
+"""
+Per-user list version stamps.
+Every mutation of a user's tasks or notifications bumps a counter on the user
+row, so list endpoints can answer conditional GETs from the version alone
+without loading the list (see app/api/etag.py).
+
+Mutations take the bump before touching any task or notification row, so the
+user row is always the first lock a writer holds and concurrent writers of the
+same user serialize on it instead of deadlocking.
+"""
+from sqlalchemy import update
+from sqlalchemy.sql.dml import Update
+from app.models.user import User
+from uuid import UUID
+
+
+def task_list_bump(user_id: UUID, **values) -> Update:
+    """
+    UPDATE ... RETURNING bumping the user's task list version. Extra column
+    values (e.g. the position counter) are set in the same statement, since a
+    row must not be updated twice by CTEs of a single statement.
+    """
+    return update(User).where(User.id == user_id).values(
+        task_list_version=User.task_list_version + 1,
+        updated_at=User.updated_at,
+        **values
+    ).returning(User.id, User.max_task_position)
+
+
+def notification_list_bump(user_id: UUID) -> Update:
+    """
+    UPDATE ... RETURNING bumping the user's notification list version.
+    """
+    return update(User).where(User.id == user_id).values(
+        notification_list_version=User.notification_list_version + 1,
+        updated_at=User.updated_at
+    ).returning(User.id)
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc, nullsfirst, func, update
+from sqlalchemy import desc, nullsfirst, func, update, exists
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import joinedload
 import logging
 from datetime import datetime, timezone
@@ -11,6 +12,7 @@ from app.models.notification import DeviceToken, Notification, NotificationStatu
 from app.models.task import Task
 from app.schemas.notification import DeviceTokenCreate
 from app.services.notification_templates import format_notification
+from app.services.list_version import notification_list_bump
 
 logger = logging.getLogger(__name__)
 
@@ -25,27 +27,24 @@ class NotificationService:
         Register or update a device token for a user.
         If the token already exists for a different user, it reassigns it.
         """
-        # Check if the token already exists
-        query = select(DeviceToken).where(DeviceToken.token == device_in.token)
-        result = await db.execute(query)
-        db_device = result.scalar_one_or_none()
-        
-        if db_device:
-            # Update existing registration
-            db_device.user_id = user_id
-            db_device.platform = device_in.platform
-            db_device.updated_at = datetime.now(timezone.utc)
-        else:
-            # Create new registration
-            db_device = DeviceToken(
-                user_id=user_id,
-                token=device_in.token,
-                platform=device_in.platform
-            )
-            db.add(db_device)
-            
+        stmt = insert(DeviceToken).values(
+            user_id=user_id,
+            token=device_in.token,
+            platform=device_in.platform
+        )
+        # Upsert on the unique token so a re-registration is a single statement
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DeviceToken.token],
+            set_={
+                "user_id": stmt.excluded.user_id,
+                "platform": stmt.excluded.platform,
+                "updated_at": func.now(),
+            }
+        ).returning(DeviceToken).execution_options(populate_existing=True)
+
+        result = await db.execute(stmt)
+        db_device = result.scalar_one()
         await db.commit()
-        await db.refresh(db_device)
         return db_device
 
     @staticmethod
@@ -143,6 +142,7 @@ class NotificationService:
         if not notification.read_at:
             notification.read_at = datetime.now(timezone.utc)
             notification.read_source = read_source
+            await db.execute(notification_list_bump(user_id))
             await db.commit()
             await db.refresh(notification)
             
@@ -157,9 +157,11 @@ class NotificationService:
         """
         Mark all unread notifications as read for a user.
         """
+        bump = notification_list_bump(user_id).cte("notification_list_bump")
         stmt = (
             update(Notification)
             .where(
+                exists(select(bump.c.id)),
                 Notification.user_id == user_id,
                 Notification.read_at.is_(None),
                 Notification.status == NotificationStatus.SENT
@@ -168,6 +170,7 @@ class NotificationService:
                 read_at=datetime.now(timezone.utc),
                 read_source=read_source
             )
+            .execution_options(synchronize_session=False)
         )
         await db.execute(stmt)
         await db.commit()
@@ -9,7 +9,7 @@ from app.models.task import Task, TaskStatus
 from app.models.notification import Notification, NotificationType, NotificationStatus
 from app.core.config import settings
 from datetime import datetime, timezone, timedelta
-from typing import List
+from typing import List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,9 +23,11 @@ class NotificationGenerator:
     """
     
     @staticmethod
-    async def generate_due_date_notifications(db: AsyncSession) -> int:
+    async def generate_due_date_notifications(db: AsyncSession, read_db: Optional[AsyncSession] = None) -> int:
         """
         Generate notifications for tasks approaching their due date.
+        The candidate scan runs on read_db (e.g. a read replica) when given;
+        notifications are always written through db.
         
         Returns:
             Number of notifications created
@@ -62,7 +64,7 @@ class NotificationGenerator:
             )
         )
         
-        result = await db.execute(query)
+        result = await (db if read_db is None else read_db).execute(query)
         tasks = result.scalars().all()
         
         created_count = 0
@@ -84,9 +86,10 @@ class NotificationGenerator:
         return created_count
     
     @staticmethod
-    async def generate_stale_task_notifications(db: AsyncSession) -> int:
+    async def generate_stale_task_notifications(db: AsyncSession, read_db: Optional[AsyncSession] = None) -> int:
         """
         Generate notifications for tasks that haven't had a status change in X days.
+        The candidate scan runs on read_db when given, as for due dates.
         
         Returns:
             Number of notifications created
@@ -125,7 +128,7 @@ class NotificationGenerator:
             )
         )
         
-        result = await db.execute(query)
+        result = await (db if read_db is None else read_db).execute(query)
         tasks = result.scalars().all()
         
         created_count = 0
@@ -147,15 +150,17 @@ class NotificationGenerator:
         return created_count
     
     @staticmethod
-    async def generate_all(db: AsyncSession) -> dict:
+    async def generate_all(db: AsyncSession, read_db: Optional[AsyncSession] = None) -> dict:
         """
-        Run all notification generators.
+        Run all notification generators. A lagging replica as read_db only
+        delays a notification to the next run: both scans skip tasks that
+        already have a recent one.
         
         Returns:
             Dictionary with count of notifications created by each generator
         """
-        due_date_count = await NotificationGenerator.generate_due_date_notifications(db)
-        stale_count = await NotificationGenerator.generate_stale_task_notifications(db)
+        due_date_count = await NotificationGenerator.generate_due_date_notifications(db, read_db)
+        stale_count = await NotificationGenerator.generate_stale_task_notifications(db, read_db)
         
         return {
             "due_date_approaching": due_date_count,
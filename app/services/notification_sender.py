@@ -10,9 +10,14 @@ from app.models.notification import Notification, NotificationType, Notification
 from app.models.notification import DeviceToken
 from app.models.task import Task
 from app.services.notification_templates import format_notification
+from app.services.list_version import notification_list_bump
+from app.services.events import publish_event, publish_notification_status, NOTIFICATION
+from app.services.connection_registry import ConnectionRegistry
 from app.core.config import settings
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional
+from collections import Counter
+import asyncio
 import logging
 import traceback
 import json
@@ -32,11 +37,15 @@ except ImportError:
 
 class NotificationSender:
     """
-    Sends pending notifications from the outbox via FCM.
+    Sends pending notifications from the outbox, in-app over the WebSocket gateway
+    when the user has a live connection and via FCM otherwise.
     Respects quiet hours and handles errors gracefully.
     """
     
     _fcm_initialized = False
+
+    # Deliveries since process start: "in_app" messages and "fcm_calls" made
+    delivery_counts = Counter()
     
     @classmethod
     def _initialize_fcm(cls):
@@ -131,6 +140,7 @@ class NotificationSender:
                 data=data,
                 tokens=tokens
             )
+            cls.delivery_counts["fcm_calls"] += 1
             response = messaging.send_each_for_multicast(message)
             
             success_mask = [r.success for r in response.responses]
@@ -140,6 +150,22 @@ class NotificationSender:
             logger.error(f"FCM send error: {error_msg}")
             return ([False] * len(tokens), error_msg)
     
+    @staticmethod
+    async def _send_in_app_message(user_id, title: str, body: str, data: dict) -> bool:
+        """
+        Deliver a notification to the user's open WebSocket connections.
+
+        Returns:
+            True if at least one gateway process received it
+        """
+        receivers = await publish_event(user_id, NOTIFICATION, {
+            **data,
+            "title": title,
+            "body": body,
+            "sent_at": datetime.now(timezone.utc).isoformat()
+        })
+        return receivers > 0
+
     @classmethod
     async def send_notification(
         cls, 
@@ -155,12 +181,14 @@ class NotificationSender:
         try:
             # Get device tokens for user
             device_tokens = await cls.get_device_tokens_for_user(db, notification.user_id)
+            online = await ConnectionRegistry.is_online(notification.user_id)
             
-            if not device_tokens:
+            if not device_tokens and not online:
                 notification.status = NotificationStatus.FAILED
                 notification.error_message = "No device tokens registered for user"
                 notification.sent_at = datetime.now(timezone.utc)
                 await db.commit()
+                await publish_notification_status(notification)
                 return False
             
             # Get task for message formatting
@@ -170,18 +198,31 @@ class NotificationSender:
                 notification.error_message = f"Task {notification.task_id} not found"
                 notification.sent_at = datetime.now(timezone.utc)
                 await db.commit()
+                await publish_notification_status(notification)
                 return False
             
             # Generate message from template using helper
             title, body = format_notification(notification.type, task)
             
-            # Send via FCM
-            tokens = [dt.token for dt in device_tokens]
             data = {
                 "notification_id": str(notification.id),
                 "task_id": str(notification.task_id)
-            }           
-            success_mask, error = cls._send_fcm_message(tokens, title, body, data=data)
+            }
+
+            if online and await cls._send_in_app_message(notification.user_id, title, body, data):
+                # An open app shows it immediately, no need for a push
+                cls.delivery_counts["in_app"] += 1
+                notification.status = NotificationStatus.SENT
+                notification.sent_at = datetime.now(timezone.utc)
+                await db.execute(notification_list_bump(notification.user_id))
+                await db.commit()
+                await publish_notification_status(notification)
+                logger.info(f"Notification {notification.id} delivered in-app")
+                return True
+
+            # Send via FCM; the SDK is synchronous, so it runs off the event loop
+            tokens = [dt.token for dt in device_tokens]
+            success_mask, error = await asyncio.to_thread(cls._send_fcm_message, tokens, title, body, data=data)
             
             success_count = sum(1 for s in success_mask if s)
             
@@ -193,6 +234,9 @@ class NotificationSender:
                     if success:
                         dt.last_used_at = datetime.now(timezone.utc)
                 
+                # Sent notifications show up in the user's list
+                await db.execute(notification_list_bump(notification.user_id))
+
                 logger.info(f"Notification {notification.id} sent successfully to {success_count} devices")
             else:
                 notification.status = NotificationStatus.FAILED
@@ -201,6 +245,7 @@ class NotificationSender:
                 logger.error(f"Notification {notification.id} failed: {notification.error_message}")
             
             await db.commit()
+            await publish_notification_status(notification)
             return notification.status == NotificationStatus.SENT
             
         except Exception as e:
@@ -209,6 +254,7 @@ class NotificationSender:
             notification.error_message = error_msg
             notification.sent_at = datetime.now(timezone.utc)
             await db.commit()
+            await publish_notification_status(notification)
             logger.error(f"Error sending notification {notification.id}: {error_msg}")
             return False
     
@@ -227,9 +273,10 @@ class NotificationSender:
         # Check quiet hours
         if cls.is_quiet_hours():
             logger.info("Within quiet hours, skipping notification send")
-            return {"sent": 0, "failed": 0, "skipped_quiet_hours": True}
+            return {"sent": 0, "failed": 0, "in_app": 0, "fcm_calls": 0, "skipped_quiet_hours": True}
         
         notifications = await cls.get_pending_notifications(db)
+        counts_before = cls.delivery_counts.copy()
         
         sent = 0
         failed = 0
@@ -241,10 +288,17 @@ class NotificationSender:
             else:
                 failed += 1
         
-        logger.info(f"Notification send complete: {sent} sent, {failed} failed")
+        in_app = cls.delivery_counts["in_app"] - counts_before["in_app"]
+        fcm_calls = cls.delivery_counts["fcm_calls"] - counts_before["fcm_calls"]
+        logger.info(
+            f"Notification send complete: {sent} sent ({in_app} in-app), {failed} failed, "
+            f"{fcm_calls} FCM calls"
+        )
         
         return {
             "sent": sent,
             "failed": failed,
+            "in_app": in_app,
+            "fcm_calls": fcm_calls,
             "skipped_quiet_hours": False
         }
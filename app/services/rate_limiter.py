@@ -0,0 +1,60 @@
+"""
+RateLimiter service.
+Token buckets in Redis, shared by every API process. Each bucket holds up to
+`capacity` tokens and refills at capacity / period_seconds tokens per second;
+a request takes one token or is rejected with the time until the next one.
+
+The whole read-refill-take-write cycle runs as one Lua script, so concurrent
+requests from any number of workers can't both take the last token. Time comes
+from the Redis server, not from the (possibly skewed) API hosts.
+"""
+import logging
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] bucket; ARGV[1] capacity, ARGV[2] refill rate in tokens per second.
+# Returns {1, "0"} when a token was taken, else {0, seconds until one is available}.
+TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - updated_at, 0) * rate)
+
+local allowed, retry_after = 0, (1 - tokens) / rate
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed, retry_after = 1, 0
+end
+
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+-- A bucket left alone this long is full again, the same as no bucket at all
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RateLimiter:
+    """
+    Redis-backed token buckets keyed by caller and route.
+    """
+
+    @staticmethod
+    async def acquire(key: str, capacity: int, period_seconds: float) -> float:
+        """
+        Take a token from the bucket. Returns 0 if one was available, otherwise
+        the seconds until one will be. Requests are let through when Redis is
+        unreachable: losing rate limiting beats losing the API.
+        """
+        try:
+            script = get_redis().register_script(TOKEN_BUCKET)
+            allowed, retry_after = await script(keys=[f"ratelimit:{key}"], args=[capacity, capacity / period_seconds])
+        except Exception as e:
+            logger.warning(f"Rate limiting unavailable, allowing {key}: {e}")
+            return 0.0
+        return 0.0 if allowed else float(retry_after)
@@ -0,0 +1,42 @@
+"""
+ReadYourWrites service.
+Keeps a user's reads on the primary for a short window after they write, so
+a client never reads its own change back from a replica that hasn't replayed
+it yet. The window is a Redis key per user, shared by every API process.
+"""
+import logging
+from uuid import UUID
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def _key(user_id: UUID) -> str:
+    return f"rw:primary:{user_id}"
+
+
+class ReadYourWrites:
+    """
+    Redis-backed per-user stickiness to the primary.
+    """
+
+    @staticmethod
+    async def mark_write(user_id: UUID) -> None:
+        """Start (or extend) the user's window on the primary."""
+        try:
+            await get_redis().set(_key(user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+        except Exception as e:
+            logger.warning(f"Could not mark write of user {user_id}: {e}")
+
+    @staticmethod
+    async def on_primary(user_id: UUID) -> bool:
+        """
+        Whether the user's reads must go to the primary. Errs on the side of the
+        primary when Redis is unreachable.
+        """
+        try:
+            return bool(await get_redis().exists(_key(user_id)))
+        except Exception as e:
+            logger.warning(f"Could not check writes of user {user_id}: {e}")
+            return True
@@ -0,0 +1,65 @@
+"""
+SingleFlight: in-process request coalescing.
+A user with the app open in several tabs refreshes all of them at once, so
+identical reads arrive within milliseconds of each other. The first one runs;
+the others that arrive while it is in flight await its result instead of
+running the same query and serialization again. Nothing is kept once the call
+finishes, so this is not a cache: a read arriving afterwards runs anew.
+
+Keys must capture everything the result depends on. Read endpoints use their
+ETag, which covers the user, the endpoint, the list versions and the query
+parameters (see app/api/etag.py), so a read that starts after a write never
+joins a flight that started before it.
+"""
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+# Per-process counters: leaders (calls that ran) and coalesced (calls that
+# shared a leader's result)
+flight_stats = Counter()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Return fn()'s result, sharing a call already in flight for key. Errors
+        are shared too. If the leading request is cancelled (its client went
+        away), the requests waiting on it run fn themselves.
+        """
+        flight = self._flights.get(key)
+        if flight is not None and not flight.done():
+            try:
+                # Shielded: a follower going away must not cancel the others' flight
+                result = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            else:
+                flight_stats["coalesced"] += 1
+                return result
+            return await self.do(key, fn)
+
+        flight_stats["leaders"] += 1
+        flight = asyncio.get_running_loop().create_task(fn())
+        self._flights[key] = flight
+        flight.add_done_callback(lambda done: self._forget(key, done))
+        # Not shielded: the flight uses the leader's database session, so it
+        # can't outlive the leader's request
+        return await flight
+
+    def _forget(self, key: Hashable, flight: asyncio.Task) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+# Shared by the read endpoints of this process
+read_flights = SingleFlight()
@@ -1,39 +1,76 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
-from app.models.task import Task, TaskStatus
-from app.schemas.task import TaskCreate, TaskUpdate
-from uuid import UUID
-from typing import Optional, List
+from sqlalchemy import func, insert, update, case, cast, exists, literal, Integer, Numeric, Row, Select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from app.models.task import Task, TaskStatus, SEARCH_CONFIG
+from app.models.user import User
+from app.schemas.task import TaskCreate, TaskUpdate, TaskFilters, TaskSort
+from app.services.task_rebalancer import TaskRebalancer, POSITION_GAP, position_between
+from app.services.task_rank import rank_between
+from app.services.list_version import task_list_bump
+from app.services import events
+from app.core.config import settings
+from uuid import UUID, uuid4
+from typing import Optional, List, Sequence, Tuple
 from datetime import datetime, timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns of the task list response (app.schemas.task.Task)
+TASK_LIST_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.description,
+    Task.status,
+    Task.position,
+    Task.due_date,
+    Task.user_id,
+    Task.created_at,
+    Task.updated_at,
+)
+
+# Columns of title suggestions (GET /tasks/suggest)
+SUGGEST_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.status,
+    Task.due_date,
+)
+
+# SQLSTATE of a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
 
 class TaskService:
     @staticmethod
     async def create_task(db: AsyncSession, task_in: TaskCreate, user_id: UUID) -> Task:
         """
         Create a new task for a user. New tasks are placed at the beginning by having 
-        the highest position value (max position + 1000).
+        the highest position value (the user's position counter + 1000).
         """
-        # Find the maximum position to place the new task at the top
-        query = select(func.max(Task.position)).where(
-            Task.user_id == user_id,
-            Task.deleted_at == None
-        )
-        result = await db.execute(query)
-        max_position = result.scalar()
-        
-        new_position = (max_position + 1000) if max_position is not None else 0
+        if settings.TASK_ORDERING_ENGINE == "rank":
+            return await TaskService._create_ranked_task(db, task_in, user_id)
+
+        # Allocate the top position from the user's counter inside the INSERT itself
+        # (the counter's row lock keeps concurrent creates unique) and read the
+        # server defaults (created_at, updated_at, ...) back with RETURNING.
+        allocated = TaskService._allocate_top_position(user_id)
 
-        db_task = Task(
+        # Python-side column defaults are not applied alongside a DML CTE, so they are explicit
+        stmt = insert(Task).values(
+            id=uuid4(),
             title=task_in.title,
             description=task_in.description,
+            status=TaskStatus.TODO,
             due_date=task_in.due_date,
             user_id=user_id,
-            position=new_position
-        )
-        db.add(db_task)
+            position=select(allocated.c.max_task_position).scalar_subquery()
+        ).add_cte(allocated).returning(Task)
+        result = await db.execute(stmt)
+        db_task = result.scalar_one()
         await db.commit()
-        await db.refresh(db_task)
+        await events.publish_task_event(events.TASK_CREATED, db_task)
         return db_task
 
     @staticmethod
@@ -46,47 +83,186 @@ class TaskService:
         """
         Update an existing task if it belongs to the user and is not deleted.
         """
-        query = select(Task).where(
-            Task.id == task_id, 
+        update_data = task_in.model_dump(exclude_unset=True)
+
+        if not update_data:
+            query = select(Task).where(
+                Task.id == task_id,
+                Task.user_id == user_id,
+                Task.deleted_at == None
+            )
+            result = await db.execute(query)
+            return result.scalar_one_or_none()
+
+        # Track if status is changing
+        if 'status' in update_data:
+            update_data['status_changed_at'] = case(
+                (Task.status.is_distinct_from(update_data['status']), func.now()),
+                else_=Task.status_changed_at
+            )
+
+        bump = task_list_bump(user_id).cte("task_list_bump")
+        stmt = update(Task).where(
+            exists(select(bump.c.id)),
+            Task.id == task_id,
             Task.user_id == user_id,
             Task.deleted_at == None
+        ).values(**update_data).returning(Task).execution_options(
+            populate_existing=True, synchronize_session=False
         )
-        result = await db.execute(query)
+        result = await db.execute(stmt)
         db_task = result.scalar_one_or_none()
-        
+
         if not db_task:
             return None
-        
-        update_data = task_in.model_dump(exclude_unset=True)
-        
-        # Track if status is changing
-        if 'status' in update_data and update_data['status'] != db_task.status:
-            db_task.status_changed_at = datetime.now(timezone.utc)
-        
-        for field, value in update_data.items():
-            setattr(db_task, field, value)
-            
-        db.add(db_task)
+
         await db.commit()
-        await db.refresh(db_task)
+        await events.publish_task_event(events.TASK_UPDATED, db_task)
         return db_task
 
     @staticmethod
-    async def get_tasks(db: AsyncSession, user_id: UUID, status: Optional[TaskStatus] = None) -> List[Task]:
+    async def get_tasks(
+        db: AsyncSession,
+        user_id: UUID,
+        status: Optional[TaskStatus] = None,
+        fields: Optional[Sequence[str]] = None,
+        filters: Optional[TaskFilters] = None,
+        sort: TaskSort = TaskSort.POSITION
+    ) -> List[Row]:
         """
-        Get all tasks for a user that are not deleted, optionally filtered by status.
-        Ordered by the custom 'position' field descending (highest first).
+        Get all tasks for a user that are not deleted, optionally filtered by
+        status and filters. Ordered by the custom 'position' field descending
+        (highest first), or by 'rank' ascending when the rank ordering engine is
+        enabled, unless sort asks for due date or creation order.
+        Read-only: returns plain rows of the listed columns instead of ORM
+        instances, so nothing is tracked in the session's identity map.
+        fields narrows the columns to those names (see TASK_LIST_COLUMNS).
         """
-        query = select(Task).where(
+        result = await db.execute(TaskService.list_query(user_id, status, fields, filters, sort))
+        return list(result.all())
+
+    @staticmethod
+    def list_query(
+        user_id: UUID,
+        status: Optional[TaskStatus] = None,
+        fields: Optional[Sequence[str]] = None,
+        filters: Optional[TaskFilters] = None,
+        sort: TaskSort = TaskSort.POSITION
+    ) -> Select:
+        """
+        The SELECT behind get_tasks. Filters and sorts other than the board order
+        match the partial (user_id, due_date, id) and (user_id, created_at, id)
+        indexes and (user_id, updated_at); keep them in step with those.
+        """
+        columns = [c for c in TASK_LIST_COLUMNS if fields is None or c.key in fields]
+        query = select(*columns).where(
             Task.user_id == user_id,
             Task.deleted_at == None
-        ).order_by(Task.position.desc())
-        
+        ).order_by(*TaskService._list_order(sort))
+
         if status:
             query = query.where(Task.status == status)
-            
-        result = await db.execute(query)
-        return list(result.scalars().all())
+
+        if filters is not None:
+            if filters.due_after is not None:
+                query = query.where(Task.due_date >= filters.due_after)
+            if filters.due_before is not None:
+                query = query.where(Task.due_date < filters.due_before)
+            if filters.overdue_at is not None:
+                query = query.where(Task.due_date < filters.overdue_at, Task.status != TaskStatus.DONE)
+            if filters.updated_since is not None:
+                query = query.where(Task.updated_at >= filters.updated_since)
+            if filters.created_after is not None:
+                query = query.where(Task.created_at >= filters.created_after)
+            if filters.has_due_date is not None:
+                query = query.where(Task.due_date != None if filters.has_due_date else Task.due_date == None)
+        return query
+
+    @staticmethod
+    async def search_tasks(
+        db: AsyncSession,
+        user_id: UUID,
+        q: str,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Row], int]:
+        """
+        Full-text search over the user's non-deleted tasks, best matches first
+        (title matches rank above description matches). q takes web search
+        syntax: words, "quoted phrases", OR and -excluded words.
+        Returns a page of rows of TASK_LIST_COLUMNS and the total match count.
+        """
+        query = func.websearch_to_tsquery(literal(SEARCH_CONFIG, REGCONFIG), q)
+        rank = func.ts_rank(Task.search_vector, query)
+        result = await db.execute(
+            select(*TASK_LIST_COLUMNS, func.count().over().label("total"))
+            .where(
+                Task.user_id == user_id,
+                Task.deleted_at == None,
+                Task.search_vector.bool_op("@@")(query)
+            )
+            .order_by(rank.desc(), Task.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        rows = list(result.all())
+        if rows:
+            return rows, rows[0].total
+        if not skip:
+            return rows, 0
+        # Paged past the end: the window count came back with no rows
+        total = await db.scalar(
+            select(func.count()).select_from(Task).where(
+                Task.user_id == user_id,
+                Task.deleted_at == None,
+                Task.search_vector.bool_op("@@")(query)
+            )
+        )
+        return rows, total
+
+    @staticmethod
+    async def suggest_tasks(
+        db: AsyncSession,
+        user_id: UUID,
+        prefix: str,
+        limit: int
+    ) -> Optional[List[Row]]:
+        """
+        The user's non-deleted tasks whose title contains prefix (case-insensitive),
+        for as-you-type lookups: titles starting with it first, then the closest
+        (trigram similarity). Returns up to limit rows of SUGGEST_COLUMNS.
+        The query is cancelled after TASK_SUGGEST_TIMEOUT_MS, returning None, so
+        a slow lookup can't hold a connection while the user keeps typing.
+        """
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = select(*SUGGEST_COLUMNS).where(
+            Task.user_id == user_id,
+            Task.deleted_at == None,
+            Task.title.ilike(f"%{escaped}%", escape="\\")
+        ).order_by(
+            Task.title.ilike(f"{escaped}%", escape="\\").desc(),
+            func.similarity(Task.title, prefix).desc(),
+            Task.id
+        ).limit(limit)
+
+        # Both last until the end of the session's transaction. A generic plan
+        # (reused prepared statement) can't tell a 1-letter prefix, which the
+        # trigram index can't narrow, from a longer one: plan each lookup.
+        await db.execute(
+            select(
+                func.set_config("statement_timeout", str(settings.TASK_SUGGEST_TIMEOUT_MS), True),
+                func.set_config("plan_cache_mode", "force_custom_plan", True)
+            )
+        )
+        try:
+            result = await db.execute(query)
+        except DBAPIError as e:
+            if getattr(e.orig, "sqlstate", None) != QUERY_CANCELED:
+                raise
+            await db.rollback()
+            logger.warning(f"Task suggestions for {prefix!r} timed out")
+            return None
+        return list(result.all())
 
     @staticmethod
     async def move_task(
@@ -100,55 +276,257 @@ class TaskService:
         Move a task between two other tasks.
         If above_id is None, move to the top.
         If below_id is None, move to the bottom.
-        Calculates a new position value between the positions of above and below.
+        Calculates a new position value between the positions of above and below,
+        re-gapping the user's positions first when there is no room left.
         """
-        # 1. Fetch the task to be moved
-        query = select(Task).where(
-            Task.id == task_id,
+        if above_id is None and below_id is None:
+            query = select(Task).where(
+                Task.id == task_id,
+                Task.user_id == user_id,
+                Task.deleted_at == None
+            )
+            result = await db.execute(query)
+            return result.scalar_one_or_none()
+
+        if settings.TASK_ORDERING_ENGINE == "rank":
+            return await TaskService._move_ranked_task(db, task_id, user_id, above_id, below_id)
+
+        stmt = TaskService._move_statement(task_id, user_id, above_id, below_id)
+        moved_task = (await db.execute(stmt)).scalar_one_or_none()
+        rebalanced = False
+
+        if not moved_task and above_id and below_id:
+            # Nothing updated: either an ID is invalid, or the neighbours are too
+            # close to bisect. In the latter case re-gap the board and retry once.
+            query = select(Task.id, Task.position).where(
+                Task.user_id == user_id,
+                Task.deleted_at == None,
+                Task.id.in_([task_id, above_id, below_id])
+            )
+            positions = dict((await db.execute(query)).all())
+            if (
+                len(positions) == 3
+                and position_between(positions[above_id], positions[below_id]) is None
+            ):
+                await TaskRebalancer.rebalance_user(db, user_id)
+                rebalanced = True
+                moved_task = (await db.execute(stmt)).scalar_one_or_none()
+
+        if not moved_task:
+            # Unknown or foreign task / neighbour: nothing was updated
+            await db.rollback()
+            return None
+
+        await db.commit()
+        if rebalanced:
+            # Every position on the board changed, not just the moved task's
+            await events.publish_event(user_id, events.RESYNC)
+        else:
+            await events.publish_task_event(events.TASK_MOVED, moved_task)
+        return moved_task
+
+    @staticmethod
+    def _move_statement(
+        task_id: UUID,
+        user_id: UUID,
+        above_id: Optional[UUID],
+        below_id: Optional[UUID]
+    ):
+        """
+        Build the single UPDATE ... RETURNING that moves a task. A CTE locks the
+        moved task and its neighbours (in id order, so concurrent moves by the same
+        user serialize instead of deadlocking) and the new position is computed from
+        the locked rows. Matches no row if an ID is invalid or the gap is exhausted.
+        """
+        # Moving to the top also takes the next value of the position counter
+        if above_id is None:
+            bump = TaskService._allocate_top_position(user_id)
+        else:
+            bump = task_list_bump(user_id).cte("task_list_bump")
+
+        locked = select(Task.id, Task.position).where(
+            exists(select(bump.c.id)),
+            Task.user_id == user_id,
+            Task.deleted_at == None,
+            Task.id.in_([i for i in (task_id, above_id, below_id) if i])
+        ).order_by(Task.id).with_for_update().cte("locked")
+
+        def locked_position(neighbour_id: UUID):
+            return select(locked.c.position).where(locked.c.id == neighbour_id).scalar_subquery()
+
+        conditions = [Task.id == task_id, Task.id.in_(select(locked.c.id))]
+
+        # Note: Sorting is DESC, so "above" means higher position value.
+        if above_id:
+            pos_above = locked_position(above_id)
+            conditions.append(pos_above.is_not(None))
+
+        if below_id:
+            pos_below = locked_position(below_id)
+            conditions.append(pos_below.is_not(None))
+
+        if above_id is None:
+            new_position = select(bump.c.max_task_position).scalar_subquery()
+        elif below_id is None:
+            new_position = pos_above - POSITION_GAP
+        else:
+            new_position = cast(func.floor(cast(pos_above + pos_below, Numeric) / 2), Integer)
+            # The midpoint must differ from both neighbours, see position_between()
+            conditions.append(func.abs(pos_above - pos_below) > 1)
+
+        # RETURNING refreshes the moved row; the ORM's own session sync cannot
+        # cope with a DML CTE, so it is switched off
+        return update(Task).where(*conditions).values(
+            position=new_position
+        ).returning(Task).execution_options(populate_existing=True, synchronize_session=False)
+
+    @staticmethod
+    def _allocate_top_position(user_id: UUID):
+        """
+        CTE bumping the user's position counter by POSITION_GAP (starting at 0),
+        along with the task list version, and returning the new value: a position
+        above every task the user has.
+        """
+        return task_list_bump(
+            user_id,
+            max_task_position=func.coalesce(User.max_task_position + POSITION_GAP, 0)
+        ).cte("allocated_position")
+
+    @staticmethod
+    def _list_order(sort: TaskSort = TaskSort.POSITION) -> tuple:
+        """
+        ORDER BY clauses for a user's task list: the board under the configured
+        ordering engine, or the index order of the other sorts.
+        """
+        if sort == TaskSort.DUE_DATE:
+            return (Task.due_date.asc().nulls_last(), Task.id)
+        if sort == TaskSort.CREATED_AT:
+            return (Task.created_at.desc(), Task.id.desc())
+        if settings.TASK_ORDERING_ENGINE == "rank":
+            return (Task.rank.asc(), Task.id)
+        return (Task.position.desc(), Task.id)
+
+    @staticmethod
+    async def _lock_user(db: AsyncSession, user_id: UUID) -> None:
+        """
+        Serialize rank writes for a user. Statements issued after the lock see
+        concurrent commits, so two writers never derive the same rank key.
+        """
+        await db.execute(select(User.id).where(User.id == user_id).with_for_update())
+
+    @staticmethod
+    async def _create_ranked_task(db: AsyncSession, task_in: TaskCreate, user_id: UUID) -> Task:
+        """
+        Create a task at the top of the list under the rank ordering engine:
+        its key sorts before the user's current first key, and its position is
+        allocated from the user's counter as under the position engine.
+        """
+        await TaskService._lock_user(db, user_id)
+
+        query = select(func.min(Task.rank)).where(
             Task.user_id == user_id,
             Task.deleted_at == None
         )
-        result = await db.execute(query)
-        task_to_move = result.scalar_one_or_none()
-        if not task_to_move:
-            return None
+        first_rank = (await db.execute(query)).scalar()
+        allocated = TaskService._allocate_top_position(user_id)
 
-        # 2. Determine positions
-        # Note: Sorting is DESC, so "above" means higher position value.
-        pos_above = None
-        pos_below = None
+        # Python-side column defaults are not applied alongside a DML CTE, so they are explicit
+        stmt = insert(Task).values(
+            id=uuid4(),
+            title=task_in.title,
+            description=task_in.description,
+            status=TaskStatus.TODO,
+            position=select(allocated.c.max_task_position).scalar_subquery(),
+            due_date=task_in.due_date,
+            user_id=user_id,
+            rank=rank_between(None, first_rank)
+        ).add_cte(allocated).returning(Task)
+        result = await db.execute(stmt)
+        db_task = result.scalar_one()
+        await db.commit()
+        await events.publish_task_event(events.TASK_CREATED, db_task)
+        return db_task
 
+    @staticmethod
+    async def _move_ranked_task(
+        db: AsyncSession,
+        task_id: UUID,
+        user_id: UUID,
+        above_id: Optional[UUID],
+        below_id: Optional[UUID]
+    ) -> Optional[Task]:
+        """
+        Move a task under the rank ordering engine. The task is keyed between the
+        anchor (above_id, or below_id when moving to the top) and the anchor's
+        current neighbour, so keys stay unique even if the client's view is stale.
+        Its position is set between the same two tasks' positions, re-gapping the
+        user's positions in rank order first when they have no room left (or are
+        out of step with the ranks).
+        """
+        scope = (Task.user_id == user_id, Task.deleted_at == None)
+        ids = {i for i in (task_id, above_id, below_id) if i}
+
+        await TaskService._lock_user(db, user_id)
+
+        anchor = select(Task.rank).where(*scope, Task.id == (above_id or below_id))
+        anchor_rank = anchor.scalar_subquery()
         if above_id:
-            query = select(Task.position).where(Task.id == above_id, Task.user_id == user_id, Task.deleted_at == None)
-            pos_above = (await db.execute(query)).scalar()
-            if pos_above is None: return None
+            neighbour = select(Task.rank).where(
+                *scope, Task.id != task_id, Task.rank > anchor_rank
+            ).order_by(Task.rank.asc()).limit(1)
+        else:
+            neighbour = select(Task.rank).where(
+                *scope, Task.id != task_id, Task.rank < anchor_rank
+            ).order_by(Task.rank.desc()).limit(1)
 
-        if below_id:
-            query = select(Task.position).where(Task.id == below_id, Task.user_id == user_id, Task.deleted_at == None)
-            pos_below = (await db.execute(query)).scalar()
-            if pos_below is None: return None
+        query = select(
+            select(func.count()).select_from(Task).where(*scope, Task.id.in_(ids)).scalar_subquery(),
+            anchor_rank,
+            anchor.with_only_columns(Task.position).scalar_subquery(),
+            neighbour.scalar_subquery(),
+            neighbour.with_only_columns(Task.position).scalar_subquery()
+        )
+        found, anchor_key, anchor_position, neighbour_key, neighbour_position = (await db.execute(query)).one()
 
-        # 3. Calculate new position
-        if pos_above is None and pos_below is None:
-            return task_to_move
+        if found != len(ids) or anchor_key is None:
+            await db.rollback()
+            return None
+
+        if above_id:
+            new_rank = rank_between(anchor_key, neighbour_key)
+            pos_above, pos_below = anchor_position, neighbour_position
+        else:
+            new_rank = rank_between(neighbour_key, anchor_key)
+            pos_above, pos_below = neighbour_position, anchor_position
 
         if pos_above is None:
-            new_position = pos_below + 1000
-        elif pos_below is None:
-            new_position = pos_above - 1000
+            # Moving to the top also takes the next value of the position counter
+            bump = TaskService._allocate_top_position(user_id)
+            new_position = select(bump.c.max_task_position).scalar_subquery()
         else:
-            new_position = (pos_above + pos_below) // 2
-            
-            # Conflict check: if the difference is too small, we might need a re-gap.
-            if new_position == pos_above or new_position == pos_below:
-                # TODO: Emergency re-gap logic could go here if gap is 0.
-                # Since we have large gaps, we'll assume this is rare.
-                pass
+            bump = task_list_bump(user_id).cte("task_list_bump")
+            new_position = None
+            if pos_below is None or pos_above > pos_below:
+                new_position = position_between(pos_above, pos_below)
+            if new_position is None:
+                await TaskRebalancer.rebalance_user(db, user_id, order_by=TaskService._list_order())
+                _, _, anchor_position, _, neighbour_position = (await db.execute(query)).one()
+                if above_id:
+                    new_position = position_between(anchor_position, neighbour_position)
+                else:
+                    new_position = position_between(neighbour_position, anchor_position)
 
-        task_to_move.position = new_position
+        stmt = update(Task).where(
+            Task.id == task_id,
+            *scope
+        ).values(rank=new_rank, position=new_position).add_cte(bump).returning(Task).execution_options(
+            populate_existing=True, synchronize_session=False
+        )
+        moved_task = (await db.execute(stmt)).scalar_one_or_none()
         await db.commit()
-        await db.refresh(task_to_move)
-        return task_to_move
+        if moved_task:
+            await events.publish_task_event(events.TASK_MOVED, moved_task)
+        return moved_task
 
     @staticmethod
     async def delete_task(db: AsyncSession, task_id: UUID, user_id: UUID) -> bool:
@@ -168,5 +546,7 @@ class TaskService:
             
         db_task.deleted_at = datetime.now(timezone.utc)
         db.add(db_task)
+        await db.execute(task_list_bump(user_id))
         await db.commit()
+        await events.publish_task_event(events.TASK_DELETED, db_task)
         return True
@@ -0,0 +1,135 @@
+"""
+TaskListCache service.
+Keeps each user's serialized task list (GET /tasks) in Redis, and briefly
+their title suggestions (GET /tasks/suggest).
+
+Entries are keyed by the list's ETag, which is derived from the user's
+task_list_version and the request's filters (see app/api/etag.py). Every task
+write bumps that version in the same transaction, so a write invalidates the
+user's cached lists by construction; superseded entries simply expire.
+
+On a miss, one request per key rebuilds the entry while concurrent ones wait
+briefly for it instead of all querying the database (stampede protection).
+The rebuild lock names its holder, and only the holder removes it.
+"""
+import asyncio
+import logging
+from collections import Counter
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Per-process counters: hits, misses, coalesced (misses served by another
+# request's rebuild), wait_timeouts and errors (Redis unavailable)
+cache_stats = Counter()
+
+# How often waiting requests look for the entry being rebuilt
+POLL_SECONDS = 0.025
+
+# KEYS[1] entry, KEYS[2] rebuild lock; ARGV[1] body, ARGV[2] TTL in seconds,
+# ARGV[3] the lock holder's token. Stores the entry and releases the lock if
+# the caller still holds it.
+STORE_AND_UNLOCK = """
+redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[2])
+if redis.call("GET", KEYS[2]) == ARGV[3] then redis.call("DEL", KEYS[2]) end
+return 1
+"""
+
+# KEYS[1] rebuild lock; ARGV[1] the lock holder's token
+UNLOCK = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then return redis.call("DEL", KEYS[1]) end
+return 0
+"""
+
+
+def _key(etag: str) -> str:
+    return f"tasks:list:{etag}"
+
+
+def hit_rate() -> float:
+    """Share of cache lookups answered from Redis since the process started."""
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    served = cache_stats["hits"] + cache_stats["coalesced"]
+    return served / lookups if lookups else 0.0
+
+
+class TaskListCache:
+    """
+    Redis cache of serialized task lists. Best effort: when Redis is
+    unavailable the list is built as if the cache didn't exist.
+    """
+
+    @staticmethod
+    async def get_or_load(etag: str, load: Callable[[], Awaitable[bytes]], ttl: Optional[int] = None) -> bytes:
+        """
+        Return the cached list for etag, or build it with load() and cache it
+        for ttl seconds (TASK_LIST_CACHE_TTL_SECONDS by default).
+        """
+        if ttl is None:
+            ttl = settings.TASK_LIST_CACHE_TTL_SECONDS
+        if ttl <= 0:
+            return await load()
+
+        key = _key(etag)
+        redis = get_redis()
+        try:
+            cached = await redis.get(key)
+        except Exception as e:
+            cache_stats["errors"] += 1
+            logger.warning(f"Task list cache unavailable: {e}")
+            return await load()
+        if cached is not None:
+            cache_stats["hits"] += 1
+            return cached.encode()
+
+        cache_stats["misses"] += 1
+        lock, token = f"{key}:lock", uuid4().hex
+        try:
+            leader = await redis.set(lock, token, nx=True, px=settings.TASK_LIST_CACHE_LOCK_MS)
+        except Exception:
+            leader = True
+        if not leader:
+            cached = await TaskListCache._wait_for(key)
+            if cached is not None:
+                cache_stats["coalesced"] += 1
+                return cached.encode()
+            cache_stats["wait_timeouts"] += 1
+
+        try:
+            body = await load()
+        except BaseException:
+            # Let waiting requests load for themselves instead of waiting out the lock
+            if leader:
+                try:
+                    await redis.register_script(UNLOCK)(keys=[lock], args=[token])
+                except Exception:
+                    pass
+            raise
+        try:
+            if leader:
+                await redis.register_script(STORE_AND_UNLOCK)(keys=[key, lock], args=[body, ttl, token])
+            else:
+                # Gave up waiting: the lock is still another request's
+                await redis.set(key, body, ex=ttl)
+        except Exception as e:
+            cache_stats["errors"] += 1
+            logger.warning(f"Could not cache task list {etag}: {e}")
+        return body
+
+    @staticmethod
+    async def _wait_for(key: str):
+        """Poll for an entry another request is building, up to the lock's lifetime."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.TASK_LIST_CACHE_LOCK_MS / 1000
+        while loop.time() < deadline:
+            await asyncio.sleep(POLL_SECONDS)
+            try:
+                cached = await get_redis().get(key)
+            except Exception:
+                return None
+            if cached is not None:
+                return cached
+        return None
@@ -0,0 +1,159 @@
+"""
+Lexicographic rank keys for task ordering.
+Keys are variable-length base-62 strings compared byte-wise (the column uses the
+"C" collation), so a key between any two others always exists and no
+rebalancing is ever needed.
+
+A key is an integer part followed by an optional fraction. The first character
+of the integer part encodes its length ('a'..'z' for non-negative integers of
+2..27 characters, 'Z'..'A' for negative ones), so repeatedly adding tasks at the
+top or bottom of a list only grows keys logarithmically; inserting between two
+neighbours bisects the fraction.
+"""
+from typing import Optional
+
+RANK_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+_SMALLEST_INTEGER = "A" + RANK_DIGITS[0] * 26
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Return a key that sorts strictly between before and after.
+    A missing bound means the start or end of the list.
+    """
+    if before is not None:
+        _validate_key(before)
+    if after is not None:
+        _validate_key(after)
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Rank keys out of order: {before!r} >= {after!r}")
+
+    if before is None:
+        if after is None:
+            return "a" + RANK_DIGITS[0]
+        integer = _integer_part(after)
+        if integer == _SMALLEST_INTEGER:
+            return integer + _midpoint("", after[len(integer):])
+        if integer < after:
+            return integer
+        decremented = _decrement_integer(integer)
+        if decremented is None:
+            raise ValueError("Cannot rank before the smallest key")
+        return decremented
+
+    integer = _integer_part(before)
+    fraction = before[len(integer):]
+
+    if after is None:
+        incremented = _increment_integer(integer)
+        return incremented if incremented is not None else integer + _midpoint(fraction, None)
+
+    after_integer = _integer_part(after)
+    if integer == after_integer:
+        return integer + _midpoint(fraction, after[len(after_integer):])
+
+    incremented = _increment_integer(integer)
+    if incremented is None:
+        raise ValueError("Cannot rank after the largest key")
+    if incremented < after:
+        return incremented
+    return integer + _midpoint(fraction, None)
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """Midpoint of two fractions read as base-62 digits (b=None means 1.0)."""
+    zero = RANK_DIGITS[0]
+    if b is not None:
+        # Copy the common prefix, padding a with zeros
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else zero) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = RANK_DIGITS.index(a[0]) if a else 0
+    digit_b = RANK_DIGITS.index(b[0]) if b is not None else len(RANK_DIGITS)
+
+    if digit_b - digit_a > 1:
+        return RANK_DIGITS[(digit_a + digit_b + 1) // 2]
+
+    # Consecutive first digits
+    if b is not None and len(b) > 1:
+        return b[0]
+    return RANK_DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid rank key head {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid rank key {key!r}")
+    return key[:length]
+
+
+def _validate_key(key: str) -> None:
+    if key == _SMALLEST_INTEGER:
+        raise ValueError(f"Invalid rank key {key!r}")
+    integer = _integer_part(key)
+    if key[len(integer):].endswith(RANK_DIGITS[0]):
+        raise ValueError(f"Invalid rank key {key!r}: trailing '{RANK_DIGITS[0]}'")
+
+
+def _increment_integer(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    carry = True
+    for i in range(len(digits) - 1, -1, -1):
+        d = RANK_DIGITS.index(digits[i]) + 1
+        if d == len(RANK_DIGITS):
+            digits[i] = RANK_DIGITS[0]
+        else:
+            digits[i] = RANK_DIGITS[d]
+            carry = False
+            break
+
+    if not carry:
+        return head + "".join(digits)
+    if head == "Z":
+        return "a" + RANK_DIGITS[0]
+    if head == "z":
+        return None
+    new_head = chr(ord(head) + 1)
+    if new_head > "a":
+        digits.append(RANK_DIGITS[0])
+    else:
+        digits.pop()
+    return new_head + "".join(digits)
+
+
+def _decrement_integer(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    borrow = True
+    for i in range(len(digits) - 1, -1, -1):
+        d = RANK_DIGITS.index(digits[i]) - 1
+        if d == -1:
+            digits[i] = RANK_DIGITS[-1]
+        else:
+            digits[i] = RANK_DIGITS[d]
+            borrow = False
+            break
+
+    if not borrow:
+        return head + "".join(digits)
+    if head == "a":
+        return "Z" + RANK_DIGITS[-1]
+    if head == "A":
+        return None
+    new_head = chr(ord(head) - 1)
+    if new_head < "Z":
+        digits.append(RANK_DIGITS[-1])
+    else:
+        digits.pop()
+    return new_head + "".join(digits)
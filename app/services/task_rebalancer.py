@@ -0,0 +1,188 @@
+"""
+TaskRebalancer service.
+Re-gaps a user's task positions once repeated bisection has used up the space
+between neighbours, either on demand (from a move) or proactively (from a worker).
+Also rebuilds either ordering key (position or rank) from the other one.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import func, update
+from app.models.task import Task
+from app.services.list_version import task_list_bump
+from app.services.task_rank import rank_between
+from app.services import events
+from app.core.config import settings
+from typing import List, Optional
+from uuid import UUID
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Distance between neighbouring tasks after creation or a rebalance
+POSITION_GAP = 1000
+
+
+def position_between(pos_above: Optional[int], pos_below: Optional[int]) -> Optional[int]:
+    """
+    Position for a task placed between two neighbours (lists are sorted DESC, so
+    "above" is the higher value). A missing neighbour means the top or bottom of
+    the list. Returns None when the neighbours are too close to fit a task between.
+    """
+    if pos_above is None:
+        return pos_below + POSITION_GAP
+    if pos_below is None:
+        return pos_above - POSITION_GAP
+
+    new_position = (pos_above + pos_below) // 2
+    if new_position == pos_above or new_position == pos_below:
+        return None
+    return new_position
+
+
+class TaskRebalancer:
+    """
+    Renumbers task positions back to POSITION_GAP spacing while preserving order.
+    """
+
+    @staticmethod
+    async def rebalance_user(db: AsyncSession, user_id: UUID, order_by: Optional[tuple] = None) -> int:
+        """
+        Renumber all of a user's non-deleted tasks with a single window-function UPDATE.
+        Display order (position DESC, id ASC, or order_by, e.g. the rank order) is
+        preserved and numbering counts down from the user's position counter, so the
+        counter stays above every task. Only rows whose position changes are written,
+        and the task list version is bumped. Does not commit, so it can run inside a
+        caller's transaction.
+
+        Returns:
+            Number of tasks renumbered
+        """
+        if order_by is None:
+            order_by = (Task.position.desc(), Task.id.asc())
+
+        bump = task_list_bump(user_id).cte("task_list_bump")
+        top_position = select(func.coalesce(bump.c.max_task_position, 0)).scalar_subquery()
+
+        ranked = select(
+            Task.id,
+            (
+                top_position
+                - (func.row_number().over(order_by=order_by) - 1) * POSITION_GAP
+            ).label("new_position")
+        ).where(
+            Task.user_id == user_id,
+            Task.deleted_at == None
+        ).subquery()
+
+        stmt = update(Task).where(
+            Task.id == ranked.c.id,
+            Task.position != ranked.c.new_position
+        ).values(position=ranked.c.new_position).execution_options(synchronize_session=False)
+
+        result = await db.execute(stmt)
+        logger.info(f"Rebalanced {result.rowcount} task positions for user {user_id}")
+        return result.rowcount
+
+    @staticmethod
+    async def rekey_user(db: AsyncSession, user_id: UUID) -> int:
+        """
+        Rewrite the rank keys of all of a user's non-deleted tasks from the position
+        order (position DESC, id ASC), as increasing keys from the start of the list.
+        The task list version is bumped first, which also locks the user's writers
+        out. Does not commit, so it can run inside a caller's transaction.
+
+        Returns:
+            Number of tasks rekeyed
+        """
+        await db.execute(task_list_bump(user_id))
+
+        query = select(Task.id).where(
+            Task.user_id == user_id,
+            Task.deleted_at == None
+        ).order_by(Task.position.desc(), Task.id.asc())
+        task_ids = (await db.execute(query)).scalars().all()
+
+        updates = []
+        rank = None
+        for task_id in task_ids:
+            rank = rank_between(rank, None)
+            updates.append({"id": task_id, "rank": rank})
+
+        if updates:
+            # ORM bulk UPDATE by primary key (executemany)
+            await db.execute(update(Task), updates)
+        logger.info(f"Rekeyed {len(updates)} task ranks for user {user_id}")
+        return len(updates)
+
+    @staticmethod
+    async def sync_ordering_keys(db: AsyncSession) -> dict:
+        """
+        Rebuild the key of the ordering engine not in use from the one in use, for
+        every user with tasks. The rank engine keeps positions up to date itself,
+        but the position engine leaves ranks alone (its writes stay one statement),
+        so this runs before switching to ranks. It keeps the board as it is and can
+        be re-run at any time.
+
+        Returns:
+            Dictionary with the number of users and tasks rewritten
+        """
+        query = select(Task.user_id).where(Task.deleted_at == None).distinct()
+        user_ids = (await db.execute(query)).scalars().all()
+
+        tasks = 0
+        for user_id in user_ids:
+            if settings.TASK_ORDERING_ENGINE == "rank":
+                tasks += await TaskRebalancer.rebalance_user(db, user_id, order_by=(Task.rank.asc(), Task.id))
+            else:
+                tasks += await TaskRebalancer.rekey_user(db, user_id)
+            await db.commit()
+
+        return {
+            "users": len(user_ids),
+            "tasks": tasks
+        }
+
+    @staticmethod
+    async def find_crowded_users(db: AsyncSession, min_gap: Optional[int] = None) -> List[UUID]:
+        """
+        Find users whose smallest gap between adjacent task positions is below min_gap.
+        """
+        if min_gap is None:
+            min_gap = settings.TASK_POSITION_REBALANCE_MIN_GAP
+
+        gaps = select(
+            Task.user_id,
+            (
+                func.lag(Task.position).over(partition_by=Task.user_id, order_by=Task.position.desc())
+                - Task.position
+            ).label("gap")
+        ).where(Task.deleted_at == None).subquery()
+
+        query = select(gaps.c.user_id).where(gaps.c.gap < min_gap).distinct()
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def rebalance_crowded_users(db: AsyncSession) -> dict:
+        """
+        Proactively re-gap every user that is running out of room between tasks.
+        Nothing to do when the rank ordering engine is enabled.
+
+        Returns:
+            Dictionary with the number of users and tasks rebalanced
+        """
+        if settings.TASK_ORDERING_ENGINE == "rank":
+            return {"users": 0, "tasks": 0}
+
+        user_ids = await TaskRebalancer.find_crowded_users(db)
+
+        tasks = 0
+        for user_id in user_ids:
+            tasks += await TaskRebalancer.rebalance_user(db, user_id)
+            await db.commit()
+            await events.publish_event(user_id, events.RESYNC)
+
+        return {
+            "users": len(user_ids),
+            "tasks": tasks
+        }
@@ -33,4 +33,8 @@ celery_app.conf.beat_schedule = {
         "task": "app.workers.tasks.send_notifications_task",
         "schedule": 3600.0,  # Every hour (in seconds)
     },
+    "rebalance-task-positions": {
+        "task": "app.workers.tasks.rebalance_task_positions_task",
+        "schedule": 21600.0,  # Every 6 hours (in seconds)
+    },
 }
@@ -1,23 +1,56 @@
 """
 Celery tasks for notification processing.
 """
+from celery.signals import worker_process_init, worker_process_shutdown
 from app.workers.celery_app import celery_app
-from app.core.database import async_session_maker
+from app.core.database import async_session_maker, replica_session_maker
+from app.core.redis import init_redis, close_redis
 from app.services.notification_generator import NotificationGenerator
 from app.services.notification_sender import NotificationSender
+from app.services.task_rebalancer import TaskRebalancer
+from typing import Optional
 import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Event loop of this worker process. Tasks run on it one at a time, so the
+# Redis pool created on it stays warm from one task to the next.
+_process_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    global _process_loop
+    _process_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_process_loop)
+    _process_loop.run_until_complete(init_redis())
+    # Load the Firebase credentials now rather than in the first send
+    NotificationSender._initialize_fcm()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    global _process_loop
+    if _process_loop is not None and not _process_loop.is_closed():
+        _process_loop.run_until_complete(close_redis())
+        _process_loop.close()
+    _process_loop = None
+
 
 def run_async(coro):
     """Helper to run async code in sync context."""
+    if _process_loop is not None and not _process_loop.is_closed():
+        return _process_loop.run_until_complete(coro)
+
+    # No process loop (e.g. solo pool or eager mode): use a throwaway one
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     try:
         return loop.run_until_complete(coro)
     finally:
+        # Sockets opened on this loop (e.g. for event publishing) die with it
+        loop.run_until_complete(close_redis())
         loop.close()
 
 
@@ -30,9 +63,9 @@ def generate_notifications_task():
     logger.info("Starting notification generation task")
     
     async def _generate():
-        async with async_session_maker() as db:
+        async with async_session_maker() as db, replica_session_maker() as read_db:
             try:
-                result = await NotificationGenerator.generate_all(db)
+                result = await NotificationGenerator.generate_all(db, read_db)
                 logger.info(f"Notification generation complete: {result}")
                 return result
             except Exception as e:
@@ -61,3 +94,46 @@ def send_notifications_task():
                 raise
     
     return run_async(_send())
+
+
+@celery_app.task(name="app.workers.tasks.rebalance_task_positions_task")
+def rebalance_task_positions_task():
+    """
+    Periodic task to re-gap task positions.
+    Runs every 6 hours so moves rarely have to rebalance inline.
+    """
+    logger.info("Starting task position rebalance task")
+    
+    async def _rebalance():
+        async with async_session_maker() as db:
+            try:
+                result = await TaskRebalancer.rebalance_crowded_users(db)
+                logger.info(f"Task position rebalance complete: {result}")
+                return result
+            except Exception as e:
+                logger.error(f"Error in task position rebalance: {e}")
+                raise
+    
+    return run_async(_rebalance())
+
+
+@celery_app.task(name="app.workers.tasks.sync_task_ordering_task")
+def sync_task_ordering_task():
+    """
+    One-off task rebuilding the ordering key not in use (rank or position) from
+    the one in use (TASK_ORDERING_ENGINE). Run it right before switching from
+    positions to ranks, which the position engine doesn't keep up to date.
+    """
+    logger.info("Starting task ordering sync task")
+
+    async def _sync():
+        async with async_session_maker() as db:
+            try:
+                result = await TaskRebalancer.sync_ordering_keys(db)
+                logger.info(f"Task ordering sync complete: {result}")
+                return result
+            except Exception as e:
+                logger.error(f"Error in task ordering sync: {e}")
+                raise
+
+    return run_async(_sync())
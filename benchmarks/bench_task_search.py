@@ -0,0 +1,124 @@
+"""
+Benchmark of GET /tasks/search queries (TaskService.search_tasks).
+
+    python -m benchmarks.bench_task_search [--tasks 1000000] [--users 1000] [--queries 500]
+
+Seeds users and tasks with random titles and descriptions (word frequencies
+skewed, so some words match a large share of all tasks) into the database the
+app is configured for, runs searches for random users and prints latency
+percentiles and one query plan. The seed is committed and vacuumed first, as
+production rows would be, and deleted again at the end; the database must be
+migrated to head. Seeding a million tasks takes a minute or two.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.config import settings
+from app.services.task import TaskService
+
+WORDS = (
+    "report budget meeting review call email invoice plan design draft client release deploy fix bug test "
+    "doctor dentist groceries milk bread laundry garden car insurance taxes rent passport flight hotel "
+    "birthday gift party dinner recipe gym run yoga book article podcast course homework exam slides "
+    "presentation contract lawyer bank loan mortgage repair plumber electrician paint shelf closet window "
+    "backup server database migration index query cache metrics dashboard alert incident postmortem "
+    "roadmap quarterly hiring interview onboarding feedback salary vacation conference workshop"
+).split()
+
+QUERIES = ("{common}", "{rare}", "{common} {rare}", '"{common} {rare}"', "{rare} or {common}", "{common} -{rare}")
+
+
+async def seed(connection, run: str, tasks: int, users: int) -> list:
+    user_ids = (await connection.execute(text("""
+        INSERT INTO "user" (id, email, external_id, task_list_version, notification_list_version)
+        SELECT gen_random_uuid(), 'bench-' || :run || '-' || g || '@example.com', 'bench-' || :run || '-' || g, 0, 0
+        FROM generate_series(1, :users) g
+        RETURNING id
+    """), {"run": run, "users": users})).scalars().all()
+
+    # Early words are picked far more often (random() squared): a few of them are
+    # in a large share of all tasks. "+ 0 * n" makes each word a new pick.
+    await connection.execute(text("""
+        INSERT INTO task (id, title, description, status, position, user_id, created_at, updated_at, status_changed_at)
+        SELECT
+            gen_random_uuid(),
+            (SELECT string_agg(words[1 + floor(cardinality(words) * random() ^ 2)::int + 0 * n], ' ')
+             FROM generate_series(1, 2 + g % 5) n),
+            CASE WHEN g % 3 = 0 THEN NULL ELSE
+                (SELECT string_agg(words[1 + floor(cardinality(words) * random() ^ 2)::int + 0 * n], ' ')
+                 FROM generate_series(1, 5 + g % 20) n)
+            END,
+            'TODO',
+            g,
+            user_ids[1 + g % cardinality(user_ids)],
+            now(), now(), now()
+        FROM generate_series(1, :tasks) g,
+             (SELECT CAST(:words AS text[]) AS words, CAST(:user_ids AS uuid[]) AS user_ids) params
+    """), {"tasks": tasks, "words": list(WORDS), "user_ids": list(user_ids)})
+    return list(user_ids)
+
+
+async def clean_up(connection, run: str) -> None:
+    users = """SELECT id FROM "user" WHERE external_id LIKE 'bench-' || :run || '-%'"""
+    await connection.execute(text(f"DELETE FROM task WHERE user_id IN ({users})"), {"run": run})
+    await connection.execute(text(users.replace("SELECT id", "DELETE")), {"run": run})
+
+
+def percentile(samples: list, p: float) -> float:
+    return statistics.quantiles(samples, n=100)[int(p) - 1] if len(samples) > 1 else samples[0]
+
+
+async def main(tasks: int, users: int, queries: int) -> None:
+    engine = create_async_engine(settings.get_database_url())
+    run = uuid.uuid4().hex[:8]
+    try:
+        start = time.perf_counter()
+        async with engine.begin() as connection:
+            user_ids = await seed(connection, run, tasks, users)
+        async with engine.connect() as connection:
+            # VACUUM can't run in a transaction block
+            await (await connection.execution_options(isolation_level="AUTOCOMMIT")).execute(text("VACUUM ANALYZE task"))
+        print(f"Seeded {tasks} tasks for {users} users in {time.perf_counter() - start:.1f}s")
+
+        async with engine.connect() as connection:
+            db = AsyncSession(bind=connection)
+            common, rare = WORDS[:10], WORDS[len(WORDS) // 2:]
+            timings = {shape: [] for shape in QUERIES}
+            for _ in range(queries):
+                shape = random.choice(QUERIES)
+                q = shape.format(common=random.choice(common), rare=random.choice(rare))
+                start = time.perf_counter()
+                await TaskService.search_tasks(db, random.choice(user_ids), q)
+                timings[shape].append((time.perf_counter() - start) * 1000)
+
+            for shape, samples in [("all", sum(timings.values(), [])), *timings.items()]:
+                print(f"{shape:>20}: {len(samples)} searches, p50 {percentile(samples, 50):.2f} ms, "
+                      f"p95 {percentile(samples, 95):.2f} ms, p99 {percentile(samples, 99):.2f} ms, max {max(samples):.2f} ms")
+
+            plan = await connection.execute(text("""
+                EXPLAIN (ANALYZE, COSTS OFF)
+                SELECT id FROM task
+                WHERE user_id = :user_id AND deleted_at IS NULL
+                  AND search_vector @@ websearch_to_tsquery('english', :q)
+                ORDER BY ts_rank(search_vector, websearch_to_tsquery('english', :q)) DESC, id
+                LIMIT 20
+            """), {"user_id": user_ids[0], "q": common[0]})
+            print("\n".join(plan.scalars()))
+    finally:
+        async with engine.begin() as connection:
+            await clean_up(connection, run)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.users, args.queries))
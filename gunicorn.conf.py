@@ -0,0 +1,27 @@
+"""
+Production server settings: `gunicorn app.main:app` picks this file up from
+the working directory. Gunicorn supervises settings.web_workers uvicorn worker
+processes (uvloop + httptools), each running the app with its own event loop,
+connection pools and lifespan; every WEB_* value comes from app.core.config.
+"""
+from app.core.config import settings
+
+bind = settings.WEB_BIND
+workers = settings.web_workers
+worker_class = "app.core.server.UvicornWorker"
+
+keepalive = settings.WEB_KEEPALIVE_SECONDS
+backlog = settings.WEB_BACKLOG
+
+# Recycle workers after a (jittered) request count, so slow leaks can't build up;
+# the replacement is started before the old worker drains its open requests
+max_requests = settings.WEB_MAX_REQUESTS
+max_requests_jitter = settings.WEB_MAX_REQUESTS_JITTER
+timeout = settings.WEB_TIMEOUT_SECONDS
+graceful_timeout = settings.WEB_GRACEFUL_TIMEOUT_SECONDS
+
+# The app is imported in each worker after the fork: engines, Redis pools and
+# event loops must not be shared between processes
+preload_app = False
+
+accesslog = "-"
@@ -0,0 +1,236 @@
+import asyncio
+import httpx
+import json
+import pytest
+import time
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.deps import get_current_user
+from app.api.idempotency import IdempotentRoute, idempotency_key
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.services import idempotency
+from app.services.idempotency import IdempotencyStore
+
+client = TestClient(app)
+
+TASK = {"title": "Buy milk", "description": None}
+
+
+class FakeRedis:
+    """
+    The subset of redis.asyncio.Redis the idempotency store uses, kept in a dict
+    with expiry times; its Lua scripts are mirrored in Python.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _expire(self, key):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key)
+
+    async def get(self, key):
+        self._expire(key)
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        self._expire(key)
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        self.expires[key] = time.monotonic() + (ex if ex is not None else float("inf"))
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    def register_script(self, script):
+        async def run(keys, args):
+            key, claim = keys[0], args[0]
+            if await self.get(key) != claim:
+                return 0
+            if script == idempotency.COMPLETE:
+                await self.set(key, args[1], ex=args[2])
+            elif script == idempotency.RENEW:
+                self.expires[key] = time.monotonic() + args[1]
+            else:
+                await self.delete(key)
+            return 1
+        return run
+
+
+@pytest.fixture
+def redis():
+    redis = FakeRedis()
+    with patch("app.services.idempotency.get_redis", return_value=redis), \
+            patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=0)):
+        yield redis
+
+
+@pytest.fixture
+def mock_user():
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123")
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides.clear()
+
+
+def created(user, delay=0):
+    async def create_task(db, task_in, user_id):
+        await asyncio.sleep(delay)
+        now = datetime.now(timezone.utc)
+        return Task(
+            id=uuid4(), title=task_in.title, description=task_in.description, user_id=user.id,
+            status=TaskStatus.TODO, position=1000, created_at=now, updated_at=now
+        )
+    return AsyncMock(side_effect=create_task)
+
+
+def test_retries_replay_the_first_response(redis, mock_user):
+    with patch("app.services.task.TaskService.create_task", created(mock_user)) as create:
+        first = client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k1"})
+        retry = client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k1"})
+
+    assert create.await_count == 1
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert int(retry.headers["content-length"]) == len(retry.content)
+
+
+def test_requests_without_a_key_always_run(redis, mock_user):
+    with patch("app.services.task.TaskService.create_task", created(mock_user)) as create:
+        client.post("/tasks", json=TASK)
+        client.post("/tasks", json=TASK)
+    assert create.await_count == 2
+    assert redis.data == {}
+
+
+def test_keys_are_scoped_per_user(redis, mock_user):
+    other = User(id=uuid4(), email="other@example.com", external_id="fake-sub-456")
+    with patch("app.services.task.TaskService.create_task", created(mock_user)) as create:
+        client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k1"})
+        app.dependency_overrides[get_current_user] = lambda: other
+        client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k1"})
+    assert create.await_count == 2
+
+
+def test_reusing_a_key_for_a_different_request_is_rejected(redis, mock_user):
+    with patch("app.services.task.TaskService.create_task", created(mock_user)) as create:
+        client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k1"})
+        response = client.post("/tasks", json={"title": "Something else"}, headers={"Idempotency-Key": "k1"})
+
+    assert response.status_code == 422
+    assert create.await_count == 1
+
+
+def test_failed_requests_release_the_key(redis, mock_user):
+    task_id, move = uuid4(), {"above_id": str(uuid4())}
+    with patch("app.services.task.TaskService.move_task", AsyncMock(side_effect=HTTPException(status_code=404))) as move_task:
+        response = client.patch(f"/tasks/{task_id}/move", json=move, headers={"Idempotency-Key": "k2"})
+        assert response.status_code == 404
+        assert redis.data == {}
+        client.patch(f"/tasks/{task_id}/move", json=move, headers={"Idempotency-Key": "k2"})
+    assert move_task.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_the_first(redis, mock_user):
+    with patch("app.services.task.TaskService.create_task", created(mock_user, delay=0.1)) as create:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            responses = await asyncio.gather(*(
+                client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k3"}) for _ in range(3)
+            ))
+
+    assert create.await_count == 1
+    assert [response.status_code for response in responses] == [201] * 3
+    assert len({response.json()["id"] for response in responses}) == 1
+
+
+@pytest.mark.asyncio
+async def test_duplicate_gets_409_when_the_first_outlasts_the_wait(redis, mock_user):
+    with patch("app.services.task.TaskService.create_task", created(mock_user, delay=0.2)), \
+            patch("app.services.idempotency.settings.IDEMPOTENCY_LOCK_MS", 50):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k4"}))
+            await asyncio.sleep(0.02)
+            duplicate = await client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k4"})
+            assert (await first).status_code == 201
+
+    assert duplicate.status_code == 409
+    assert duplicate.headers["Retry-After"] == "1"
+
+
+def test_writes_run_normally_without_redis(mock_user):
+    with patch("app.services.idempotency.get_redis", side_effect=ConnectionError("down")), \
+            patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=0)), \
+            patch("app.services.task.TaskService.create_task", created(mock_user)) as create:
+        responses = [client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k5"}) for _ in range(2)]
+
+    assert [response.status_code for response in responses] == [201, 201]
+    assert create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_long_requests_keep_their_claim(redis, mock_user):
+    # The first request runs for many claim lifetimes; the duplicate waits throughout
+    with patch("app.services.task.TaskService.create_task", created(mock_user, delay=0.3)) as create, \
+            patch("app.services.idempotency.settings.IDEMPOTENCY_CLAIM_SECONDS", 0.06):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k6"}))
+            await asyncio.sleep(0.2)
+            duplicate = await client.post("/tasks", json=TASK, headers={"Idempotency-Key": "k6"})
+            first = await first
+
+    assert create.await_count == 1
+    assert duplicate.headers["Idempotent-Replayed"] == "true"
+    assert duplicate.json() == first.json()
+
+
+@pytest.mark.asyncio
+async def test_lapsed_claims_are_not_overwritten_or_released(redis):
+    user_id = uuid4()
+    assert await IdempotencyStore.claim(user_id, "k7", "fp", "first") is None
+    # The first owner's claim lapsed and a retry claimed the key again
+    redis.data.clear()
+    assert await IdempotencyStore.claim(user_id, "k7", "fp", "retry") is None
+
+    await IdempotencyStore.complete(user_id, "k7", "fp", "first", {"status": 201})
+    await IdempotencyStore.release(user_id, "k7", "fp", "first")
+
+    assert json.loads(redis.data[f"idempotency:{user_id}:k7"]) == {"fingerprint": "fp", "owner": "retry"}
+
+
+def endpoint_client(endpoint):
+    """A client for a single idempotent endpoint."""
+    router = APIRouter(route_class=IdempotentRoute, dependencies=[Depends(idempotency_key)])
+    router.add_api_route("/write", endpoint, methods=["POST"])
+    endpoint_app = FastAPI()
+    endpoint_app.include_router(router)
+    endpoint_app.dependency_overrides = app.dependency_overrides
+    return TestClient(endpoint_app)
+
+
+def returns_409():
+    return JSONResponse({"detail": "Conflict"}, status_code=409)
+
+
+def raises_409():
+    raise HTTPException(status_code=409)
+
+
+@pytest.mark.parametrize("endpoint", [returns_409, raises_409])
+def test_error_responses_release_the_key_whether_raised_or_returned(redis, mock_user, endpoint):
+    response = endpoint_client(endpoint).post("/write", headers={"Idempotency-Key": "k8"})
+
+    assert response.status_code == 409
+    assert redis.data == {}
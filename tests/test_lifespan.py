@@ -0,0 +1,152 @@
+import httpx
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core import database
+from app.core.jwks import JWKSCache
+from app.workers import tasks as worker_tasks
+
+KEYS = {"keys": [{"kid": "a", "kty": "RSA"}, {"kid": "b", "kty": "RSA"}]}
+
+
+def cognito(*responses):
+    """Serve the given JWKS responses in turn; returns the patch and the request log."""
+    requests = []
+    queue = list(responses)
+
+    def handler(request):
+        requests.append(request)
+        response = queue.pop(0) if len(queue) > 1 else queue[0]
+        if isinstance(response, Exception):
+            raise response
+        return httpx.Response(200, json=response)
+
+    real_client = httpx.AsyncClient
+    transport = httpx.MockTransport(handler)
+    return patch("app.core.jwks.httpx.AsyncClient", lambda **kwargs: real_client(transport=transport, **kwargs)), requests
+
+
+@pytest.mark.asyncio
+async def test_jwks_fetched_once_and_reused():
+    mock, requests = cognito(KEYS)
+    cache = JWKSCache()
+    with mock:
+        await cache.preload()
+        assert (await cache.get_key("a"))["kid"] == "a"
+        assert (await cache.get_key("b"))["kid"] == "b"
+
+    assert len(requests) == 1
+    assert requests[0].url.path.endswith("/.well-known/jwks.json")
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refetches_at_most_once_per_interval():
+    rotated = {"keys": [{"kid": "c", "kty": "RSA"}]}
+    mock, requests = cognito(KEYS, rotated)
+    cache = JWKSCache()
+    with mock, patch("app.core.jwks.settings.JWKS_MIN_REFRESH_SECONDS", 0):
+        await cache.preload()
+        assert (await cache.get_key("c"))["kid"] == "c"
+    assert len(requests) == 2
+
+    with mock, patch("app.core.jwks.settings.JWKS_MIN_REFRESH_SECONDS", 3600):
+        assert await cache.get_key("made-up") is None
+        assert await cache.get_key("made-up") is None
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_keys_survive_a_failed_refresh():
+    mock, requests = cognito(KEYS, httpx.ConnectError("down"))
+    cache = JWKSCache()
+    with mock:
+        await cache.preload()
+        with patch("app.core.jwks.settings.JWKS_CACHE_SECONDS", 0), \
+                patch("app.core.jwks.settings.JWKS_MIN_REFRESH_SECONDS", 0):
+            assert (await cache.get_key("a"))["kid"] == "a"
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_no_keys_and_cognito_down_raises():
+    mock, _ = cognito(httpx.ConnectError("down"))
+    cache = JWKSCache()
+    with mock:
+        await cache.preload()  # logged only
+        with pytest.raises(httpx.ConnectError):
+            await cache.get_key("a")
+
+
+@pytest.mark.asyncio
+async def test_ensure_fresh_refreshes_only_expired_keys():
+    mock, requests = cognito(KEYS)
+    cache = JWKSCache()
+    with mock, patch("app.core.jwks.settings.JWKS_MIN_REFRESH_SECONDS", 0):
+        await cache.ensure_fresh()
+        await cache.ensure_fresh()
+        assert len(requests) == 1
+        assert cache.age() < 1
+
+        with patch("app.core.jwks.settings.JWKS_CACHE_SECONDS", 0):
+            await cache.ensure_fresh()
+        assert len(requests) == 2
+
+
+def test_lifespan_warms_up_before_serving_and_cleans_up_after():
+    calls = []
+
+    def record(name):
+        return AsyncMock(side_effect=lambda *args: calls.append(name))
+
+    with patch("app.main.init_redis", record("redis")), \
+            patch("app.main.warm_up_database", record("database")) as warm_up, \
+            patch("app.main.jwks_cache.preload", record("jwks")), \
+            patch("app.main.broker.close", record("broker.close")), \
+            patch("app.main.close_redis", record("close_redis")), \
+            patch("app.main.dispose_engines", record("dispose_engines")), \
+            patch("app.main.redis_pool_stats", return_value={}):
+        with TestClient(app) as client:
+            assert sorted(calls) == ["database", "jwks", "redis"]
+            assert client.get("/health").status_code == 200
+        warm_up.assert_awaited_once_with(database.settings.DB_WARM_CONNECTIONS)
+
+    assert calls[3:] == ["broker.close", "close_redis", "dispose_engines"]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_separate_connections_per_engine():
+    opened = []
+
+    def fake_engine(name):
+        engine = MagicMock()
+        engine.pool.size.return_value = 5
+
+        def connect():
+            connection = AsyncMock()
+            opened.append(name)
+            context = MagicMock()
+            context.__aenter__ = AsyncMock(return_value=connection)
+            context.__aexit__ = AsyncMock(return_value=False)
+            return context
+
+        engine.connect.side_effect = connect
+        return engine
+
+    failing = MagicMock()
+    failing.connect.side_effect = OSError("replica down")
+    with patch.object(database, "engine", fake_engine("primary")), \
+            patch.object(database, "replica_engines", [fake_engine("replica"), failing]):
+        await database.warm_up_database(3)
+
+    assert opened == ["primary"] * 3 + ["replica"] * 3
+
+
+def test_worker_process_init_loads_fcm():
+    with patch.object(worker_tasks, "init_redis", new_callable=AsyncMock), \
+            patch.object(worker_tasks, "close_redis", new_callable=AsyncMock), \
+            patch.object(worker_tasks.NotificationSender, "_initialize_fcm") as initialize_fcm:
+        worker_tasks.init_worker_process()
+        worker_tasks.shutdown_worker_process()
+
+    initialize_fcm.assert_called_once()
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi.testclient import TestClient
+from uuid import uuid4
+from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.main import app
+from app.core.database import get_db
+from app.models.user import User
+from app.models.task import Task, TaskStatus
+from app.services import events
+from app.services.events import EventBroker, publish_event, channel_for
+from app.services.task import TaskService
+from app.api.events import event_stream, format_event, HEARTBEAT
+
+client = TestClient(app)
+
+
+def fake_redis():
+    """Redis stand-in whose pub/sub connection never receives anything."""
+    redis = MagicMock()
+    redis.publish = AsyncMock()
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.unsubscribe = AsyncMock()
+
+    async def get_message(**kwargs):
+        await asyncio.Event().wait()
+
+    pubsub.get_message = get_message
+    redis.pubsub.return_value = pubsub
+    return redis
+
+
+class TestEventStream:
+    """Tests for the SSE framing of GET /events."""
+
+    def test_format_event(self):
+        message = json.dumps({"type": "task.updated", "data": {"id": "1"}})
+        assert format_event(message) == b'event: task.updated\ndata: {"id": "1"}\n\n'
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_when_idle_and_end_on_close(self):
+        queue = asyncio.Queue()
+        stream = event_stream(queue, heartbeat=0.01)
+
+        assert await stream.__anext__() == HEARTBEAT
+
+        queue.put_nowait(json.dumps({"type": "resync", "data": {}}))
+        assert await stream.__anext__() == b"event: resync\ndata: {}\n\n"
+
+        queue.put_nowait(None)
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+
+
+class TestEventBroker:
+    """Tests for the per-process pub/sub fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_one_subscription_per_user(self):
+        redis = fake_redis()
+        broker = EventBroker(queue_size=10)
+        user_id = uuid4()
+
+        with patch("app.services.events.get_redis", return_value=redis):
+            first = await broker.subscribe(user_id)
+            second = await broker.subscribe(user_id)
+            pubsub = redis.pubsub.return_value
+            pubsub.subscribe.assert_awaited_once_with(channel_for(user_id))
+
+            broker.dispatch(channel_for(user_id), "message")
+            broker.dispatch(channel_for(uuid4()), "someone else's")
+            assert first.get_nowait() == second.get_nowait() == "message"
+            assert first.empty()
+
+            await broker.unsubscribe(user_id, first)
+            pubsub.unsubscribe.assert_not_called()
+            await broker.unsubscribe(user_id, second)
+            pubsub.unsubscribe.assert_awaited_once_with(channel_for(user_id))
+
+        broker._reader.cancel()
+
+    @pytest.mark.asyncio
+    async def test_slow_stream_memory_is_bounded(self):
+        broker = EventBroker(queue_size=3)
+        user_id = uuid4()
+
+        with patch("app.services.events.get_redis", return_value=fake_redis()):
+            queue = await broker.subscribe(user_id)
+            for i in range(50):
+                broker.dispatch(channel_for(user_id), json.dumps({"type": "task.updated", "data": {"i": i}}))
+
+        assert queue.qsize() <= 3
+        assert json.loads(queue.get_nowait())["type"] == "resync"
+        broker._reader.cancel()
+
+
+@pytest.mark.asyncio
+async def test_publish_failures_do_not_fail_the_write():
+    redis = MagicMock()
+    redis.publish = AsyncMock(side_effect=ConnectionError("redis down"))
+
+    with patch("app.services.events.get_redis", return_value=redis):
+        await publish_event(uuid4(), events.RESYNC)
+
+
+@pytest.mark.asyncio
+async def test_task_writes_publish_after_commit():
+    user_id = uuid4()
+    now = datetime.now(timezone.utc)
+    created = Task(
+        id=uuid4(), title="Task", user_id=user_id, status=TaskStatus.TODO,
+        position=0, created_at=now, updated_at=now
+    )
+    db = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = created
+    db.execute.return_value = mock_result
+    redis = fake_redis()
+
+    async def publish(channel, message):
+        # Clients may re-fetch as soon as they see the event, so it must follow the commit
+        db.commit.assert_awaited_once()
+
+    redis.publish.side_effect = publish
+
+    with patch("app.services.events.get_redis", return_value=redis):
+        await TaskService.create_task(db, MagicMock(title="Task", description=None, due_date=None), user_id)
+
+    channel, message = redis.publish.call_args[0]
+    assert channel == f"events:{user_id}"
+    event = json.loads(message)
+    assert event["type"] == "task.created"
+    assert event["data"]["id"] == str(created.id)
+
+
+def test_events_requires_a_token():
+    response = client.get("/events")
+    assert response.status_code == 401
+
+
+def test_events_accepts_query_token():
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123")
+    db = AsyncMock(spec=AsyncSession)
+
+    async def override_get_db():
+        yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    with patch("app.api.deps.authenticate", AsyncMock(return_value=user)) as mock_auth, \
+         patch("app.api.events.broker.subscribe", AsyncMock(side_effect=ConnectionError("redis down"))):
+        response = client.get("/events?access_token=abc")
+
+    app.dependency_overrides.clear()
+    assert mock_auth.call_args[0][1] == "abc"
+    # The DB connection is released before streaming starts
+    db.close.assert_awaited()
+    assert response.status_code == 503
+
+
+def test_websocket_gateway_registers_connection():
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123")
+    registry = MagicMock()
+    registry.register = AsyncMock()
+    registry.unregister = AsyncMock()
+
+    with patch("app.api.events.authenticate", AsyncMock(return_value=user)), \
+         patch("app.api.events.ConnectionRegistry", registry), \
+         patch("app.api.events.broker", EventBroker()), \
+         patch("app.services.events.get_redis", return_value=fake_redis()), \
+         patch("app.api.events.settings.EVENTS_HEARTBEAT_SECONDS", 0.05), \
+         patch("app.api.events.settings.WS_CONNECTION_REFRESH_SECONDS", 0.02):
+        with client.websocket_connect("/ws?access_token=abc") as websocket:
+            assert json.loads(websocket.receive_text())["type"] == "heartbeat"
+
+    registry.register.assert_awaited()
+    assert registry.register.call_args[0][0] == user.id
+    # The same registry entry was refreshed
+    assert registry.register.await_count >= 2
+    assert len({call[0][1] for call in registry.register.call_args_list}) == 1
+    registry.unregister.assert_awaited_once_with(user.id, registry.register.call_args[0][1])
+
+
+class SteadyBroker:
+    """Broker stand-in delivering an event to the subscriber every 10ms."""
+
+    async def subscribe(self, user_id):
+        queue = asyncio.Queue()
+
+        async def produce():
+            while True:
+                await queue.put(json.dumps({"type": "task.updated", "data": {}}))
+                await asyncio.sleep(0.01)
+
+        self.producer = asyncio.create_task(produce())
+        return queue
+
+    async def unsubscribe(self, user_id, queue):
+        self.producer.cancel()
+
+
+def test_websocket_gateway_stays_registered_under_steady_traffic():
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123")
+    registry = MagicMock()
+    registry.register = AsyncMock()
+    registry.unregister = AsyncMock()
+
+    # Events arrive far more often than the heartbeat: the socket never idles
+    with patch("app.api.events.authenticate", AsyncMock(return_value=user)), \
+         patch("app.api.events.ConnectionRegistry", registry), \
+         patch("app.api.events.broker", SteadyBroker()), \
+         patch("app.api.events.settings.EVENTS_HEARTBEAT_SECONDS", 60), \
+         patch("app.api.events.settings.WS_CONNECTION_REFRESH_SECONDS", 0.05):
+        with client.websocket_connect("/ws?access_token=abc") as websocket:
+            types = {json.loads(websocket.receive_text())["type"] for _ in range(30)}
+
+    assert types == {"task.updated"}
+    # Registered on connect, then refreshed on the clock regardless of traffic
+    assert registry.register.await_count >= 3
+
+
+def test_websocket_gateway_rejects_bad_token():
+    from fastapi import HTTPException
+    from starlette.websockets import WebSocketDisconnect
+
+    with patch("app.api.events.authenticate", AsyncMock(side_effect=HTTPException(status_code=401))):
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect("/ws?access_token=bad"):
+                pass
+
+    assert exc.value.code == 1008
@@ -0,0 +1,126 @@
+import asyncio
+import time
+import pytest
+from datetime import datetime, timezone, timedelta
+from uuid import uuid4
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.main import app
+from app.core.loop_monitor import LoopMonitor, BlockingDetector, loop_monitor
+from app.models.task import Task, TaskStatus
+from app.models.notification import Notification, NotificationType, NotificationStatus, DeviceToken
+from app.schemas.auth import AuthRequest
+from app.services.auth import AuthService
+from app.services.notification_sender import NotificationSender
+
+# Stalls shorter than this are scheduling noise, not blocking calls
+THRESHOLD = 0.05
+
+
+def hold_the_loop(seconds=0.2):
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_monitor_measures_lag_while_the_loop_is_blocked():
+    monitor = LoopMonitor()
+    with patch("app.core.loop_monitor.settings.LOOP_MONITOR_INTERVAL_SECONDS", 0.01), \
+            patch("app.core.loop_monitor.settings.LOOP_BLOCKING_THRESHOLD_MS", 50):
+        monitor.start()
+        await asyncio.sleep(0.05)
+        assert monitor.stats()["max_lag_ms"] < 50
+
+        hold_the_loop()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["max_lag_ms"] >= 150
+    assert stats["stalls"] == 1
+    assert not monitor.running()
+
+
+@pytest.mark.asyncio
+async def test_detector_logs_the_stack_holding_the_loop(caplog):
+    with BlockingDetector(THRESHOLD) as detector:
+        await asyncio.sleep(THRESHOLD * 2)
+        hold_the_loop()
+        await asyncio.sleep(THRESHOLD * 2)
+
+    assert len(detector.blocked) == 1
+    assert "in hold_the_loop" in detector.blocked[0]
+    assert "Event loop blocked" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_debug_mode_starts_the_detector():
+    monitor = LoopMonitor()
+    with patch("app.core.loop_monitor.settings.LOOP_MONITOR_DEBUG", True):
+        monitor.start()
+        assert isinstance(monitor._detector, BlockingDetector)
+        await monitor.stop()
+    assert monitor._detector is None
+
+
+# Slow I/O in SDKs must run off the loop: each test below makes the SDK call
+# slow and fails if the loop was held while waiting for it.
+
+@pytest.mark.asyncio
+async def test_cognito_calls_do_not_block_the_loop():
+    db = MagicMock(spec=AsyncSession)
+    db.execute.return_value = MagicMock()
+
+    with patch("boto3.client") as boto, BlockingDetector(THRESHOLD) as detector:
+        boto.return_value.initiate_auth.side_effect = lambda **kwargs: hold_the_loop() or {
+            "AuthenticationResult": {"AccessToken": "a", "TokenType": "Bearer", "RefreshToken": "r", "ExpiresIn": 3600}
+        }
+        result = await AuthService.signin(AuthRequest(email="test@example.com", password="password123"), db)
+
+    assert result.access_token == "a"
+    assert detector.blocked == []
+
+
+@pytest.mark.asyncio
+async def test_fcm_sends_do_not_block_the_loop():
+    notification = Notification(
+        id=uuid4(), user_id=uuid4(), task_id=uuid4(), type=NotificationType.DUE_DATE_APPROACHING,
+        status=NotificationStatus.PENDING, scheduled_for=datetime.now(timezone.utc) - timedelta(minutes=5)
+    )
+    device_token = DeviceToken(id=uuid4(), user_id=notification.user_id, token="fake-token", platform="web")
+    task = Task(id=notification.task_id, user_id=notification.user_id, title="Report", status=TaskStatus.TODO,
+                due_date=datetime.now(timezone.utc) + timedelta(hours=6))
+
+    with patch.object(NotificationSender, "get_device_tokens_for_user", return_value=[device_token]), \
+            patch.object(NotificationSender, "get_task", return_value=task), \
+            patch.object(NotificationSender, "_send_fcm_message", side_effect=lambda *args, **kwargs: hold_the_loop() or ([True], None)), \
+            BlockingDetector(THRESHOLD) as detector:
+        assert await NotificationSender.send_notification(AsyncMock(), notification) is True
+
+    assert detector.blocked == []
+
+
+def test_lifespan_runs_the_monitor_and_health_reports_it():
+    with patch("app.main.init_redis", AsyncMock()), \
+            patch("app.main.warm_up_database", AsyncMock()), \
+            patch("app.main.jwks_cache.preload", AsyncMock()), \
+            patch("app.main.redis_pool_stats", return_value={}), \
+            patch("app.core.loop_monitor.settings.LOOP_MONITOR_INTERVAL_SECONDS", 0.01):
+        with TestClient(app) as client:
+            assert loop_monitor.running()
+            time.sleep(0.05)
+            event_loop = client.get("/health").json()["event_loop"]
+            assert event_loop["lag_ms"] is not None
+            assert set(event_loop) == {"lag_ms", "max_lag_ms", "stalls"}
+    assert not loop_monitor.running()
+
+
+def test_readiness_uses_the_monitor_sample():
+    with patch("app.core.readiness.loop_monitor.lag", return_value=0.5), \
+            patch("app.core.readiness._database", AsyncMock(return_value={"ok": True})), \
+            patch("app.core.readiness._redis", AsyncMock(return_value={"ok": True})), \
+            patch("app.core.readiness._jwks", AsyncMock(return_value={"ok": True})):
+        response = TestClient(app).get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["event_loop"] == {"ok": False, "lag_ms": 500.0, "limit": 100}
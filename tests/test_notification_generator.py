@@ -193,3 +193,21 @@ class TestNotificationGenerator:
         assert "stale_task" in result
         assert "total" in result
         assert result["total"] == result["due_date_approaching"] + result["stale_task"]
+
+    @pytest.mark.asyncio
+    async def test_generate_all_scans_read_db_and_writes_primary(self, mock_db, sample_task_due_soon):
+        """Candidate scans can run on a read replica; notifications are written to the primary."""
+        read_db = AsyncMock()
+        due, stale = MagicMock(), MagicMock()
+        due.scalars.return_value.all.return_value = [sample_task_due_soon]
+        stale.scalars.return_value.all.return_value = []
+        read_db.execute.side_effect = [due, stale]
+
+        result = await NotificationGenerator.generate_all(mock_db, read_db)
+
+        assert result["total"] == 1
+        assert read_db.execute.await_count == 2
+        mock_db.execute.assert_not_called()
+        mock_db.add.assert_called_once()
+        mock_db.commit.assert_awaited_once()
+        read_db.commit.assert_not_called()
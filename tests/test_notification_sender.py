@@ -148,3 +148,71 @@ class TestNotificationSender:
             assert device_token.last_used_at is not None
             # Should be close to current time
             assert (datetime.now(timezone.utc) - device_token.last_used_at).total_seconds() < 5
+
+    @pytest.mark.asyncio
+    async def test_send_notification_bumps_list_version(self, mock_db, sample_notification, sample_task):
+        """Test that a sent notification invalidates the user's notification list ETag."""
+        device_token = DeviceToken(id=uuid4(), user_id=sample_notification.user_id, token="fake-token", platform="web")
+
+        with patch.object(NotificationSender, 'get_device_tokens_for_user', return_value=[device_token]), \
+             patch.object(NotificationSender, 'get_task', return_value=sample_task), \
+             patch.object(NotificationSender, '_send_fcm_message', return_value=([True], None)):
+
+            await NotificationSender.send_notification(mock_db, sample_notification)
+
+            stmt = mock_db.execute.call_args[0][0]
+            assert "notification_list_version" in str(stmt)
+            assert sample_notification.user_id in stmt.compile().params.values()
+
+    @pytest.mark.asyncio
+    async def test_send_notification_prefers_open_websocket(self, mock_db, sample_notification, sample_task):
+        """Test that users with a live WebSocket get the notification in-app, without an FCM call."""
+        device_token = DeviceToken(id=uuid4(), user_id=sample_notification.user_id, token="fake-token", platform="web")
+
+        with patch.object(NotificationSender, 'get_device_tokens_for_user', return_value=[device_token]), \
+             patch.object(NotificationSender, 'get_task', return_value=sample_task), \
+             patch("app.services.notification_sender.ConnectionRegistry.is_online", AsyncMock(return_value=True)), \
+             patch("app.services.notification_sender.publish_event", AsyncMock(return_value=1)) as mock_publish, \
+             patch.object(NotificationSender, '_send_fcm_message') as mock_send_fcm:
+
+            result = await NotificationSender.send_notification(mock_db, sample_notification)
+
+        assert result is True
+        assert sample_notification.status == NotificationStatus.SENT
+        mock_send_fcm.assert_not_called()
+        user_id, event_type, data = mock_publish.call_args[0]
+        assert user_id == sample_notification.user_id
+        assert event_type == "notification"
+        assert data["notification_id"] == str(sample_notification.id)
+        assert data["title"] == "Task due soon"
+
+    @pytest.mark.asyncio
+    async def test_send_notification_falls_back_to_fcm(self, mock_db, sample_notification, sample_task):
+        """Test that FCM is used when the registry lists a socket no gateway is serving anymore."""
+        device_token = DeviceToken(id=uuid4(), user_id=sample_notification.user_id, token="fake-token", platform="web")
+
+        with patch.object(NotificationSender, 'get_device_tokens_for_user', return_value=[device_token]), \
+             patch.object(NotificationSender, 'get_task', return_value=sample_task), \
+             patch("app.services.notification_sender.ConnectionRegistry.is_online", AsyncMock(return_value=True)), \
+             patch("app.services.notification_sender.publish_event", AsyncMock(return_value=0)), \
+             patch.object(NotificationSender, '_send_fcm_message', return_value=([True], None)) as mock_send_fcm:
+
+            result = await NotificationSender.send_notification(mock_db, sample_notification)
+
+        assert result is True
+        mock_send_fcm.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_send_all_pending_reports_delivery_channels(self, mock_db, sample_notification):
+        """Test that send_all_pending reports in-app deliveries and FCM calls for the run."""
+        async def deliver_in_app(db, notification):
+            NotificationSender.delivery_counts["in_app"] += 1
+            return True
+
+        with patch.object(NotificationSender, 'is_quiet_hours', return_value=False), \
+             patch.object(NotificationSender, 'get_pending_notifications', return_value=[sample_notification]), \
+             patch.object(NotificationSender, 'send_notification', side_effect=deliver_in_app):
+            result = await NotificationSender.send_all_pending(mock_db)
+
+        assert result["in_app"] == 1
+        assert result["fcm_calls"] == 0
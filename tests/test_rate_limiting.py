@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.deps import get_current_user
+from app.core.redis import get_redis, close_redis
+from app.models.user import User
+from app.services.rate_limiter import RateLimiter
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def mock_user():
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123")
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides.clear()
+
+
+def test_over_budget_user_gets_429_before_the_endpoint_runs(mock_user):
+    with patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=2.3)) as acquire, \
+            patch("app.services.task.TaskService.get_tasks") as get_tasks:
+        response = client.get("/tasks")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    get_tasks.assert_not_called()
+    acquire.assert_awaited_once_with(f"user:{mock_user.id}:GET:/tasks", 120, 60)
+
+
+def test_buckets_are_per_route_with_separate_read_and_write_budgets(mock_user):
+    with patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=2)) as acquire, \
+            patch("app.core.config.settings.RATE_LIMIT_WRITES_PER_MINUTE", 7):
+        client.patch(f"/tasks/{uuid4()}/move", json={"position": 1})
+        client.patch("/notifications/read", json={})
+
+    assert [call.args for call in acquire.await_args_list] == [
+        (f"user:{mock_user.id}:PATCH:/tasks/{{task_id}}/move", 7, 60),
+        (f"user:{mock_user.id}:PATCH:/notifications/read", 7, 60),
+    ]
+
+
+def test_auth_is_limited_per_client_ip_before_calling_cognito():
+    with patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=30)) as acquire, \
+            patch("app.services.auth.AuthService.signin") as signin:
+        response = client.post("/auth/signin", json={"email": "test@example.com", "password": "password123"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    signin.assert_not_called()
+    acquire.assert_awaited_once_with("ip:testclient:POST:/auth/signin", 10, 60)
+
+
+@pytest.mark.parametrize("viewer, ip", [
+    ("198.51.100.10:46532", "198.51.100.10"),
+    ("2001:db8::1:46532", "2001:db8::1"),
+])
+def test_auth_behind_cloudfront_is_limited_per_viewer_ip(viewer, ip):
+    # The connection comes from the CloudFront edge, the viewer's address from its header
+    with patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=30)) as acquire:
+        client.post(
+            "/auth/refresh", json={"refresh_token": "token"},
+            headers={"CloudFront-Viewer-Address": viewer, "X-Forwarded-For": "203.0.113.7"}
+        )
+    acquire.assert_awaited_once_with(f"ip:{ip}:POST:/auth/refresh", 10, 60)
+
+
+def test_viewers_behind_one_edge_get_separate_buckets():
+    with patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=30)) as acquire:
+        for viewer in ("198.51.100.10:1000", "198.51.100.11:1000"):
+            client.post(
+                "/auth/signin", json={"email": "test@example.com", "password": "password123"},
+                headers={"CloudFront-Viewer-Address": viewer}
+            )
+    assert [call.args[0] for call in acquire.await_args_list] == [
+        "ip:198.51.100.10:POST:/auth/signin", "ip:198.51.100.11:POST:/auth/signin"
+    ]
+
+
+def test_rate_limits_can_be_disabled(mock_user):
+    with patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=5)) as acquire, \
+            patch("app.core.config.settings.RATE_LIMIT_ENABLED", False), \
+            patch("app.services.task.TaskService.get_tasks", return_value=[]):
+        assert client.get("/tasks").status_code == 200
+    acquire.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_requests_are_allowed_when_redis_is_down():
+    redis = MagicMock()
+    redis.register_script.return_value = AsyncMock(side_effect=ConnectionError("down"))
+    with patch("app.services.rate_limiter.get_redis", return_value=redis):
+        assert await RateLimiter.acquire("user:1:GET:/tasks", 10, 60) == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_script():
+    """Runs the Lua script on a real Redis; skipped when there is none."""
+    try:
+        await get_redis().ping()
+    except Exception:
+        await close_redis()
+        pytest.skip("Redis is not reachable")
+
+    key = f"test:{uuid4()}"
+    try:
+        # 3 tokens, refilled at 3 per 0.3 s: a burst of 3, then ~0.1 s per request
+        results = await asyncio.gather(*(RateLimiter.acquire(key, 3, 0.3) for _ in range(5)))
+        assert results.count(0) == 3
+        assert all(0 < wait <= 0.1 for wait in results if wait)
+
+        await asyncio.sleep(0.12)
+        assert await RateLimiter.acquire(key, 3, 0.3) == 0
+        assert 0 < await get_redis().ttl(f"ratelimit:{key}") <= 2
+    finally:
+        await get_redis().delete(f"ratelimit:{key}")
+        await close_redis()
@@ -0,0 +1,224 @@
+import asyncio
+import os
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.api.deps import get_current_user, get_read_db
+from app.models.user import User
+from app.schemas.task import TaskCreate
+from app.services.task import TaskService
+
+# A migrated primary and a streaming replica of it (postgresql+asyncpg://...)
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+TEST_REPLICA_URL = os.environ.get("TEST_REPLICA_URL")
+
+
+@pytest.fixture
+def user():
+    return User(
+        id=uuid4(),
+        email="test@example.com",
+        external_id="fake-sub-123",
+        task_list_version=3,
+        notification_list_version=5
+    )
+
+
+@pytest.fixture
+def replicas():
+    """Enable replicas, with every replica session being the returned mock."""
+    replica = AsyncMock(spec=AsyncSession)
+    with patch("app.api.deps.replicas_enabled", return_value=True), \
+            patch("app.api.deps.replica_session", return_value=replica), \
+            patch("app.api.deps.ReadYourWrites.on_primary", new_callable=AsyncMock) as on_primary:
+        on_primary.return_value = False
+        replica.on_primary = on_primary
+        yield replica
+
+
+def replica_versions(replica, versions):
+    result = MagicMock()
+    result.one_or_none.return_value = versions
+    replica.execute.return_value = result
+
+
+async def read_session(db, user):
+    dependency = get_read_db(db, user)
+    session = await anext(dependency)
+    await dependency.aclose()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_primary_when_no_replicas(user):
+    db = AsyncMock(spec=AsyncSession)
+    with patch("app.api.deps.ReadYourWrites.on_primary") as on_primary:
+        assert await read_session(db, user) is db
+    on_primary.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_replica_when_caught_up(user, replicas):
+    db = AsyncMock(spec=AsyncSession)
+    replica_versions(replicas, (3, 5))
+
+    assert await read_session(db, user) is replicas
+    # The primary connection is handed back while the replica serves the request
+    db.close.assert_awaited_once()
+    replicas.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_primary_after_recent_write(user, replicas):
+    db = AsyncMock(spec=AsyncSession)
+    replicas.on_primary.return_value = True
+
+    assert await read_session(db, user) is db
+    replicas.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("versions", [(2, 5), (3, 4), None])
+async def test_primary_when_replica_is_behind(user, replicas, versions):
+    db = AsyncMock(spec=AsyncSession)
+    replica_versions(replicas, versions)
+
+    assert await read_session(db, user) is db
+    db.close.assert_not_called()
+    replicas.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_primary_when_replica_is_down(user, replicas):
+    db = AsyncMock(spec=AsyncSession)
+    replicas.execute.side_effect = OSError("connection refused")
+
+    assert await read_session(db, user) is db
+    replicas.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, marked", [("GET", False), ("POST", True), ("PATCH", True), ("DELETE", True)])
+async def test_writes_pin_the_user_to_the_primary(user, method, marked):
+    request = MagicMock(method=method)
+    with patch("app.api.deps.replicas_enabled", return_value=True), \
+            patch("app.api.deps.authenticate", new_callable=AsyncMock, return_value=user), \
+            patch("app.api.deps.ReadYourWrites.mark_write", new_callable=AsyncMock) as mark_write:
+        assert await get_current_user(request, AsyncMock(spec=AsyncSession), "token") is user
+
+    assert mark_write.await_count == int(marked)
+
+
+class FakeRedis:
+    """The subset of redis.asyncio.Redis ReadYourWrites uses, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+
+async def in_recovery(session) -> bool:
+    return (await session.execute(text("SELECT pg_is_in_recovery()"))).scalar_one()
+
+
+@pytest.mark.skipif(
+    not (TEST_DATABASE_URL and TEST_REPLICA_URL), reason="TEST_DATABASE_URL or TEST_REPLICA_URL is not set"
+)
+@pytest.mark.asyncio
+async def test_routing_against_a_streaming_replica():
+    """
+    Reads go to the replica once it has replayed the user's versions, to the
+    primary right after the user's write, and to the primary while the replica
+    is behind.
+    """
+    primary = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    replica = create_async_engine(TEST_REPLICA_URL, poolclass=NullPool)
+    sessions = async_sessionmaker(primary, expire_on_commit=False)
+    replica_sessions = async_sessionmaker(replica, expire_on_commit=False)
+    redis = FakeRedis()
+    run_id = uuid4().hex[:8]
+
+    async with primary.begin() as connection:
+        user_id = (await connection.execute(text("""
+            INSERT INTO "user" (id, email, external_id, task_list_version, notification_list_version)
+            VALUES (gen_random_uuid(), 'replicas-' || :run || '@example.com', 'replicas-' || :run, 0, 0)
+            RETURNING id
+        """), {"run": run_id})).scalar_one()
+
+    async def caught_up():
+        async with primary.connect() as connection:
+            lsn = (await connection.execute(text("SELECT pg_current_wal_lsn()"))).scalar_one()
+        async with replica.connect() as connection:
+            for _ in range(100):
+                replayed = (await connection.execute(
+                    text("SELECT pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)"), {"lsn": lsn}
+                )).scalar_one()
+                if replayed:
+                    return
+                await asyncio.sleep(0.05)
+        pytest.fail("The replica did not catch up")
+
+    async def read():
+        """The session get_read_db hands a read endpoint, and the user's tasks read from it."""
+        async with sessions() as db:
+            session = await read_session(db, await db.get(User, user_id))
+            titles = (await session.execute(
+                text("SELECT title FROM task WHERE user_id = :user_id"), {"user_id": user_id}
+            )).scalars().all()
+            on_replica = await in_recovery(session)
+            await session.close()
+        return on_replica, titles
+
+    async def write(title):
+        """A create through the API's dependencies: marks the user, then writes on the primary."""
+        async with sessions() as db:
+            user = await db.get(User, user_id)
+            with patch("app.api.deps.authenticate", AsyncMock(return_value=user)):
+                await get_current_user(MagicMock(method="POST"), db, "token")
+            await TaskService.create_task(db, TaskCreate(title=title), user_id)
+
+    try:
+        with patch("app.api.deps.replicas_enabled", return_value=True), \
+                patch("app.api.deps.replica_session", replica_sessions), \
+                patch("app.services.read_your_writes.get_redis", return_value=redis), \
+                patch("app.services.task.events", AsyncMock()):
+            # Caught up: served by the replica
+            await caught_up()
+            assert await read() == (True, [])
+
+            # Right after a write: the primary, which has the write
+            await write("Written")
+            assert await read() == (False, ["Written"])
+
+            # Behind the user's versions: the primary, until the replica replays them
+            redis.data.clear()
+            async with replica.connect() as connection:
+                await connection.execute(text("SELECT pg_wal_replay_pause()"))
+            try:
+                await write("Not replayed")
+                redis.data.clear()
+                on_replica, titles = await read()
+                assert not on_replica
+                assert sorted(titles) == ["Not replayed", "Written"]
+            finally:
+                async with replica.connect() as connection:
+                    await connection.execute(text("SELECT pg_wal_replay_resume()"))
+
+            await caught_up()
+            on_replica, titles = await read()
+            assert on_replica
+            assert sorted(titles) == ["Not replayed", "Written"]
+    finally:
+        async with primary.begin() as connection:
+            await connection.execute(text("DELETE FROM task WHERE user_id = :user_id"), {"user_id": user_id})
+            await connection.execute(text('DELETE FROM "user" WHERE id = :user_id'), {"user_id": user_id})
+        await primary.dispose()
+        await replica.dispose()
@@ -0,0 +1,90 @@
+import pytest
+from contextlib import ExitStack
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+
+def fake_engine(checked_out=0, select_error=None):
+    engine = MagicMock()
+    engine.pool.checkedout.return_value = checked_out
+    connection = AsyncMock()
+    if select_error:
+        connection.execute.side_effect = select_error
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=connection)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+    return engine
+
+
+def ready(engine=None, latency=0.002, jwks_age=10.0):
+    """Patch every dependency of the readiness checks; returns the ExitStack and the engine."""
+    engine = engine or fake_engine()
+    stack = ExitStack()
+    # A pool of 5 + 5 connections
+    stack.enter_context(patch("app.core.readiness.settings.DB_POOL_SIZE", 5))
+    stack.enter_context(patch("app.core.readiness.settings.DB_MAX_OVERFLOW", 5))
+    stack.enter_context(patch("app.core.readiness.settings.WEB_CONCURRENCY", 1))
+    stack.enter_context(patch("app.core.readiness.engine", engine))
+    stack.enter_context(patch("app.core.readiness.redis_latency", AsyncMock(return_value=latency)))
+    stack.enter_context(patch("app.core.readiness.jwks_cache.ensure_fresh", AsyncMock()))
+    stack.enter_context(patch("app.core.readiness.jwks_cache.age", return_value=jwks_age))
+    return stack, engine
+
+
+def test_ready_when_every_check_passes():
+    stack, engine = ready()
+    with stack:
+        response = client.get("/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["database"] == {"ok": True, "pool_usage": 0.0, "limit": 0.9}
+    assert body["checks"]["redis"] == {"ok": True, "latency_ms": 2.0, "limit": 50}
+    assert body["checks"]["jwks"] == {"ok": True, "age_seconds": 10}
+    assert body["checks"]["event_loop"]["ok"] is True
+    engine.connect.assert_called_once()
+
+
+def test_saturated_pool_sheds_traffic_without_queueing_for_a_connection():
+    stack, engine = ready(engine=fake_engine(checked_out=9))
+    with stack:
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "overloaded"
+    assert response.json()["checks"]["database"] == {"ok": False, "pool_usage": 0.9, "limit": 0.9}
+    engine.connect.assert_not_called()
+
+
+@pytest.mark.parametrize("overrides, failing", [
+    ({"engine": fake_engine(select_error=OSError("gone"))}, "database"),
+    ({"latency": 0.2}, "redis"),
+    ({"latency": None}, "redis"),
+    ({"jwks_age": None}, "jwks"),
+])
+def test_unready_when_a_dependency_fails(overrides, failing):
+    stack, _ = ready(**overrides)
+    with stack:
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    checks = response.json()["checks"]
+    assert [name for name, check in checks.items() if not check["ok"]] == [failing]
+
+
+def test_unready_when_the_event_loop_lags():
+    stack, _ = ready()
+    with stack, patch("app.core.readiness.settings.READY_MAX_LOOP_LAG_MS", -1):
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["event_loop"]["ok"] is False
+
+
+def test_health_stays_cheap():
+    with patch("app.core.readiness.check_readiness") as check_readiness:
+        assert client.get("/health").status_code == 200
+    check_readiness.assert_not_called()
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi.testclient import TestClient
+from redis.asyncio import BlockingConnectionPool
+from app.main import app
+from app.core import redis as core_redis
+from app.core.redis import get_redis, close_redis, pipelined, redis_pool_stats, redis_latency
+from app.workers import tasks as worker_tasks
+
+client = TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_one_bounded_pool_per_loop():
+    redis = get_redis()
+
+    assert get_redis() is redis
+    assert isinstance(redis.connection_pool, BlockingConnectionPool)
+    assert redis.connection_pool.max_connections == core_redis.settings.REDIS_MAX_CONNECTIONS
+
+    await close_redis()
+    assert get_redis() is not redis
+    await close_redis()
+
+
+@pytest.mark.asyncio
+async def test_pipelined_sends_commands_in_one_round_trip():
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True, 1])
+    redis = MagicMock()
+    redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+    redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    with patch.object(core_redis, "get_redis", return_value=redis):
+        replies = await pipelined(("SET", "k", "v", "EX", 60), ("DEL", "lock"))
+
+    assert replies == [True, 1]
+    redis.pipeline.assert_called_once_with(transaction=False)
+    assert [c.args for c in pipe.execute_command.call_args_list] == [("SET", "k", "v", "EX", 60), ("DEL", "lock")]
+    pipe.execute.assert_awaited_once()
+
+
+def fake_connection(connect_error=None):
+    def make(**kwargs):
+        connection = AsyncMock(pid=os.getpid())
+        connection.connect.side_effect = connect_error
+        connection.can_read_destructive.return_value = False
+        return connection
+    return make
+
+
+@pytest.mark.asyncio
+async def test_redis_pool_stats():
+    redis = get_redis()
+    assert redis_pool_stats() == {"open": 0, "in_use": 0, "max": redis.connection_pool.max_connections}
+    await close_redis()
+
+
+@pytest.mark.asyncio
+async def test_pool_counts_its_own_checkouts():
+    pool = core_redis._CountingConnectionPool(connection_class=fake_connection(), max_connections=3)
+
+    first = await pool.get_connection("PING")
+    second = await pool.get_connection("PING")
+    assert pool.stats() == {"open": 2, "in_use": 2, "max": 3}
+
+    await pool.release(first)
+    assert pool.stats() == {"open": 2, "in_use": 1, "max": 3}
+    # Released connections are reused before new ones are made
+    assert await pool.get_connection("PING") is first
+    await pool.release(first)
+    await pool.release(second)
+    assert pool.stats() == {"open": 2, "in_use": 0, "max": 3}
+
+
+@pytest.mark.asyncio
+async def test_connections_that_fail_to_connect_are_not_counted_in_use():
+    pool = core_redis._CountingConnectionPool(connection_class=fake_connection(OSError("refused")), max_connections=3)
+
+    with pytest.raises(OSError):
+        await pool.get_connection("PING")
+
+    assert pool.stats() == {"open": 1, "in_use": 0, "max": 3}
+
+
+def test_redis_pool_stats_never_fail_the_health_check():
+    redis = MagicMock(connection_pool=BlockingConnectionPool())
+    with patch.object(core_redis, "get_redis", return_value=redis):
+        assert redis_pool_stats() == {}
+
+
+@pytest.mark.asyncio
+async def test_redis_latency():
+    redis = get_redis()
+    with patch.object(redis, "ping", AsyncMock(return_value=True)):
+        assert 0 <= await redis_latency(1) < 1
+    with patch.object(redis, "ping", AsyncMock(side_effect=ConnectionError)):
+        assert await redis_latency(1) is None
+    await close_redis()
+
+
+def test_health_endpoint_reports_redis_pool_without_io():
+    stats = {"open": 2, "in_use": 1, "max": 50}
+    with patch("app.main.redis_pool_stats", return_value=stats):
+        response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["redis"] == {"connections": stats}
+
+
+def test_worker_tasks_share_the_process_loop():
+    async def running_loop():
+        return asyncio.get_running_loop()
+
+    with patch.object(worker_tasks, "init_redis", new_callable=AsyncMock) as init_redis, \
+            patch.object(worker_tasks, "close_redis", new_callable=AsyncMock) as close:
+        worker_tasks.init_worker_process()
+        try:
+            first, second = worker_tasks.run_async(running_loop()), worker_tasks.run_async(running_loop())
+        finally:
+            worker_tasks.shutdown_worker_process()
+
+        init_redis.assert_awaited_once()
+        assert first is second
+        assert not first.is_running() and first.is_closed()
+        close.assert_awaited_once()
+
+        # Without a process loop each task gets a throwaway one
+        assert worker_tasks.run_async(running_loop()) is not first
@@ -0,0 +1,127 @@
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, choose_encoding, available_encodings
+
+BIG = {"items": ["task"] * 1000}
+ETAG = 'W/"v1"'
+
+
+def make_client(**kwargs):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, **kwargs)
+
+    @app.get("/big")
+    async def big():
+        return BIG
+
+    @app.get("/tagged")
+    async def tagged():
+        return PlainTextResponse("x" * 2000, headers={"ETag": ETAG})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(5):
+                yield b"line %d\n" % i * 200
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/events")
+    async def events():
+        async def frames():
+            yield b"data: {}\n\n" * 200
+        return StreamingResponse(frames(), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("zstd, gzip;q=0.8", "zstd"),
+    ("*", "br"),
+    ("gzip;q=0, identity", None),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, {"br": None, "zstd": None, "gzip": None}) == expected
+
+
+def test_gzip_is_always_available():
+    with patch.object(compression, "brotli", None), patch.object(compression, "zstandard", None):
+        assert list(available_encodings()) == ["gzip"]
+
+
+def test_large_body_is_compressed():
+    response = make_client().get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == BIG
+
+
+@pytest.mark.parametrize("encoding", [e for e in ("br", "zstd") if e in available_encodings()])
+def test_optional_encodings(encoding):
+    response = make_client().get("/big", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.json() == BIG
+
+
+def test_small_body_and_event_streams_are_not_compressed():
+    client = make_client()
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"ok": True}
+
+    events = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in events.headers
+    assert events.text.startswith("data: {}")
+
+
+def test_streamed_body_is_compressed_chunk_by_chunk():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join("line %d\n" % i * 200 for i in range(5))
+
+
+def test_etagged_body_is_compressed_once():
+    calls = []
+
+    class CountingGzip(compression._Gzip):
+        def compress(self, data):
+            calls.append(len(data))
+            return super().compress(data)
+
+    with patch.object(compression, "_Gzip", CountingGzip):
+        client = make_client()
+        first = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+
+    assert calls == [2000]
+    assert first.headers["etag"] == second.headers["etag"] == ETAG
+    assert first.text == second.text == "x" * 2000
+
+
+def test_cache_evicts_least_recently_used():
+    cache = compression.CompressedCache(max_entries=2)
+    cache.put(("a", "gzip", 1), b"a")
+    cache.put(("b", "gzip", 1), b"b")
+    cache.get(("a", "gzip", 1))
+    cache.put(("c", "gzip", 1), b"c")
+
+    assert cache.get(("b", "gzip", 1)) is None
+    assert cache.get(("a", "gzip", 1)) == b"a"
+    assert cache.get(("c", "gzip", 1)) == b"c"
@@ -0,0 +1,65 @@
+import asyncio
+import runpy
+import pytest
+import uvloop
+from pathlib import Path
+from unittest.mock import patch
+from gunicorn.config import Config as GunicornConfig
+from uvicorn.config import Config as UvicornConfig
+from uvicorn.protocols.http.httptools_impl import HttpToolsProtocol
+from app.core.config import settings
+from app.core.server import UvicornWorker
+
+GUNICORN_CONF = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+@pytest.mark.parametrize("workers, limits", [
+    (1, (5, 10)),
+    (8, (5, 5)),
+    (32, (2, 0)),
+    (200, (1, 0)),
+])
+def test_pool_sizes_are_split_between_workers(workers, limits):
+    configured = settings.model_copy(update={
+        "WEB_CONCURRENCY": workers, "DB_POOL_SIZE": 5, "DB_MAX_OVERFLOW": 10,
+        "DB_MAX_CONNECTIONS": 100, "DB_RESERVED_CONNECTIONS": 20,
+    })
+
+    assert configured.db_pool_limits() == limits
+    if workers <= 80:
+        assert workers * sum(limits) <= 80
+
+
+def test_workers_default_to_available_cpus():
+    configured = settings.model_copy(update={"WEB_CONCURRENCY": 0})
+    with patch("app.core.config.os.sched_getaffinity", return_value={0, 1, 2}, create=True):
+        assert configured.web_workers == 3
+
+
+def test_gunicorn_conf_is_valid_and_taken_from_settings():
+    with patch("app.core.config.settings.WEB_CONCURRENCY", 3), \
+            patch("app.core.config.settings.WEB_MAX_REQUESTS", 500):
+        conf = runpy.run_path(str(GUNICORN_CONF))
+
+    gunicorn = GunicornConfig()
+    # Gunicorn ignores names it doesn't know, so a typo would go unnoticed
+    assert {name for name in conf if not name.startswith("__")} - set(gunicorn.settings) == {"settings"}
+    for name in gunicorn.settings.keys() & conf.keys():
+        gunicorn.set(name, conf[name])  # Validates the value
+    assert gunicorn.workers == 3
+    assert gunicorn.max_requests == 500
+    assert gunicorn.keepalive == settings.WEB_KEEPALIVE_SECONDS
+    assert gunicorn.backlog == settings.WEB_BACKLOG
+    assert gunicorn.worker_class_str == "app.core.server.UvicornWorker"
+    assert gunicorn.preload_app is False
+
+
+def test_worker_runs_uvloop_and_httptools():
+    config = UvicornConfig(app="app.main:app", log_config=None, **UvicornWorker.CONFIG_KWARGS)
+    config.load()
+    assert config.http_protocol_class is HttpToolsProtocol
+    config.setup_event_loop()
+    try:
+        assert isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy)
+    finally:
+        asyncio.set_event_loop_policy(None)
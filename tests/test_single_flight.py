@@ -0,0 +1,118 @@
+import asyncio
+import httpx
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.main import app
+from app.api.deps import get_current_user
+from app.core.database import get_db
+from app.models.task import TaskStatus
+from app.models.user import User
+from app.services.single_flight import SingleFlight
+
+
+def slow(result, calls, seconds=0.05):
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(seconds)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return fn
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_flight():
+    flights, calls = SingleFlight(), []
+
+    results = await asyncio.gather(*(flights.do("a", slow(b"[]", calls)) for _ in range(10)))
+
+    assert results == [b"[]"] * 10
+    assert len(calls) == 1
+    assert flights.in_flight() == 0
+
+    # Finished flights aren't reused: this is not a cache
+    await flights.do("a", slow(b"[]", calls))
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flights, calls = SingleFlight(), []
+    assert await asyncio.gather(flights.do("a", slow(1, calls)), flights.do("b", slow(2, calls))) == [1, 2]
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared():
+    flights, calls = SingleFlight(), []
+    results = await asyncio.gather(
+        *(flights.do("a", slow(OSError("db down"), calls)) for _ in range(3)), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [OSError] * 3
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_followers_run_themselves_when_the_leader_is_cancelled():
+    flights, calls = SingleFlight(), []
+    leader = asyncio.create_task(flights.do("a", slow("leader", calls)))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do("a", slow("follower", calls)))
+    await asyncio.sleep(0.01)
+
+    leader.cancel()
+
+    assert await follower == "follower"
+    assert leader.cancelled()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_a_cancelled_follower_leaves_the_flight_running():
+    flights, calls = SingleFlight(), []
+    leader = asyncio.create_task(flights.do("a", slow("result", calls)))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do("a", slow("result", calls)))
+    await asyncio.sleep(0.01)
+
+    follower.cancel()
+
+    assert await leader == "result"
+    assert follower.cancelled()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_identical_task_list_requests_share_one_query():
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123", task_list_version=1)
+    now = datetime.now(timezone.utc)
+    row = MagicMock(
+        id=uuid4(), title="Row", description=None, status=TaskStatus.TODO, position=1000,
+        rank=None, due_date=None, user_id=user.id, created_at=now, updated_at=now
+    )
+    listed = MagicMock()
+    listed.all.return_value = [row]
+    db = AsyncMock(spec=AsyncSession)
+
+    async def execute(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return listed
+
+    db.execute.side_effect = execute
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        with patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=0)), \
+                patch("app.services.task_list_cache.settings.TASK_LIST_CACHE_TTL_SECONDS", 0):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                responses = await asyncio.gather(*(client.get("/tasks") for _ in range(5)), client.get("/tasks?status=done"))
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [response.status_code for response in responses] == [200] * 6
+    assert len({response.content for response in responses[:5]}) == 1
+    # One query for the five identical requests, one for the filtered one
+    assert db.execute.await_count == 2
@@ -0,0 +1,199 @@
+"""
+Round-trip budget per endpoint.
+
+Every write endpoint is driven through the real router and service with a
+recording session in place of the database, so adding a SELECT (e.g. a
+post-commit refresh) to a write path shows up as a failing count here.
+"""
+import pytest
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.deps import get_current_user
+from app.core.database import get_db
+from app.models.user import User
+from app.models.task import Task, TaskStatus
+from app.models.notification import DeviceToken
+from uuid import uuid4
+from datetime import datetime, timezone
+
+client = TestClient(app)
+
+
+class StatementCounter:
+    """Stand-in for AsyncSession that records the statements it executes."""
+
+    def __init__(self, results):
+        self.statements = []
+        self.commits = 0
+        self.refreshes = 0
+        self._results = list(results)
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return self._results.pop(0)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, instance, *args, **kwargs):
+        self.refreshes += 1
+
+    async def close(self):
+        pass
+
+
+def result_of(value):
+    result = MagicMock()
+    result.scalar_one.return_value = value
+    result.scalar_one_or_none.return_value = value
+    result.scalar.return_value = value
+    return result
+
+
+@pytest.fixture
+def mock_user():
+    return User(
+        id=uuid4(),
+        email="test@example.com",
+        external_id="fake-sub-123"
+    )
+
+
+@pytest.fixture
+def counting_db(mock_user):
+    """Install a StatementCounter as the request's DB session."""
+    def install(*results):
+        session = StatementCounter(results)
+
+        async def override_get_db():
+            yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: mock_user
+        return session
+
+    yield install
+    app.dependency_overrides.clear()
+
+
+def make_task(user_id, **kwargs):
+    now = datetime.now(timezone.utc)
+    fields = dict(
+        id=uuid4(),
+        title="Task",
+        user_id=user_id,
+        status=TaskStatus.TODO,
+        position=0,
+        created_at=now,
+        updated_at=now,
+        status_changed_at=now,
+    )
+    fields.update(kwargs)
+    return Task(**fields)
+
+
+def test_create_task_statement_count(counting_db, mock_user):
+    db = counting_db(result_of(make_task(mock_user.id)))
+
+    response = client.post("/tasks", json={"title": "Task"})
+
+    assert response.status_code == 201
+    assert len(db.statements) == 1
+    assert db.commits == 1
+    assert db.refreshes == 0
+
+
+def test_update_task_statement_count(counting_db, mock_user):
+    task = make_task(mock_user.id, status=TaskStatus.DONE)
+    db = counting_db(result_of(task))
+
+    response = client.patch(f"/tasks/{task.id}", json={"status": "done"})
+
+    assert response.status_code == 200
+    assert len(db.statements) == 1
+    assert db.commits == 1
+    assert db.refreshes == 0
+
+
+def test_move_task_statement_count(counting_db, mock_user):
+    task = make_task(mock_user.id, position=2500)
+    db = counting_db(result_of(task))
+
+    response = client.patch(
+        f"/tasks/{task.id}/move",
+        json={"above_id": str(uuid4()), "below_id": str(uuid4())}
+    )
+
+    assert response.status_code == 200
+    assert len(db.statements) == 1
+    assert db.commits == 1
+    assert db.refreshes == 0
+
+
+def test_register_device_statement_count(counting_db, mock_user):
+    now = datetime.now(timezone.utc)
+    device = DeviceToken(
+        id=uuid4(),
+        user_id=mock_user.id,
+        token="fake-fcm-token-123",
+        platform="web",
+        created_at=now,
+        updated_at=now
+    )
+    db = counting_db(result_of(device))
+
+    response = client.post(
+        "/notifications/devices",
+        json={"token": "fake-fcm-token-123", "platform": "web"}
+    )
+
+    assert response.status_code == 201
+    assert len(db.statements) == 1
+    assert db.commits == 1
+    assert db.refreshes == 0
+
+
+def test_conditional_get_tasks_skips_the_query(counting_db, mock_user):
+    mock_user.task_list_version = 7
+    listed = MagicMock()
+    listed.all.return_value = [make_task(mock_user.id)]
+    db = counting_db(listed)
+
+    response = client.get("/tasks")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert len(db.statements) == 1
+
+    response = client.get("/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    assert len(db.statements) == 1
+
+
+def test_conditional_get_notifications_skips_the_query(counting_db, mock_user):
+    mock_user.task_list_version = 3
+    mock_user.notification_list_version = 4
+    counts = MagicMock()
+    counts.one.return_value = MagicMock(total=0, unread=0)
+    listed = MagicMock()
+    listed.scalars.return_value.all.return_value = []
+    db = counting_db(counts, listed)
+
+    response = client.get("/notifications", headers={"If-None-Match": 'W/"stale"'})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert len(db.statements) == 2
+
+    response = client.get("/notifications", headers={"If-None-Match": f'W/"other", {etag}'})
+    assert response.status_code == 304
+    assert len(db.statements) == 2
+
+    # A task edit changes the rendered notifications too
+    mock_user.task_list_version = 4
+    db = counting_db(counts, listed)
+    response = client.get("/notifications", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
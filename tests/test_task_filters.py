@@ -0,0 +1,251 @@
+import asyncio
+import itertools
+import os
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.main import app
+from app.api.deps import get_current_user
+from app.models.base import Base
+from app.models.user import User
+from app.schemas.task import TaskFilters, TaskSort
+from app.services.task import TaskService
+
+client = TestClient(app)
+
+# A migrated database to EXPLAIN the list queries against (postgresql+asyncpg://...)
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def compile_pg(stmt, literal_binds=False):
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": literal_binds}))
+
+
+@pytest.fixture
+def mock_user():
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123", task_list_version=1)
+    app.dependency_overrides[get_current_user] = lambda: user
+    with patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=0)), \
+            patch("app.services.task_list_cache.settings.TASK_LIST_CACHE_TTL_SECONDS", 0):
+        yield user
+    app.dependency_overrides.clear()
+
+
+def test_filters_narrow_the_list_query():
+    filters = TaskFilters(
+        due_after=NOW, due_before=NOW + timedelta(days=7), overdue_at=NOW, updated_since=NOW,
+        created_after=NOW, has_due_date=True
+    )
+    sql = compile_pg(TaskService.list_query(uuid4(), filters=filters))
+
+    assert "task.due_date >= %(due_date_1)s" in sql
+    assert "task.due_date < %(due_date_2)s" in sql
+    assert "task.due_date < %(due_date_3)s AND task.status != %(status_1)s" in sql
+    assert "task.updated_at >= %(updated_at_1)s" in sql
+    assert "task.created_at >= %(created_at_1)s" in sql
+    assert "task.due_date IS NOT NULL" in sql
+    assert "task.deleted_at IS NULL" in sql
+
+
+def test_tasks_without_a_due_date():
+    sql = compile_pg(TaskService.list_query(uuid4(), filters=TaskFilters(has_due_date=False)))
+    assert "task.due_date IS NULL" in sql
+
+
+@pytest.mark.parametrize("sort, order", [
+    (TaskSort.DUE_DATE, "ORDER BY task.due_date ASC NULLS LAST, task.id"),
+    (TaskSort.CREATED_AT, "ORDER BY task.created_at DESC, task.id DESC"),
+    (TaskSort.POSITION, "ORDER BY task.position DESC, task.id"),
+])
+def test_sort_orders(sort, order):
+    assert order in compile_pg(TaskService.list_query(uuid4(), sort=sort))
+
+
+def test_filters_and_sort_reach_the_service(mock_user):
+    with patch("app.services.task.TaskService.get_tasks", AsyncMock(return_value=[])) as get_tasks:
+        response = client.get("/tasks", params={
+            "due_after": "2026-10-01T00:00:00Z", "overdue": "true", "has_due_date": "true", "sort": "due_date"
+        })
+
+    assert response.status_code == 200
+    filters, sort = get_tasks.await_args[0][4:]
+    assert filters.due_after == datetime(2026, 10, 1, tzinfo=timezone.utc)
+    assert filters.due_before is None and filters.updated_since is None and filters.created_after is None
+    assert filters.has_due_date is True
+    # Evaluated to the minute, so the ETag (and cache entry) holds for a minute
+    assert filters.overdue_at.second == 0 and filters.overdue_at.microsecond == 0
+    assert sort == TaskSort.DUE_DATE
+
+
+def test_unfiltered_list_passes_no_filters(mock_user):
+    with patch("app.services.task.TaskService.get_tasks", AsyncMock(return_value=[])) as get_tasks:
+        client.get("/tasks")
+    assert get_tasks.await_args[0][4:] == (None, TaskSort.POSITION)
+
+
+def test_each_filter_and_sort_has_its_own_etag(mock_user):
+    with patch("app.services.task.TaskService.get_tasks", AsyncMock(return_value=[])):
+        etags = {
+            client.get("/tasks", params=params).headers["ETag"]
+            for params in (
+                {}, {"sort": "created_at"}, {"has_due_date": "false"},
+                {"updated_since": "2026-10-01T00:00:00Z"}, {"created_after": "2026-10-01T00:00:00Z"}
+            )
+        }
+    assert len(etags) == 5
+
+
+@pytest.mark.parametrize("params", [
+    {"due_after": "2026-10-08T00:00:00Z", "due_before": "2026-10-01T00:00:00Z"},
+    {"sort": "title"},
+    {"due_after": "next week"},
+])
+def test_invalid_filters_are_rejected(mock_user, params):
+    with patch("app.services.task.TaskService.get_tasks", AsyncMock()) as get_tasks:
+        assert client.get("/tasks", params=params).status_code in (400, 422)
+    get_tasks.assert_not_called()
+
+
+# Live query plans: every consistent combination of filters and sorts must be
+# answered from an index on a table large enough for the planner to care.
+
+DUE_WINDOWS = {
+    "any_due": {},
+    "due_after": {"due_after": NOW},
+    "due_before": {"due_before": NOW + timedelta(days=7)},
+    "due_window": {"due_after": NOW, "due_before": NOW + timedelta(days=7)},
+}
+
+COMBINATIONS = [
+    pytest.param(
+        dict(
+            **window,
+            overdue_at=NOW if overdue else None,
+            updated_since=NOW - timedelta(days=1) if updated else None,
+            created_after=NOW - timedelta(days=7) if created else None,
+            has_due_date=has_due_date
+        ),
+        sort,
+        id=f"{name}-{'overdue-' if overdue else ''}{'updated_since-' if updated else ''}"
+           f"{'created_after-' if created else ''}has_due_date={has_due_date}-{sort.value}"
+    )
+    for (name, window), overdue, updated, created, has_due_date, sort in itertools.product(
+        DUE_WINDOWS.items(), (False, True), (False, True), (False, True), (None, True, False), TaskSort
+    )
+    # No task without a due date is due in a window or overdue
+    if not (has_due_date is False and (window or overdue))
+]
+
+# Indexes on (user_id, column) and the TaskFilters fields they serve
+FILTER_INDEXES = {
+    "ix_task_user_due_date": ("due_after", "due_before", "overdue_at", "has_due_date"),
+    "ix_task_user_updated_at": ("updated_since",),
+    "ix_task_user_created_at": ("created_after",),
+}
+
+SEED_USERS = 200
+SEED_TASKS_PER_USER = 100
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture(scope="module")
+def seeded_user():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    run_id = uuid4().hex[:8]
+
+    async def seed():
+        engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+        async with engine.begin() as connection:
+            user_ids = (await connection.execute(text("""
+                INSERT INTO "user" (id, email, external_id, task_list_version, notification_list_version)
+                SELECT gen_random_uuid(), 'filters-' || :run || '-' || g || '@example.com',
+                       'filters-' || :run || '-' || g, 0, 0
+                FROM generate_series(1, :users) g
+                RETURNING id
+            """), {"run": run_id, "users": SEED_USERS})).scalars().all()
+            await connection.execute(text("""
+                INSERT INTO task (id, title, status, position, user_id, due_date, created_at, updated_at, status_changed_at)
+                SELECT gen_random_uuid(), 'Task ' || g, CASE WHEN g % 4 = 0 THEN 'DONE' ELSE 'TODO' END::taskstatus,
+                       g, (CAST(:user_ids AS uuid[]))[1 + g % :users],
+                       CASE WHEN g % 3 = 0 THEN NULL ELSE CAST(:now AS timestamptz) + (g % 60 - 30) * interval '1 day' END,
+                       CAST(:now AS timestamptz) - (g % 365) * interval '1 day',
+                       CAST(:now AS timestamptz) - (g % 90) * interval '1 day',
+                       CAST(:now AS timestamptz)
+                FROM generate_series(1, :tasks) g
+            """), {"user_ids": list(user_ids), "users": SEED_USERS, "tasks": SEED_USERS * SEED_TASKS_PER_USER, "now": NOW})
+            await connection.execute(text("ANALYZE task"))
+        await engine.dispose()
+        return user_ids[0]
+
+    async def clean_up():
+        engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+        async with engine.begin() as connection:
+            users = """SELECT id FROM "user" WHERE external_id LIKE 'filters-' || :run || '-%'"""
+            await connection.execute(text(f"DELETE FROM task WHERE user_id IN ({users})"), {"run": run_id})
+            await connection.execute(text(users.replace("SELECT id", "DELETE")), {"run": run_id})
+        await engine.dispose()
+
+    user_id = run(seed())
+    yield user_id
+    run(clean_up())
+
+
+def explain(query) -> str:
+    async def plan():
+        engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+        async with engine.connect() as connection:
+            rows = await connection.execute(text("EXPLAIN " + compile_pg(query, literal_binds=True)))
+            lines = rows.scalars().all()
+        await engine.dispose()
+        return "\n".join(lines)
+    return run(plan())
+
+
+@pytest.mark.parametrize("filters, sort", COMBINATIONS)
+def test_every_filter_and_sort_uses_an_index(seeded_user, filters, sort):
+    query = TaskService.list_query(seeded_user, filters=TaskFilters(**filters), sort=sort)
+
+    plan = explain(query)
+
+    # The index of one of the filtered columns, any of the user's without filters
+    matching = {
+        index for index, columns in FILTER_INDEXES.items()
+        if any(filters.get(column) is not None for column in columns)
+    } or {"ix_task_user_"}
+    assert "Seq Scan" not in plan, plan
+    assert any(index in plan for index in matching), plan
+
+
+
+def test_migrated_indexes_are_declared_on_the_model():
+    """Autogenerate must not propose dropping (or adding) any of the task indexes."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    async def index_changes():
+        engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+        async with engine.connect() as connection:
+            changes = await connection.run_sync(
+                lambda sync: compare_metadata(MigrationContext.configure(sync), Base.metadata)
+            )
+        await engine.dispose()
+        return [
+            change for change in changes
+            if change[0] in ("add_index", "remove_index") and change[1].table.name == "task"
+        ]
+
+    assert run(index_changes()) == []
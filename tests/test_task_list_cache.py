@@ -0,0 +1,183 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.services import task_list_cache
+from app.services.single_flight import flight_stats
+from app.services.task_list_cache import TaskListCache, cache_stats, hit_rate
+
+client = TestClient(app)
+
+
+class FakeRedis:
+    """The subset of redis.asyncio.Redis the cache uses, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        value = self.data.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    def register_script(self, script):
+        # Python mirrors of the cache's Lua scripts
+        async def run(keys, args):
+            if script == task_list_cache.STORE_AND_UNLOCK:
+                await self.set(keys[0], args[0], ex=args[1])
+                keys, args = keys[1:], args[2:]
+            if self.data.get(keys[0]) == args[0]:
+                await self.delete(keys[0])
+        return run
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    cache_stats.clear()
+    with patch.object(task_list_cache, "get_redis", return_value=fake), \
+            patch("app.core.redis.get_redis", return_value=fake), \
+            patch.object(task_list_cache, "POLL_SECONDS", 0.001):
+        yield fake
+
+
+@pytest.mark.asyncio
+async def test_miss_then_hit(redis):
+    load = AsyncMock(return_value=b'[{"id": 1}]')
+
+    assert await TaskListCache.get_or_load('W/"a"', load) == b'[{"id": 1}]'
+    assert await TaskListCache.get_or_load('W/"a"', load) == b'[{"id": 1}]'
+
+    load.assert_awaited_once()
+    assert (cache_stats["hits"], cache_stats["misses"]) == (1, 1)
+    assert hit_rate() == 0.5
+    # The rebuild lock is released with the entry written
+    assert list(redis.data) == ['tasks:list:W/"a"']
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once(redis):
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return b"[]"
+
+    bodies = await asyncio.gather(*(TaskListCache.get_or_load('W/"b"', load) for _ in range(10)))
+
+    assert bodies == [b"[]"] * 10
+    assert calls == 1
+    assert cache_stats["coalesced"] == 9
+    assert hit_rate() == 0.9
+
+
+@pytest.mark.asyncio
+async def test_abandoned_rebuild_falls_back_to_loading(redis):
+    await redis.set('tasks:list:W/"c":lock', 1)
+    load = AsyncMock(return_value=b"[]")
+
+    with patch("app.services.task_list_cache.settings.TASK_LIST_CACHE_LOCK_MS", 10):
+        assert await TaskListCache.get_or_load('W/"c"', load) == b"[]"
+
+    load.assert_awaited_once()
+    assert cache_stats["wait_timeouts"] == 1
+    # The entry is stored, but the lock is the other request's to release
+    assert redis.data['tasks:list:W/"c"'] == b"[]"
+    assert redis.data['tasks:list:W/"c":lock'] == 1
+
+
+@pytest.mark.asyncio
+async def test_a_lapsed_lock_taken_over_is_left_to_its_new_holder(redis):
+    async def load():
+        # The rebuild outlived its lock, which another request then took
+        redis.data['tasks:list:W/"g":lock'] = "other"
+        return b"[]"
+
+    await TaskListCache.get_or_load('W/"g"', load)
+
+    assert redis.data['tasks:list:W/"g":lock'] == "other"
+
+
+@pytest.mark.asyncio
+async def test_failed_rebuild_releases_the_lock(redis):
+    load = AsyncMock(side_effect=OSError("db down"))
+
+    with pytest.raises(OSError):
+        await TaskListCache.get_or_load('W/"f"', load)
+
+    assert redis.data == {}
+
+
+@pytest.mark.asyncio
+async def test_redis_unavailable_loads_directly():
+    broken = AsyncMock()
+    broken.get.side_effect = ConnectionError("refused")
+    load = AsyncMock(return_value=b"[]")
+
+    with patch.object(task_list_cache, "get_redis", return_value=broken):
+        assert await TaskListCache.get_or_load('W/"d"', load) == b"[]"
+
+    load.assert_awaited_once()
+    broken.set.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_disabled_with_zero_ttl(redis):
+    load = AsyncMock(return_value=b"[]")
+
+    with patch("app.services.task_list_cache.settings.TASK_LIST_CACHE_TTL_SECONDS", 0):
+        await TaskListCache.get_or_load('W/"e"', load)
+        await TaskListCache.get_or_load('W/"e"', load)
+
+    assert load.await_count == 2
+    assert redis.data == {}
+
+
+def test_health_reports_the_cache_and_single_flight_counters(redis):
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123", task_list_version=1)
+    app.dependency_overrides[get_current_user] = lambda: user
+    flight_stats.clear()
+
+    with patch("app.services.task.TaskService.get_tasks", return_value=[]):
+        client.get("/tasks")
+        client.get("/tasks")
+    with patch("app.main.redis_pool_stats", return_value={}):
+        health = client.get("/health").json()
+    app.dependency_overrides.clear()
+
+    assert health["task_list_cache"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    assert health["single_flight"] == {"leaders": 2, "in_flight": 0}
+
+
+def test_get_tasks_served_from_cache_until_a_write(redis):
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123", task_list_version=1)
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    with patch("app.services.task.TaskService.get_tasks") as mock_get:
+        mock_get.return_value = []
+
+        first = client.get("/tasks")
+        second = client.get("/tasks")
+        assert first.content == second.content == b"[]"
+        assert mock_get.call_count == 1
+
+        # Writes bump the version, which moves the list to a new key
+        user.task_list_version = 2
+        client.get("/tasks")
+        assert mock_get.call_count == 2
+
+    app.dependency_overrides.clear()
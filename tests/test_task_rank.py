@@ -0,0 +1,222 @@
+import os
+import pytest
+import random
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.models.task import Task
+from app.schemas.task import TaskCreate
+from app.services.task import TaskService
+from app.services.task_rank import rank_between
+from app.services.task_rebalancer import TaskRebalancer
+
+# A migrated database to switch ordering engines against (postgresql+asyncpg://...)
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+def compile_pg(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+class TestRankBetween:
+    """Tests for the lexicographic rank key arithmetic."""
+
+    def test_first_key(self):
+        assert rank_between(None, None) == "a0"
+
+    def test_between_is_strictly_ordered(self):
+        key = rank_between("a0", "a1")
+        assert "a0" < key < "a1"
+
+    def test_prepend_and_append(self):
+        assert rank_between(None, "a0") < "a0"
+        assert rank_between("a0", None) > "a0"
+
+    def test_out_of_order_bounds_rejected(self):
+        with pytest.raises(ValueError):
+            rank_between("a1", "a0")
+        with pytest.raises(ValueError):
+            rank_between("a1", "a1")
+
+    def test_trailing_zero_rejected(self):
+        with pytest.raises(ValueError):
+            rank_between("a0V0", None)
+
+    def test_repeated_prepends_grow_logarithmically(self):
+        key = None
+        for _ in range(100_000):
+            key = rank_between(None, key)
+        assert len(key) <= 5
+
+    def test_random_inserts_preserve_order(self):
+        rng = random.Random(20260221)
+        keys = []
+        for _ in range(20_000):
+            index = rng.randrange(len(keys) + 1)
+            before = keys[index - 1] if index > 0 else None
+            after = keys[index] if index < len(keys) else None
+            key = rank_between(before, after)
+            assert before is None or before < key
+            assert after is None or key < after
+            keys.insert(index, key)
+        assert keys == sorted(keys)
+
+
+class TestRankEngine:
+    """Tests for TaskService under TASK_ORDERING_ENGINE="rank"."""
+
+    @pytest.fixture(autouse=True)
+    def rank_engine(self):
+        with patch("app.services.task.settings.TASK_ORDERING_ENGINE", "rank"):
+            yield
+
+    @pytest.fixture
+    def mock_db(self):
+        return AsyncMock(spec=AsyncSession)
+
+    @pytest.mark.asyncio
+    async def test_create_keys_before_first_task(self, mock_db):
+        user_id = uuid4()
+        created = Task(id=uuid4(), user_id=user_id, title="Task")
+        first = MagicMock()
+        first.scalar.return_value = "a5"
+        inserted = MagicMock()
+        inserted.scalar_one.return_value = created
+        mock_db.execute.side_effect = [MagicMock(), first, inserted]
+
+        task = await TaskService.create_task(mock_db, MagicMock(title="Task", description=None, due_date=None), user_id)
+
+        assert task is created
+        lock, _, insert = [call[0][0] for call in mock_db.execute.call_args_list]
+        assert str(compile_pg(lock)).endswith("FOR UPDATE")
+        rank = compile_pg(insert).params["rank"]
+        assert rank < "a5"
+        # The position is kept too, from the user's counter, for the position engine
+        assert str(compile_pg(insert)).startswith("WITH allocated_position AS")
+        mock_db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_move_keys_between_anchor_and_neighbour(self, mock_db):
+        task_id, above_id = uuid4(), uuid4()
+        moved = Task(id=task_id, title="Task")
+        ranks = MagicMock()
+        ranks.one.return_value = (2, "a3", 3000, "a4", 2000)
+        updated = MagicMock()
+        updated.scalar_one_or_none.return_value = moved
+        mock_db.execute.side_effect = [MagicMock(), ranks, updated]
+
+        task = await TaskService.move_task(mock_db, task_id, uuid4(), above_id=above_id)
+
+        assert task is moved
+        params = compile_pg(mock_db.execute.call_args[0][0]).params
+        assert "a3" < params["rank"] < "a4"
+        assert params["position"] == 2500
+
+    @pytest.mark.asyncio
+    async def test_move_to_top(self, mock_db):
+        ranks = MagicMock()
+        ranks.one.return_value = (2, "a0", 1000, None, None)
+        mock_db.execute.side_effect = [MagicMock(), ranks, MagicMock()]
+
+        await TaskService.move_task(mock_db, uuid4(), uuid4(), below_id=uuid4())
+
+        compiled = compile_pg(mock_db.execute.call_args[0][0])
+        assert compiled.params["rank"] < "a0"
+        assert str(compiled).startswith("WITH allocated_position AS")
+
+    @pytest.mark.asyncio
+    async def test_move_regaps_positions_in_rank_order_when_out_of_room(self, mock_db):
+        crowded, regapped = MagicMock(), MagicMock()
+        crowded.one.return_value = (2, "a3", 1001, "a4", 1000)
+        regapped.one.return_value = (2, "a3", 3000, "a4", 2000)
+        mock_db.execute.side_effect = [MagicMock(), crowded, MagicMock(rowcount=3), regapped, MagicMock()]
+
+        await TaskService.move_task(mock_db, uuid4(), uuid4(), above_id=uuid4())
+
+        statements = [compile_pg(call[0][0]) for call in mock_db.execute.call_args_list]
+        assert "row_number() OVER (ORDER BY task.rank ASC, task.id)" in str(statements[2])
+        assert statements[4].params["position"] == 2500
+
+    @pytest.mark.asyncio
+    async def test_move_with_unknown_id(self, mock_db):
+        ranks = MagicMock()
+        ranks.one.return_value = (1, None, None, None, None)
+        mock_db.execute.side_effect = [MagicMock(), ranks]
+
+        task = await TaskService.move_task(mock_db, uuid4(), uuid4(), above_id=uuid4())
+
+        assert task is None
+        mock_db.rollback.assert_awaited_once()
+        mock_db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_list_ordered_by_rank(self, mock_db):
+        mock_result = MagicMock()
+        mock_result.all.return_value = []
+        mock_db.execute.return_value = mock_result
+
+        await TaskService.get_tasks(mock_db, uuid4())
+
+        sql = str(compile_pg(mock_db.execute.call_args[0][0]))
+        assert sql.endswith("ORDER BY task.rank ASC, task.id")
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+@pytest.mark.asyncio
+async def test_switching_engines_keeps_the_board():
+    """
+    Random creates and moves while switching engines back and forth, syncing the
+    ranks before each switch to them as sync_task_ordering_task does: the board
+    survives every switch, and rank-engine writes keep both keys in the same order.
+    """
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    run_id = uuid4().hex[:8]
+    rng = random.Random(20261019)
+
+    async with engine.begin() as connection:
+        user_id = (await connection.execute(text("""
+            INSERT INTO "user" (id, email, external_id, task_list_version, notification_list_version)
+            VALUES (gen_random_uuid(), 'engines-' || :run || '@example.com', 'engines-' || :run, 0, 0)
+            RETURNING id
+        """), {"run": run_id})).scalar_one()
+
+    async def board(order):
+        async with sessions() as db:
+            query = select(Task.id).where(Task.user_id == user_id, Task.deleted_at == None).order_by(*order)
+            return (await db.execute(query)).scalars().all()
+
+    try:
+        with patch("app.services.task.events", AsyncMock()):
+            for step in range(300):
+                engine_name = "rank" if (step // 25) % 2 else "position"
+                tasks = await board((Task.position.desc(), Task.id))
+                if engine_name == "rank" and step % 25 == 0:
+                    async with sessions() as db:
+                        await TaskRebalancer.rekey_user(db, user_id)
+                        await db.commit()
+                with patch("app.services.task.settings.TASK_ORDERING_ENGINE", engine_name):
+                    async with sessions() as db:
+                        if len(tasks) < 3 or rng.random() < 0.3:
+                            await TaskService.create_task(db, TaskCreate(title=f"Task {step}"), user_id)
+                        else:
+                            task_id = rng.choice(tasks)
+                            others = [t for t in tasks if t != task_id]
+                            index = rng.randrange(len(others) + 1)
+                            above = others[index - 1] if index > 0 else None
+                            below = others[index] if index < len(others) else None
+                            moved = await TaskService.move_task(db, task_id, user_id, above_id=above, below_id=below)
+                            assert moved is not None, (step, engine_name)
+
+                by_position = await board((Task.position.desc(), Task.id))
+                if engine_name == "rank":
+                    assert by_position == await board((Task.rank.asc(), Task.id)), step
+                assert len(set(by_position)) == len(by_position)
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM task WHERE user_id = :user_id"), {"user_id": user_id})
+            await connection.execute(text('DELETE FROM "user" WHERE id = :user_id'), {"user_id": user_id})
+        await engine.dispose()
@@ -0,0 +1,214 @@
+import os
+import pytest
+import random
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.models.task import Task
+from app.schemas.task import TaskCreate
+from app.services.task import TaskService
+from app.services.task_rebalancer import TaskRebalancer, POSITION_GAP, position_between
+
+# A migrated database to move tasks around in (postgresql+asyncpg://...)
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+def compile_pg(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestPositionBetween:
+    """Tests for the gap arithmetic shared by moves and the rebalancer."""
+
+    def test_between_neighbours(self):
+        assert position_between(3000, 2000) == 2500
+
+    def test_top_and_bottom(self):
+        assert position_between(None, 2000) == 2000 + POSITION_GAP
+        assert position_between(3000, None) == 3000 - POSITION_GAP
+
+    def test_exhausted_gap(self):
+        assert position_between(1001, 1000) is None
+        assert position_between(1000, 1000) is None
+        assert position_between(1002, 1000) == 1001
+
+    def test_negative_positions_floor(self):
+        assert position_between(-2, -5) == -4
+
+
+class TestTaskRebalancer:
+    """Tests for the TaskRebalancer service."""
+
+    @pytest.fixture
+    def mock_db(self):
+        db = AsyncMock(spec=AsyncSession)
+        return db
+
+    @pytest.mark.asyncio
+    async def test_rebalance_user_single_window_update(self, mock_db):
+        mock_db.execute.return_value = MagicMock(rowcount=12)
+
+        count = await TaskRebalancer.rebalance_user(mock_db, uuid4())
+
+        assert count == 12
+        assert mock_db.execute.await_count == 1
+        sql = compile_pg(mock_db.execute.call_args[0][0])
+        assert sql.startswith("WITH task_list_bump AS")
+        assert "UPDATE task SET position=" in sql
+        assert "row_number() OVER (ORDER BY task.position DESC, task.id ASC)" in sql
+        assert "coalesce(task_list_bump.max_task_position" in sql
+        assert "task.position != " in sql
+        mock_db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_find_crowded_users(self, mock_db):
+        user_id = uuid4()
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = [user_id]
+        mock_db.execute.return_value = mock_result
+
+        users = await TaskRebalancer.find_crowded_users(mock_db, min_gap=8)
+
+        assert users == [user_id]
+        sql = compile_pg(mock_db.execute.call_args[0][0])
+        assert "lag(task.position) OVER (PARTITION BY task.user_id" in sql
+
+    @pytest.mark.asyncio
+    async def test_rebalance_crowded_users_commits_per_user(self, mock_db):
+        users = [uuid4(), uuid4()]
+        crowded = MagicMock()
+        crowded.scalars.return_value.all.return_value = users
+        mock_db.execute.side_effect = [crowded, MagicMock(rowcount=3), MagicMock(rowcount=5)]
+
+        result = await TaskRebalancer.rebalance_crowded_users(mock_db)
+
+        assert result == {"users": 2, "tasks": 8}
+        assert mock_db.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sync_ordering_keys_rekeys_ranks_from_positions(self, mock_db):
+        users, tasks = MagicMock(), MagicMock()
+        users.scalars.return_value.all.return_value = [uuid4()]
+        tasks.scalars.return_value.all.return_value = [uuid4(), uuid4()]
+        mock_db.execute.side_effect = [users, MagicMock(), tasks, MagicMock()]
+
+        assert await TaskRebalancer.sync_ordering_keys(mock_db) == {"users": 1, "tasks": 2}
+
+        order, (_, rows) = mock_db.execute.call_args_list[2][0], mock_db.execute.call_args[0]
+        assert compile_pg(order[0]).endswith("ORDER BY task.position DESC, task.id ASC")
+        assert [row["rank"] for row in rows] == ["a0", "a1"]
+        mock_db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_sync_ordering_keys_renumbers_positions_from_ranks(self, mock_db):
+        users = MagicMock()
+        users.scalars.return_value.all.return_value = [uuid4()]
+        mock_db.execute.side_effect = [users, MagicMock(rowcount=4)]
+
+        with patch("app.services.task_rebalancer.settings.TASK_ORDERING_ENGINE", "rank"):
+            assert await TaskRebalancer.sync_ordering_keys(mock_db) == {"users": 1, "tasks": 4}
+
+        assert "row_number() OVER (ORDER BY task.rank ASC, task.id)" in compile_pg(mock_db.execute.call_args[0][0])
+
+    @pytest.mark.asyncio
+    async def test_move_rebalances_when_gap_exhausted(self, mock_db):
+        user_id = uuid4()
+        task_id, above_id, below_id = uuid4(), uuid4(), uuid4()
+        moved = Task(id=task_id, user_id=user_id, position=1500)
+
+        not_moved = MagicMock()
+        not_moved.scalar_one_or_none.return_value = None
+        neighbours = MagicMock()
+        neighbours.all.return_value = [(task_id, 5000), (above_id, 1001), (below_id, 1000)]
+        retried = MagicMock()
+        retried.scalar_one_or_none.return_value = moved
+        mock_db.execute.side_effect = [not_moved, neighbours, MagicMock(rowcount=40), retried]
+
+        task = await TaskService.move_task(mock_db, task_id, user_id, above_id=above_id, below_id=below_id)
+
+        assert task is moved
+        statements = [compile_pg(call[0][0]) for call in mock_db.execute.call_args_list]
+        assert "row_number() OVER" in statements[2]
+        assert statements[3] == statements[0]
+        mock_db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_move_with_invalid_neighbour_does_not_rebalance(self, mock_db):
+        user_id = uuid4()
+        task_id, above_id, below_id = uuid4(), uuid4(), uuid4()
+
+        not_moved = MagicMock()
+        not_moved.scalar_one_or_none.return_value = None
+        neighbours = MagicMock()
+        neighbours.all.return_value = [(task_id, 5000), (above_id, 3000)]
+        mock_db.execute.side_effect = [not_moved, neighbours]
+
+        task = await TaskService.move_task(mock_db, task_id, user_id, above_id=above_id, below_id=below_id)
+
+        assert task is None
+        assert mock_db.execute.await_count == 2
+        mock_db.rollback.assert_awaited_once()
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+@pytest.mark.asyncio
+async def test_random_moves_preserve_ordering():
+    """
+    Property: random moves through TaskService.move_task, biased towards a few hot
+    slots so the gaps run out and rebalance_user renumbers the board, always leave
+    it in the intended order with unique positions. Runs the real move and
+    rebalance statements, so it needs Postgres.
+    """
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    run_id = uuid4().hex[:8]
+    rng = random.Random(20260219)
+    rebalance = AsyncMock(wraps=TaskRebalancer.rebalance_user)
+
+    async with engine.begin() as connection:
+        user_id = (await connection.execute(text("""
+            INSERT INTO "user" (id, email, external_id, task_list_version, notification_list_version)
+            VALUES (gen_random_uuid(), 'rebalance-' || :run || '@example.com', 'rebalance-' || :run, 0, 0)
+            RETURNING id
+        """), {"run": run_id})).scalar_one()
+
+    async def positions():
+        async with sessions() as db:
+            query = select(Task.id, Task.position).where(Task.user_id == user_id).order_by(Task.position.desc(), Task.id)
+            return (await db.execute(query)).all()
+
+    try:
+        with patch("app.services.task.events", AsyncMock()), \
+                patch("app.services.task.settings.TASK_ORDERING_ENGINE", "position"), \
+                patch.object(TaskRebalancer, "rebalance_user", rebalance):
+            for i in range(20):
+                async with sessions() as db:
+                    await TaskService.create_task(db, TaskCreate(title=f"Task {i}"), user_id)
+            # Board as displayed (position DESC)
+            board = [task_id for task_id, _ in await positions()]
+
+            for step in range(500):
+                task_id = board.pop(rng.randrange(len(board)))
+                # Mostly just below the top task, which moves to the top would re-gap
+                index = rng.choice((1, 1, 2, len(board), rng.randrange(len(board) + 1)))
+                above = board[index - 1] if index > 0 else None
+                below = board[index] if index < len(board) else None
+                board.insert(index, task_id)
+
+                async with sessions() as db:
+                    moved = await TaskService.move_task(db, task_id, user_id, above_id=above, below_id=below)
+                assert moved is not None, step
+
+                rows = await positions()
+                assert [task for task, _ in rows] == board, step
+                assert len({position for _, position in rows}) == len(rows), step
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM task WHERE user_id = :user_id"), {"user_id": user_id})
+            await connection.execute(text('DELETE FROM "user" WHERE id = :user_id'), {"user_id": user_id})
+        await engine.dispose()
+
+    assert rebalance.await_count > 0
@@ -0,0 +1,100 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.main import app
+from app.api.deps import get_current_user
+from app.core.database import get_db
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.services.task import TaskService
+
+client = TestClient(app)
+
+
+def compile_pg(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def results(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+def search_row(user_id, total):
+    now = datetime.now(timezone.utc)
+    return MagicMock(
+        id=uuid4(), title="Quarterly report", description=None, status=TaskStatus.TODO, position=1000,
+        rank=None, due_date=None, user_id=user_id, created_at=now, updated_at=now, total=total
+    )
+
+
+@pytest.fixture
+def mock_user():
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123")
+    app.dependency_overrides[get_current_user] = lambda: user
+    with patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=0)):
+        yield user
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_search_query_is_ranked_and_scoped_to_the_user():
+    db = AsyncMock(spec=AsyncSession)
+    user_id = uuid4()
+    db.execute.return_value = results([search_row(user_id, total=3)])
+
+    rows, total = await TaskService.search_tasks(db, user_id, "report -draft", skip=20, limit=10)
+
+    sql = compile_pg(db.execute.call_args[0][0])
+    assert "task.search_vector @@ websearch_to_tsquery(%(param_1)s, %(websearch_to_tsquery_1)s)" in sql
+    assert db.execute.call_args[0][0].compile(dialect=postgresql.dialect()).params["param_1"] == "english"
+    assert "ORDER BY ts_rank(task.search_vector, websearch_to_tsquery(" in sql
+    assert "task.user_id = %(user_id_1)s" in sql
+    assert "task.deleted_at IS NULL" in sql
+    assert "count(*) OVER ()" in sql
+    assert "LIMIT %(param_2)s OFFSET %(param_3)s" in sql
+    assert (len(rows), total) == (1, 3)
+    db.scalar.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_paging_past_the_last_match_still_counts_them():
+    db = AsyncMock(spec=AsyncSession)
+    db.execute.return_value = results([])
+    db.scalar.return_value = 7
+
+    assert await TaskService.search_tasks(db, uuid4(), "report", skip=100) == ([], 7)
+    assert "count(*)" in compile_pg(db.scalar.call_args[0][0])
+
+
+def test_loading_tasks_does_not_fetch_the_search_vector():
+    assert "search_vector" not in compile_pg(select(Task))
+
+
+def test_search_endpoint(mock_user):
+    db = AsyncMock(spec=AsyncSession)
+    app.dependency_overrides[get_db] = lambda: db
+    rows = [search_row(mock_user.id, total=2), search_row(mock_user.id, total=2)]
+    with patch("app.services.task.TaskService.search_tasks", AsyncMock(return_value=(rows, 2))) as search:
+        response = client.get("/tasks/search", params={"q": "report", "limit": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [str(row.id) for row in rows]
+    assert (body["total"], body["skip"], body["limit"]) == (2, 0, 2)
+    search.assert_awaited_once_with(db, mock_user.id, "report", skip=0, limit=2)
+
+
+@pytest.mark.parametrize("params", [{}, {"q": ""}, {"q": "x" * 201}, {"q": "report", "limit": 101}, {"q": "report", "skip": -1}])
+def test_search_endpoint_validates_parameters(mock_user, params):
+    with patch("app.services.task.TaskService.search_tasks", AsyncMock()) as search:
+        response = client.get("/tasks/search", params=params)
+    assert response.status_code == 422
+    search.assert_not_called()
+
@@ -0,0 +1,168 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.main import app
+from app.api.deps import get_current_user
+from app.core.database import get_db
+from app.models.task import TaskStatus
+from app.models.user import User
+from app.services import task_list_cache
+from app.services.task import TaskService
+
+client = TestClient(app)
+
+
+def compile_pg(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+class FakeRedis:
+    """The subset of redis.asyncio.Redis the task list cache uses, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        value = self.data.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    def register_script(self, script):
+        # Python mirrors of the cache's Lua scripts
+        async def run(keys, args):
+            if script == task_list_cache.STORE_AND_UNLOCK:
+                await self.set(keys[0], args[0], ex=args[1])
+                keys, args = keys[1:], args[2:]
+            if self.data.get(keys[0]) == args[0]:
+                await self.delete(keys[0])
+        return run
+
+
+class QueryCanceled(Exception):
+    sqlstate = "57014"
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(task_list_cache, "get_redis", return_value=fake), \
+            patch("app.core.redis.get_redis", return_value=fake), \
+            patch("app.api.deps.RateLimiter.acquire", AsyncMock(return_value=0)):
+        yield fake
+
+
+@pytest.fixture
+def mock_user():
+    user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123", task_list_version=1)
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_db] = lambda: AsyncMock(spec=AsyncSession)
+    yield user
+    app.dependency_overrides.clear()
+
+
+def suggestion():
+    return MagicMock(id=uuid4(), title="Quarterly report", status=TaskStatus.TODO, due_date=None)
+
+
+@pytest.mark.asyncio
+async def test_suggest_query_matches_substrings_prefixes_first():
+    db = AsyncMock(spec=AsyncSession)
+    result = MagicMock()
+    result.all.return_value = [suggestion()]
+    db.execute.side_effect = [MagicMock(), result]
+
+    rows = await TaskService.suggest_tasks(db, uuid4(), "50%_off", 5)
+
+    settings_stmt, query = (call[0][0] for call in db.execute.call_args_list)
+    assert list(compile_pg(settings_stmt).params.values()) == [
+        "statement_timeout", "200", True, "plan_cache_mode", "force_custom_plan", True
+    ]
+
+    compiled = compile_pg(query)
+    sql = str(compiled)
+    assert "task.title ILIKE %(title_1)s ESCAPE" in sql
+    assert "ORDER BY task.title ILIKE %(title_2)s ESCAPE" in sql
+    assert "similarity(task.title, %(similarity_1)s) DESC" in sql
+    assert "task.deleted_at IS NULL" in sql
+    assert "task.description" not in sql
+    # LIKE wildcards typed by the user match literally
+    assert compiled.params["title_1"] == "%50\\%\\_off%"
+    assert compiled.params["title_2"] == "50\\%\\_off%"
+    assert compiled.params["param_1"] == 5
+    assert len(rows) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_lookups_are_cancelled():
+    db = AsyncMock(spec=AsyncSession)
+    db.execute.side_effect = [MagicMock(), DBAPIError("SELECT", {}, QueryCanceled())]
+
+    assert await TaskService.suggest_tasks(db, uuid4(), "rep", 10) is None
+    db.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_other_database_errors_are_raised():
+    db = AsyncMock(spec=AsyncSession)
+    db.execute.side_effect = [MagicMock(), DBAPIError("SELECT", {}, OSError("connection lost"))]
+
+    with pytest.raises(DBAPIError):
+        await TaskService.suggest_tasks(db, uuid4(), "rep", 10)
+
+
+def test_suggest_endpoint_returns_slim_tasks(redis, mock_user):
+    rows = [suggestion(), suggestion()]
+    with patch("app.services.task.TaskService.suggest_tasks", AsyncMock(return_value=rows)) as suggest:
+        response = client.get("/tasks/suggest", params={"prefix": "rep", "limit": 2})
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": str(row.id), "title": row.title, "status": "todo", "due_date": None} for row in rows
+    ]
+    assert suggest.await_args[0][1:] == (mock_user.id, "rep", 2)
+    assert "ETag" in response.headers
+
+
+def test_repeated_keystrokes_are_answered_from_the_cache(redis, mock_user):
+    with patch("app.services.task.TaskService.suggest_tasks", AsyncMock(return_value=[suggestion()])) as suggest:
+        first = client.get("/tasks/suggest", params={"prefix": "rep"})
+        # Matching is case-insensitive, so is the cache
+        again = client.get("/tasks/suggest", params={"prefix": "Rep"})
+        assert suggest.await_count == 1
+        assert again.content == first.content
+        assert list(redis.ttls.values()) == [30]
+
+        # A task write bumps the list version: the cached suggestions no longer apply
+        mock_user.task_list_version += 1
+        client.get("/tasks/suggest", params={"prefix": "rep"})
+        assert suggest.await_count == 2
+
+
+def test_timed_out_lookups_answer_503_and_are_not_cached(redis, mock_user):
+    with patch("app.services.task.TaskService.suggest_tasks", AsyncMock(return_value=None)) as suggest:
+        assert client.get("/tasks/suggest", params={"prefix": "r"}).status_code == 503
+        assert client.get("/tasks/suggest", params={"prefix": "r"}).status_code == 503
+    assert suggest.await_count == 2
+    assert redis.data == {}
+
+
+@pytest.mark.parametrize("params", [{}, {"prefix": ""}, {"prefix": "x" * 101}, {"prefix": "rep", "limit": 51}])
+def test_suggest_endpoint_validates_parameters(redis, mock_user, params):
+    with patch("app.services.task.TaskService.suggest_tasks", AsyncMock()) as suggest:
+        assert client.get("/tasks/suggest", params=params).status_code == 422
+    suggest.assert_not_called()
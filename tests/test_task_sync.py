@@ -0,0 +1,138 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from fastapi.testclient import TestClient
+from uuid import uuid4
+from datetime import datetime, timezone, timedelta
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.main import app
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.models.task import Task, TaskStatus
+from app.services.task_sync import TaskSync, encode_cursor, decode_cursor
+
+client = TestClient(app)
+
+
+def compile_pg(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def make_task(updated_at, deleted_at=None):
+    return Task(
+        id=uuid4(),
+        title="Task",
+        user_id=uuid4(),
+        status=TaskStatus.TODO,
+        position=0,
+        created_at=updated_at,
+        updated_at=updated_at,
+        deleted_at=deleted_at
+    )
+
+
+class TestCursor:
+    """Tests for the opaque sync cursor."""
+
+    def test_round_trip(self):
+        key = (datetime(2026, 2, 25, 10, 0, 0, 123456, tzinfo=timezone.utc), uuid4())
+        assert decode_cursor(encode_cursor(key)) == key
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor((datetime(2026, 1, 1), uuid4()))])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestTaskSync:
+    """Tests for the TaskSync service."""
+
+    @pytest.fixture
+    def mock_db(self):
+        return AsyncMock(spec=AsyncSession)
+
+    def returning(self, mock_db, tasks):
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = tasks
+        mock_db.execute.return_value = mock_result
+
+    @pytest.mark.asyncio
+    async def test_initial_sync_skips_deleted_tasks(self, mock_db):
+        self.returning(mock_db, [])
+
+        await TaskSync.get_changes(mock_db, uuid4())
+
+        sql = compile_pg(mock_db.execute.call_args[0][0])
+        assert "task.deleted_at IS NULL" in sql
+        assert sql.endswith("ORDER BY task.updated_at, task.id \n LIMIT %(param_1)s")
+
+    @pytest.mark.asyncio
+    async def test_keyset_after_cursor_returns_tombstones(self, mock_db):
+        old = datetime.now(timezone.utc) - timedelta(hours=1)
+        updated, deleted = make_task(old), make_task(old, deleted_at=old)
+        self.returning(mock_db, [updated, deleted])
+
+        since = (old - timedelta(hours=1), uuid4())
+        changed, tombstones, next_key, has_more = await TaskSync.get_changes(mock_db, uuid4(), since)
+
+        sql = compile_pg(mock_db.execute.call_args[0][0])
+        assert "task.updated_at >= " in sql
+        assert "(task.updated_at, task.id) > (" in sql
+        assert "deleted_at IS NULL" not in sql
+        assert changed == [updated]
+        assert tombstones == [deleted]
+        assert next_key == (deleted.updated_at, deleted.id)
+        assert has_more is False
+
+    @pytest.mark.asyncio
+    async def test_full_page_continues_from_last_row(self, mock_db):
+        now = datetime.now(timezone.utc)
+        tasks = [make_task(now) for _ in range(3)]
+        self.returning(mock_db, tasks)
+
+        changed, _, next_key, has_more = await TaskSync.get_changes(mock_db, uuid4(), limit=2)
+
+        assert changed == tasks[:2]
+        assert has_more is True
+        assert next_key == (tasks[1].updated_at, tasks[1].id)
+
+    @pytest.mark.asyncio
+    async def test_last_page_cursor_stops_at_safety_window(self, mock_db):
+        recent = make_task(datetime.now(timezone.utc))
+        self.returning(mock_db, [recent])
+
+        with patch("app.services.task_sync.settings.TASK_CHANGES_SAFETY_WINDOW_SECONDS", 30):
+            _, _, next_key, has_more = await TaskSync.get_changes(mock_db, uuid4())
+
+        # Rows changed within the window are sent again on the next sync
+        assert has_more is False
+        assert next_key[0] < recent.updated_at - timedelta(seconds=29)
+        assert next_key[1].int == 0
+
+
+def test_get_task_changes_endpoint():
+    mock_user = User(id=uuid4(), email="test@example.com", external_id="fake-sub-123")
+    app.dependency_overrides[get_current_user] = lambda: mock_user
+
+    now = datetime.now(timezone.utc)
+    updated, deleted = make_task(now), make_task(now, deleted_at=now)
+    next_key = (now, deleted.id)
+    since = encode_cursor((now - timedelta(minutes=5), uuid4()))
+
+    with patch("app.services.task_sync.TaskSync.get_changes") as mock_changes:
+        mock_changes.return_value = ([updated], [deleted], next_key, False)
+
+        response = client.get(f"/tasks/changes?since={since}")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [t["id"] for t in data["changed"]] == [str(updated.id)]
+        assert data["deleted"] == [{"id": str(deleted.id), "deleted_at": now.isoformat().replace("+00:00", "Z")}]
+        assert decode_cursor(data["cursor"]) == next_key
+        assert data["has_more"] is False
+        assert mock_changes.call_args[0][2] == decode_cursor(since)
+
+    response = client.get("/tasks/changes?since=garbage")
+    assert response.status_code == 400
+
+    app.dependency_overrides.clear()
@@ -1,3 +1,4 @@
+import os
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 from fastapi.testclient import TestClient
@@ -5,12 +6,17 @@ from app.main import app
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.task import Task, TaskStatus
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from uuid import uuid4
 from datetime import datetime, timezone
 
 client = TestClient(app)
 
+# A migrated database to run concurrent writes against (postgresql+asyncpg://...)
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
 @pytest.fixture
 def mock_user():
     return User(
@@ -104,6 +110,18 @@ def test_update_task_success(mock_user):
         
     app.dependency_overrides.clear()
 
+def test_update_task_ignores_position(mock_user):
+    # Positions come from the user's counter and the move path only
+    app.dependency_overrides[get_current_user] = lambda: mock_user
+
+    with patch("app.services.task.TaskService.update_task", return_value=None) as mock_update:
+        client.patch(f"/tasks/{uuid4()}", json={"title": "Title", "position": 10 ** 9})
+
+    task_in = mock_update.call_args[0][2]
+    assert task_in.model_dump(exclude_unset=True) == {"title": "Title"}
+
+    app.dependency_overrides.clear()
+
 def test_update_task_not_found(mock_user):
     task_id = uuid4()
     update_data = {"title": "Updated Title"}
@@ -235,6 +253,102 @@ def test_get_tasks_filter_by_status(mock_user):
         
     app.dependency_overrides.clear()
 
+def test_get_tasks_etag(mock_user):
+    mock_user.task_list_version = 1
+    app.dependency_overrides[get_current_user] = lambda: mock_user
+
+    with patch("app.services.task.TaskService.get_tasks") as mock_get:
+        mock_get.return_value = []
+
+        etag = client.get("/tasks").headers["etag"]
+        assert client.get("/tasks", headers={"If-None-Match": etag}).status_code == 304
+        assert mock_get.call_count == 1
+
+        # A different filter is a different representation
+        response = client.get("/tasks?status=todo", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+        # So is another user's board at the same version
+        other_user = User(id=uuid4(), email="other@example.com", external_id="other", task_list_version=1)
+        app.dependency_overrides[get_current_user] = lambda: other_user
+        assert client.get("/tasks", headers={"If-None-Match": etag}).status_code == 200
+
+        # Any write bumps the version
+        mock_user.task_list_version = 2
+        app.dependency_overrides[get_current_user] = lambda: mock_user
+        response = client.get("/tasks", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    app.dependency_overrides.clear()
+
+def test_get_tasks_serializes_rows(mock_user):
+    from app.core.database import get_db
+    from app.schemas.task import Task as TaskSchema
+
+    now = datetime.now(timezone.utc)
+    row = MagicMock(
+        id=uuid4(), title="Row", description=None, status=TaskStatus.TODO, position=1000,
+        due_date=None, user_id=mock_user.id, created_at=now, updated_at=now
+    )
+    listed = MagicMock()
+    listed.all.return_value = [row]
+    db = AsyncMock(spec=AsyncSession)
+    db.execute.return_value = listed
+    app.dependency_overrides[get_current_user] = lambda: mock_user
+    app.dependency_overrides[get_db] = lambda: db
+
+    response = client.get("/tasks")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"].startswith('W/"')
+    assert response.json() == [TaskSchema.model_validate(row).model_dump(mode="json")]
+
+    # Only the response columns are selected, as rows rather than entities
+    sql = str(compile_pg(db.execute.call_args[0][0]))
+    assert sql.startswith("SELECT task.id, task.title, task.description, task.status, task.position")
+    assert "task.deleted_at," not in sql
+    listed.scalars.assert_not_called()
+
+    app.dependency_overrides.clear()
+
+def test_get_tasks_fields_projection(mock_user):
+    from app.core.database import get_db
+
+    row = MagicMock(id=uuid4(), title="Row", status=TaskStatus.DONE, position=1000)
+    listed = MagicMock()
+    listed.all.return_value = [row]
+    db = AsyncMock(spec=AsyncSession)
+    db.execute.return_value = listed
+    app.dependency_overrides[get_current_user] = lambda: mock_user
+    app.dependency_overrides[get_db] = lambda: db
+
+    response = client.get("/tasks?fields=title, status,position")
+
+    assert response.status_code == 200
+    # id is always included; keys follow the Task schema order
+    assert response.json() == [{"title": "Row", "position": 1000, "id": str(row.id), "status": "done"}]
+    sql = str(compile_pg(db.execute.call_args[0][0]))
+    assert sql.startswith("SELECT task.id, task.title, task.status, task.position \nFROM task")
+    assert "description" not in sql
+
+    # Each projection is its own representation
+    other = client.get("/tasks?fields=title", headers={"If-None-Match": response.headers["etag"]})
+    assert other.status_code == 200
+    assert other.headers["etag"] != response.headers["etag"]
+
+    response = client.get("/tasks?fields=title,secret")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: secret"
+
+    # The rank ordering key is internal: clients get the list in order
+    response = client.get("/tasks?fields=title,rank")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: rank"
+
+    app.dependency_overrides.clear()
+
 def test_move_task_success(mock_user):
     task_id = uuid4()
     above_id = uuid4()
@@ -281,27 +395,36 @@ def test_move_task_failure(mock_user):
 @pytest.mark.asyncio
 async def test_create_task_position_logic():
     from app.services.task import TaskService
+    from sqlalchemy.dialects import postgresql
     
     db = AsyncMock(spec=AsyncSession)
     user_id = uuid4()
     
-    # Mock result and scalar
+    created = Task(id=uuid4(), title="Task 1", user_id=user_id, position=0)
     mock_result = MagicMock()
+    mock_result.scalar_one.return_value = created
     db.execute.return_value = mock_result
     
-    # Case 1: First task for user
-    mock_result.scalar.return_value = None
     task_in = MagicMock(title="Task 1", description=None, due_date=None)
-    
     task = await TaskService.create_task(db, task_in, user_id)
-    assert task.position == 0
+    assert task is created
     
-    # Case 2: Subsequent tasks
-    mock_result.scalar.return_value = 1000
-    task_in = MagicMock(title="Task 2", description=None, due_date=None)
-    
-    task = await TaskService.create_task(db, task_in, user_id)
-    assert task.position == 2000
+    # The top position (counter + 1000, or 0 for the first task) is allocated from the
+    # user's counter inside the INSERT, without scanning the user's tasks
+    stmt = db.execute.call_args[0][0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH allocated_position AS \n(UPDATE \"user\" SET")
+    assert "task_list_version=(\"user\".task_list_version +" in sql
+    assert "RETURNING \"user\".id, \"user\".max_task_position" in sql
+    assert "INSERT INTO task" in sql
+    assert "max(task.position)" not in sql
+    assert "RETURNING" in sql
+    db.commit.assert_awaited_once()
+    db.refresh.assert_not_called()
+
+def compile_pg(stmt):
+    from sqlalchemy.dialects import postgresql
+    return stmt.compile(dialect=postgresql.dialect())
 
 @pytest.mark.asyncio
 async def test_move_task_gap_logic():
@@ -313,38 +436,294 @@ async def test_move_task_gap_logic():
     above_id = uuid4()
     below_id = uuid4()
     
-    # helper to produce result mocks
-    def get_mock_result(val):
-        m = MagicMock()
-        m.scalar_one_or_none.return_value = val
-        m.scalar.return_value = val
-        return m
-
-    # Test 1: Move between two tasks
-    task_to_move = Task(id=task_id, user_id=user_id, position=1000)
-    db.execute.side_effect = [
-        get_mock_result(task_to_move),
-        get_mock_result(3000), # pos_above
-        get_mock_result(2000), # pos_below
-    ]
-    
+    moved = Task(id=task_id, user_id=user_id, position=2500)
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = moved
+    db.execute.return_value = mock_result
+
+    # Test 1: Move between two tasks -> floor((above + below) / 2), computed in SQL
     task = await TaskService.move_task(db, task_id, user_id, above_id=above_id, below_id=below_id)
-    assert task.position == 2500  # (3000 + 2000) // 2
+    assert task is moved
+    compiled = compile_pg(db.execute.call_args[0][0])
+    sql = str(compiled)
+    assert sql.startswith("WITH task_list_bump AS \n(UPDATE \"user\"")
+    assert "locked AS \n(SELECT task.id AS id, task.position AS position \nFROM task \nWHERE (EXISTS (SELECT task_list_bump.id" in sql
+    assert "FOR UPDATE" in sql
+    assert "floor(" in sql
+    assert "UPDATE task SET position=" in sql
+    assert "RETURNING" in sql
     
-    # Test 2: Move to the top (above is None)
-    task_to_move = Task(id=task_id, user_id=user_id, position=2500)
-    db.execute.side_effect = [
-        get_mock_result(task_to_move),
-        get_mock_result(2000), # pos_below
-    ]
-    task = await TaskService.move_task(db, task_id, user_id, above_id=None, below_id=below_id)
-    assert task.position == 3000  # 2000 + 1000
+    # Test 2: Move to the top (above is None) -> next value of the user's counter,
+    # taken before the task rows are locked
+    await TaskService.move_task(db, task_id, user_id, above_id=None, below_id=below_id)
+    compiled = compile_pg(db.execute.call_args[0][0])
+    sql = str(compiled)
+    assert sql.startswith("WITH allocated_position AS \n(UPDATE \"user\"")
+    assert "EXISTS (SELECT allocated_position.id" in sql
+    assert 1000 in compiled.params.values()
+    assert "floor(" not in sql
     
-    # Test 3: Move to the bottom (below is None)
-    task_to_move = Task(id=task_id, user_id=user_id, position=3000)
-    db.execute.side_effect = [
-        get_mock_result(task_to_move),
-        get_mock_result(3000), # pos_above
+    # Test 3: Move to the bottom (below is None) -> above - 1000
+    await TaskService.move_task(db, task_id, user_id, above_id=above_id, below_id=None)
+    compiled = compile_pg(db.execute.call_args[0][0])
+    assert " - " in str(compiled)
+    assert 1000 in compiled.params.values()
+
+    assert db.execute.await_count == 3
+    assert db.commit.await_count == 3
+    db.refresh.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_move_task_invalid_ids_rolls_back():
+    from app.services.task import TaskService
+    
+    db = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = None
+    db.execute.return_value = mock_result
+
+    task = await TaskService.move_task(db, uuid4(), uuid4(), above_id=uuid4())
+
+    assert task is None
+    db.rollback.assert_awaited_once()
+    db.commit.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_concurrent_moves_lock_rows_in_a_consistent_order():
+    """
+    Two tabs moving tasks of the same board at the same time: each move must be a
+    single statement that locks every row it reads in id order, so Postgres
+    serializes the moves instead of computing positions from stale neighbours.
+    See test_concurrent_moves_serialize for the same against Postgres.
+    """
+    import asyncio
+    from app.services.task import TaskService
+
+    user_id = uuid4()
+    a, b, c = uuid4(), uuid4(), uuid4()
+
+    def make_session():
+        db = AsyncMock(spec=AsyncSession)
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = Task(id=uuid4(), user_id=user_id)
+        db.execute.return_value = mock_result
+        return db
+
+    sessions = [make_session() for _ in range(4)]
+    moves = [
+        (a, b, c),  # tab 1: a between b and c
+        (b, a, c),  # tab 2: b between a and c
+        (c, a, b),
+        (a, c, b),
     ]
-    task = await TaskService.move_task(db, task_id, user_id, above_id=above_id, below_id=None)
-    assert task.position == 2000  # 3000 - 1000
+    await asyncio.gather(*(
+        TaskService.move_task(db, task_id, user_id, above_id=above, below_id=below)
+        for db, (task_id, above, below) in zip(sessions, moves)
+    ))
+
+    for db, (task_id, above, below) in zip(sessions, moves):
+        assert db.execute.await_count == 1
+        compiled = compile_pg(db.execute.call_args[0][0])
+        sql = str(compiled)
+        assert "ORDER BY task.id FOR UPDATE" in sql
+        locked_ids = next(v for v in compiled.params.values() if isinstance(v, list))
+        assert set(locked_ids) == {task_id, above, below}
+        db.commit.assert_awaited_once()
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+@pytest.mark.asyncio
+async def test_concurrent_moves_serialize():
+    """
+    Conflicting moves of the same board, each on its own connection and fired at
+    once, all finish without a deadlock and leave the board, positions and all,
+    as one of the orders of running the same moves one after another leaves it.
+    """
+    import asyncio
+    import itertools
+    from app.schemas.task import TaskCreate
+    from app.services.task import TaskService
+
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    run_id = uuid4().hex[:8]
+    async with engine.begin() as connection:
+        user_id = (await connection.execute(text("""
+            INSERT INTO "user" (id, email, external_id, task_list_version, notification_list_version)
+            VALUES (gen_random_uuid(), 'moves-' || :run || '@example.com', 'moves-' || :run, 0, 0)
+            RETURNING id
+        """), {"run": run_id})).scalar_one()
+
+    async def board():
+        async with sessions() as db:
+            query = select(Task.id, Task.position).where(Task.user_id == user_id).order_by(Task.position.desc(), Task.id)
+            return (await db.execute(query)).all()
+
+    async def move(task_id, above, below, ready=None):
+        async with sessions() as db:
+            if ready is not None:
+                # Connected, then moving together with the others
+                await db.connection()
+                await ready.wait()
+            return await TaskService.move_task(db, task_id, user_id, above_id=above, below_id=below)
+
+    try:
+        with patch("app.services.task.events", AsyncMock()), \
+                patch("app.services.task.settings.TASK_ORDERING_ENGINE", "position"):
+            for i in range(5):
+                async with sessions() as db:
+                    await TaskService.create_task(db, TaskCreate(title=f"Task {i}"), user_id)
+            start = await board()
+            async with sessions() as db:
+                counter = await db.scalar(select(User.max_task_position).where(User.id == user_id))
+            a, b, c, d, e = (task_id for task_id, _ in start)
+
+            async def reset():
+                async with engine.begin() as connection:
+                    await connection.execute(
+                        text("UPDATE task SET position = :position WHERE id = :id"),
+                        [{"id": task_id, "position": position} for task_id, position in start]
+                    )
+                    await connection.execute(
+                        text('UPDATE "user" SET max_task_position = :counter WHERE id = :user_id'),
+                        {"counter": counter, "user_id": user_id}
+                    )
+
+            # Each move's neighbours include another move's task; one takes the top
+            # from the counter
+            moves = [(a, d, e), (d, b, c), (e, None, b), (b, c, d)]
+
+            serial_boards = set()
+            for order in itertools.permutations(moves):
+                await reset()
+                for args in order:
+                    assert await move(*args) is not None
+                serial_boards.add(tuple(await board()))
+
+            for _ in range(10):
+                await reset()
+                # A deadlock would raise here
+                ready = asyncio.Barrier(len(moves))
+                moved = await asyncio.gather(*(move(*args, ready=ready) for args in moves))
+                assert all(task is not None for task in moved)
+
+                rows = await board()
+                assert len({position for _, position in rows}) == len(rows)
+                # Positions included: a move computed from stale neighbours can
+                # still give a serial order of the tasks
+                assert tuple(rows) in serial_boards
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM task WHERE user_id = :user_id"), {"user_id": user_id})
+            await connection.execute(text('DELETE FROM "user" WHERE id = :user_id'), {"user_id": user_id})
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_parallel_creates_allocate_from_the_user_counter():
+    """
+    Each create's INSERT takes its position from bumping the user's counter row
+    (serialized by its row lock), never from reading max(position), which two
+    transactions could both see. See test_parallel_creates_get_distinct_positions
+    for the same against Postgres.
+    """
+    import asyncio
+    from app.services.task import TaskService
+
+    user_id = uuid4()
+
+    def make_session():
+        db = AsyncMock(spec=AsyncSession)
+        mock_result = MagicMock()
+        mock_result.scalar_one.return_value = Task(id=uuid4(), user_id=user_id)
+        db.execute.return_value = mock_result
+        return db
+
+    sessions = [make_session() for _ in range(50)]
+    await asyncio.gather(*(
+        TaskService.create_task(db, MagicMock(title=f"Task {i}", description=None, due_date=None), user_id)
+        for i, db in enumerate(sessions)
+    ))
+
+    for db in sessions:
+        assert db.execute.await_count == 1
+        compiled = compile_pg(db.execute.call_args[0][0])
+        sql = str(compiled)
+        assert "UPDATE \"user\" SET" in sql
+        assert "max(" not in sql
+        assert user_id in compiled.params.values()
+        db.commit.assert_awaited_once()
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+@pytest.mark.parametrize("ordering_engine", ["position", "rank"])
+@pytest.mark.asyncio
+async def test_parallel_creates_get_distinct_positions(ordering_engine):
+    """
+    Many tabs creating tasks at once, each on its own connection: every task gets
+    its own position (and rank, under the rank engine), and the user's counter
+    ends above all of them.
+    """
+    import asyncio
+    from app.schemas.task import TaskCreate
+    from app.services.task import TaskService
+
+    creates = 50
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    run_id = uuid4().hex[:8]
+    async with engine.begin() as connection:
+        user_id = (await connection.execute(text("""
+            INSERT INTO "user" (id, email, external_id, task_list_version, notification_list_version)
+            VALUES (gen_random_uuid(), 'creates-' || :run || '@example.com', 'creates-' || :run, 0, 0)
+            RETURNING id
+        """), {"run": run_id})).scalar_one()
+
+    async def create(i):
+        async with sessions() as db:
+            return await TaskService.create_task(db, TaskCreate(title=f"Task {i}"), user_id)
+
+    try:
+        with patch("app.services.task.events", AsyncMock()), \
+                patch("app.services.task.settings.TASK_ORDERING_ENGINE", ordering_engine):
+            created = await asyncio.gather(*(create(i) for i in range(creates)))
+
+        async with sessions() as db:
+            rows = (await db.execute(select(Task.position, Task.rank).where(Task.user_id == user_id))).all()
+            counter = await db.scalar(select(User.max_task_position).where(User.id == user_id))
+
+        assert len(rows) == creates
+        assert len({position for position, _ in rows}) == creates
+        assert counter == max(task.position for task in created)
+        if ordering_engine == "rank":
+            # Rank creates keep positions too: both keys give the same board
+            assert len({rank for _, rank in rows}) == creates
+            assert sorted(rows, key=lambda row: -row[0]) == sorted(rows, key=lambda row: row[1])
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM task WHERE user_id = :user_id"), {"user_id": user_id})
+            await connection.execute(text('DELETE FROM "user" WHERE id = :user_id'), {"user_id": user_id})
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_writes_bump_the_task_list_version():
+    """
+    Every task mutation bumps the user's task list version, locking the user row
+    before any task row.
+    """
+    from app.services.task import TaskService
+    from app.schemas.task import TaskUpdate
+
+    db = AsyncMock(spec=AsyncSession)
+    user_id = uuid4()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = Task(id=uuid4(), user_id=user_id)
+    db.execute.return_value = mock_result
+
+    await TaskService.update_task(db, uuid4(), TaskUpdate(title="New"), user_id)
+    sql = str(compile_pg(db.execute.call_args[0][0]))
+    assert sql.startswith("WITH task_list_bump AS \n(UPDATE \"user\" SET")
+    assert "WHERE (EXISTS (SELECT task_list_bump.id" in sql
+
+    await TaskService.delete_task(db, uuid4(), user_id)
+    sql = str(compile_pg(db.execute.call_args[0][0]))
+    assert sql.startswith("UPDATE \"user\" SET")
+    assert "task_list_version=(\"user\".task_list_version +" in sql
+